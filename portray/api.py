@@ -5,14 +5,18 @@ If you want to extend `portray` or use it directly from within Python - this is
 to start.
 """
 
+import cProfile
+import json
 import os
+import sys
 import webbrowser
-from typing import Dict, Union
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Union
 
-import mkdocs.commands.gh_deploy
-from livereload import Server
+from portray import config, logo, timing
 
-from portray import config, logo, render
+# MkDocs, pdocs, livereload and the rest of the build pipeline are only imported by the
+# commands that use them, keeping the CLI fast to start for commands such as `--version`
 
 
 def as_html(
@@ -21,8 +25,12 @@ def as_html(
     output_dir: str = "site",
     overwrite: bool = False,
     modules: list = None,  # type: ignore
-) -> None:
-    """Produces HTML documentation for a Python project placing it into output_dir.
+    incremental: bool = False,
+    jobs: int = None,  # type: ignore
+    profile: str = "",
+) -> Dict[str, Any]:
+    """Produces HTML documentation for a Python project placing it into output_dir,
+    returning the time spent within each phase of the build.
 
     - *directory*: The root folder of your project.
     - *config_file*: The [TOML](https://github.com/toml-lang/toml#toml)
@@ -33,14 +41,72 @@ def as_html(
       specified `output_dir` the command will fail with a `DocumentationAlreadyExists`
       exception.
     - *modules*: One or more modules to render reference documentation for
+    - *incremental*: If set to `True` the build reuses the persistent build cache
+      (`.portray_cache` by default) only regenerating pages whose inputs changed.
+    - *jobs*: The number of processes to generate reference documentation with
+      (`0` uses one per CPU, defaults to the `jobs` configuration option).
+    - *profile*: If set, a `cProfile` profile of the build is written to this path
+      (viewable with `python -m pstats` or tools such as snakeviz).
     """
+    from portray import render
+
     directory = directory if directory else os.getcwd()
-    render.documentation(
-        project_configuration(directory, config_file, modules=modules, output_dir=output_dir),
-        overwrite=overwrite,
-    )
+    project_config = project_configuration(directory, config_file, modules=modules, output_dir=output_dir)
+    if incremental:
+        project_config["incremental"] = True
+    if jobs is not None:
+        project_config["jobs"] = jobs
+
+    profiler = cProfile.Profile() if profile else None
+    with timing.record() as timings:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            render.documentation(project_config, overwrite=overwrite)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile)
+
     print(logo.ascii_art)
     print(f"Documentation successfully generated into `{os.path.abspath(output_dir)}` !")
+    return timings.as_dict()
+
+
+def as_html_many(
+    directories: list,
+    config_file: str = "pyproject.toml",
+    output_dir: str = "site",
+    overwrite: bool = False,
+    workers: int = 0,
+    report: str = "",
+) -> List[Dict[str, Any]]:
+    """Produces HTML documentation for many Python projects, building them concurrently within
+    one pool of worker processes, and returns a success/timing report per project.
+
+    - *directories*: The root folders of the projects, or glob patterns matching them.
+    - *config_file*: The [TOML](https://github.com/toml-lang/toml#toml)
+      formatted config file each project uses.
+    - *output_dir*: The directory to place each projects generated HTML into, relative to the project.
+    - *overwrite*: If set to `True` any existing documentation output will be removed
+      before generating new documentation.
+    - *workers*: The number of projects to build concurrently (`0` uses one per CPU).
+    - *report*: If given, a file path to write the report to as JSON.
+    """
+    from portray import batch
+
+    results = batch.build(
+        batch.projects(directories),
+        config_file=config_file,
+        output_dir=output_dir,
+        overwrite=overwrite,
+        workers=workers,
+    )
+    print(batch.table(results))
+    if report:
+        with open(report, "w") as report_file:
+            json.dump(results, report_file, indent=2)
+    return results
 
 
 def in_browser(
@@ -50,6 +116,7 @@ def in_browser(
     host: str = None,  # type: ignore
     modules: list = None,  # type: ignore
     reload: bool = False,
+    jobs: int = None,  # type: ignore
 ) -> None:
     """Opens your default webbrowser pointing to a locally started development webserver enabling
     you to browse documentation locally
@@ -61,6 +128,8 @@ def in_browser(
     - *host*: The host to expose your documentation on (defaults to `"127.0.0.1"`)
     - *modules*: One or more modules to render reference documentation for
     - *reload*: If true the server will live load any changes
+    - *jobs*: The number of processes to generate reference documentation with
+      (`0` uses one per CPU, defaults to the `jobs` configuration option).
     """
     directory = directory if directory else os.getcwd()
     server(
@@ -71,6 +140,7 @@ def in_browser(
         host=host,
         modules=modules,
         reload=reload,
+        jobs=jobs,
     )
 
 
@@ -82,6 +152,10 @@ def server(
     host: str = None,  # type: ignore
     modules: list = None,  # type: ignore
     reload: bool = False,
+    jobs: int = None,  # type: ignore
+    production: bool = False,
+    workers: int = 0,
+    lazy: bool = False,
 ) -> None:
     """Runs a development webserver enabling you to browse documentation locally.
 
@@ -93,31 +167,83 @@ def server(
     - *host*: The host to expose your documentation on (defaults to `"127.0.0.1"`)
     - *modules*: One or more modules to render reference documentation for
     - *reload*: If true the server will live load any changes
+    - *jobs*: The number of processes to generate reference documentation with
+      (`0` uses one per CPU, defaults to the `jobs` configuration option).
+    - *production*: If true the built documentation is served by a production grade static
+      server, able to handle many concurrent users, rather than the live reloading one.
+    - *workers*: The number of processes the production server uses (`0` uses one per CPU).
+    - *lazy*: If true the server starts straight away, rendering each page the first time it's
+      requested while the rest of the site is rendered in the background.
     """
+    if production and reload:
+        raise ValueError("The production server doesn't support live reloading, pass only one of them.")
+    if production and lazy:
+        raise ValueError("The production server serves a complete build, pass only one of production and lazy.")
+
+    from livereload import Server
+    from livereload.handlers import LiveReloadHandler
+    from tornado.ioloop import IOLoop
+
+    from portray import lazy as lazy_rendering
+    from portray import render, serving, watch
+
     directory = directory if directory else os.getcwd()
-    project_config = project_configuration(directory, config_file, modules=modules)
+    project_config = _server_configuration(directory, config_file, modules, jobs, reload)
     host = host or project_config["host"]
     port = port or project_config["port"]
 
-    with render.documentation_in_temp_folder(project_config) as (sources_folder, docs_folder):
+    with ExitStack() as build:
+        lazy_site: Optional[lazy_rendering.Site] = None
+        if lazy:
+            lazy_site = build.enter_context(lazy_rendering.site(project_config))
+            sources_folder, docs_folder = lazy_site.input_dir, lazy_site.site_dir
+        else:
+            sources_folder, docs_folder = build.enter_context(render.documentation_in_temp_folder(project_config))
 
         print(logo.ascii_art)
 
+        if production:
+            from portray import static_server
+
+            if open_browser:
+                webbrowser.open_new(f"http://{host}:{port}")
+            static_server.serve(docs_folder, host=host, port=port, workers=workers)
+            return
+
         live_server = Server()
+        if lazy_site is not None:
+            live_server.SFH = serving.lazy_handler(lazy_site)
+        elif reload:
+            live_server.SFH = serving.LiveSidecarStaticFileHandler
+        else:
+            live_server.SFH = serving.SidecarStaticFileHandler
 
         if reload:
 
-            def reloader():  # pragma: no cover
-                sources_old = sources_folder + ".old"
-                docs_old = docs_folder + ".old"
-                with render.documentation_in_temp_folder(project_config) as (sources_new, docs_new):
-                    # cause as little churn as possible to the server watchers
-                    os.rename(sources_folder, sources_old)
-                    os.rename(sources_new, sources_folder)
-                    os.rename(sources_old, sources_new)
-                    os.rename(docs_folder, docs_old)
-                    os.rename(docs_new, docs_folder)
-                    os.rename(docs_old, docs_new)
+            def reloader(changed_paths: Optional[list] = None) -> None:  # pragma: no cover
+                # removed files are reported without paths, requiring a full rebuild
+                changes = (
+                    watch.classify(project_config, changed_paths)
+                    if changed_paths is not None
+                    else watch.Changes(full=True)
+                )
+                if not changes:
+                    return
+
+                if changes.full or changes.nav:
+                    # the project configuration itself may have changed, or its nav generated by a previous build
+                    updated_config = _server_configuration(directory, config_file, modules, jobs, reload)
+                    project_config.clear()
+                    project_config.update(updated_config)
+
+                if lazy_site is not None:
+                    # a lazy site is prepared again from scratch, rendering pages as they're requested
+                    lazy_site.prepare()
+                    lazy_site.start()
+                    return
+
+                with render.documentation_in_temp_folder(project_config, changes):
+                    pass
 
             # all directories that feed documentation_in_temp_folder
             watch_dirs = {
@@ -129,8 +255,22 @@ def server(
                 watch_dirs.add(project_config["mkdocs"]["docs_dir"])
             if "site_dir" in project_config["mkdocs"]:
                 watch_dirs.add(project_config["mkdocs"]["site_dir"])
+            cache_dir = os.path.join(project_config["directory"], project_config["cache_dir"])
+
+            def ignore(path: str) -> bool:
+                return os.path.abspath(path).startswith(os.path.abspath(cache_dir) + os.sep)
+
+            # browsers are told to reload once a batch of changes has been rebuilt,
+            # rather than by livereload as soon as it detects each individual change
+            ioloop = IOLoop.current()
+            batcher = watch.ChangeBatcher(
+                reloader,
+                quiet_period=project_config["reload_quiet_period"],
+                on_complete=lambda: ioloop.add_callback(LiveReloadHandler.reload_waiters),
+            )
             for watch_dir in watch_dirs.difference({sources_folder, docs_folder}):
-                live_server.watch(watch_dir, reloader)
+                # watching a glob pattern provides the batcher with the changed paths
+                live_server.watch(os.path.join(watch_dir, "**", "*"), batcher.add, delay="forever", ignore=ignore)
 
         if open_browser:
             webbrowser.open_new(f"http://{host}:{port}")
@@ -141,11 +281,21 @@ def server(
                 f"Failed to start server: {e}"
                 "\nTry specifying a different port using the `--port` option or stop the server using that port."
             )
-            import sys
-
             sys.exit(1)
 
 
+def _server_configuration(
+    directory: str, config_file: str, modules: Optional[list], jobs: Optional[int], reload: bool
+) -> dict:
+    project_config = project_configuration(directory, config_file, modules=modules)
+    if jobs is not None:
+        project_config["jobs"] = jobs
+    if reload:
+        # live reloading rebuilds in place, only redoing the work affected by each change
+        project_config["incremental"] = True
+    return project_config
+
+
 def project_configuration(
     directory: str = "",
     config_file: str = "pyproject.toml",
@@ -186,6 +336,10 @@ def on_github_pages(
     - *ignore_version*: Ignore check that build is not being deployed with an old version.
     - *modules*: One or more modules to render reference documentation for
     """
+    import mkdocs.commands.gh_deploy
+
+    from portray import render
+
     directory = directory if directory else os.getcwd()
     project_config = project_configuration(directory, config_file, modules)
     with render.documentation_in_temp_folder(project_config) as (_, site_dir):
@@ -195,3 +349,51 @@ def on_github_pages(
         mkdocs.commands.gh_deploy.gh_deploy(conf, message=message, force=force, ignore_version=ignore_version)
         print(logo.ascii_art)
         print("Documentation successfully generated and pushed!")
+
+
+def daemon(socket_path: str = "") -> None:
+    """Runs a resident build daemon that keeps MkDocs, pdocs and the theme warm between builds.
+    While it runs, `portray as-html` sends its builds to the daemon rather than building in-process.
+
+    - *socket_path*: The Unix socket to listen on (defaults to `$PORTRAY_DAEMON_SOCKET`, or a
+      per user socket within the runtime directory).
+    """
+    from portray import daemon as build_daemon
+
+    build_daemon.serve(socket_path)
+
+
+def bench(
+    module_count: int = 10,
+    function_count: int = 10,
+    page_count: int = 10,
+    media_count: int = 0,
+    media_size: int = 1024 * 1024,
+    repeat: int = 3,
+    output: str = "",
+) -> dict:
+    """Benchmarks `portray` by repeatedly documenting a generated synthetic project, returning
+    the time spent within each build phase.
+
+    - *module_count*: The number of Python modules in the synthetic project.
+    - *function_count*: The number of documented functions within each module.
+    - *page_count*: The number of Markdown documentation pages.
+    - *media_count*: The number of media files within the projects `images` directory.
+    - *media_size*: The size, in bytes, of each media file.
+    - *repeat*: The number of times to build the synthetic project.
+    - *output*: If given, a file path to write the results to as JSON.
+    """
+    from portray import benchmark
+
+    results = benchmark.run(
+        modules=module_count,
+        functions=function_count,
+        pages=page_count,
+        media_files=media_count,
+        media_size=media_size,
+        repeat=repeat,
+    )
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    return results
@@ -0,0 +1,530 @@
+"""Defines the `ast` reference documentation mode, generating reference Markdown purely from the
+abstract syntax trees of a project's source files.
+
+pdocs imports every module it documents, running any import time side effects and importing
+every dependency along the way. With `mode = "ast"` set within `[tool.portray.pdocs]` modules
+are instead located on the filesystem and parsed, never imported, with their files parsed in
+parallel. The extracted modules, classes, functions, signatures and docstrings are rendered by
+pdocs' own templates into the same Markdown layout under `reference/`.
+
+As nothing is executed, only what is spelled out in the source is documented: signatures and
+annotations are shown as written, and classes only list the members they define themselves.
+"""
+
+import ast
+import builtins
+import os
+import pathlib
+import pkgutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+import pdocs.doc
+import pdocs.render
+import pdocs.static
+
+IMPORT = "import"
+AST = "ast"
+MODES = (IMPORT, AST)
+
+_Definition = Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]
+
+
+class SourceFile(NamedTuple):
+    """A Python source file making up (part of) a module."""
+
+    name: str
+    path: str
+    is_package: bool
+
+
+def as_markdown(
+    modules: list,
+    output_dir: str,
+    overwrite: bool = False,
+    exclude_source: bool = False,
+    template_dir: str = "",
+    jobs: int = 1,
+) -> str:
+    """Produces Markdown reference documentation for modules into output_dir, mirroring
+    `pdocs.as_markdown` without importing any of them.
+
+    Source files are parsed across `jobs` processes (`0` meaning one per CPU).
+    Returns the `output_dir` on success.
+    """
+    roots = [extract_module(module, jobs) for module in modules]
+    destination = pathlib.Path(output_dir)
+    if not overwrite and pdocs.static.would_overwrite(destination, roots):
+        raise FileExistsError(f"Rendering would overwrite files in {output_dir}, but overwrite is not set")
+    with _templates(template_dir):
+        pdocs.static.md_out(destination, roots, source=not exclude_source)
+    return output_dir
+
+
+@contextmanager
+def _templates(template_dir: str) -> Iterator[None]:
+    """Looks pdocs' templates up within template_dir first, if given, restoring pdocs' process
+    wide template lookup (and forgetting the templates it compiled meanwhile) on exit.
+    """
+    if not template_dir:
+        yield
+        return
+
+    lookup = pdocs.render.tpl_lookup
+    directories = list(lookup.directories)
+    lookup.directories.insert(0, template_dir)
+    lookup._collection.clear()
+    lookup._uri_cache.clear()
+    try:
+        yield
+    finally:
+        lookup.directories[:] = directories
+        lookup._collection.clear()
+        lookup._uri_cache.clear()
+
+
+def extract_module(spec: str, jobs: int = 1) -> "Module":
+    """Returns the documentation of the module (and its submodules) spec refers to, given either
+    as an import name or as a file path to a module or package.
+    """
+    source_files = module_files(spec)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(source_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(source_files))) as pool:
+            documented = list(pool.map(_parse, source_files, chunksize=max(1, len(source_files) // (jobs * 4))))
+    else:
+        documented = [_parse(source_file) for source_file in source_files]
+    return _link(documented)
+
+
+def module_files(spec: str) -> List[SourceFile]:
+    """Returns the source files of the module (or package) spec refers to, root module first,
+    without importing anything.
+    """
+    source_files = [locate(spec)]
+    for source_file in source_files:  # extended with the submodules of each package as they're found
+        if source_file.is_package:
+            source_files.extend(_submodules(os.path.dirname(source_file.path), source_file.name))
+    return source_files
+
+
+def module_sources(spec: str) -> List[str]:
+    """Returns every Python source file that makes up the module spec refers to, if it can be found."""
+    try:
+        return sorted(source_file.path for source_file in module_files(spec))
+    except ModuleNotFoundError:
+        return []
+
+
+def locate(spec: str) -> SourceFile:
+    """Returns the source file of the module (or package) spec refers to, without importing anything.
+    Raises `ModuleNotFoundError` if it has no source.
+    """
+    if os.sep in spec or (os.altsep and os.altsep in spec):
+        directory, file_name = os.path.split(spec)
+        search_path = [directory]
+        name = file_name[: -len(".py")] if file_name.endswith(".py") else file_name
+    else:
+        search_path = [path or os.getcwd() for path in sys.path if isinstance(path, str)]
+        name = spec
+
+    parts = name.split(".")
+    for path in search_path:
+        location = os.path.join(path, *parts)
+        if os.path.isfile(os.path.join(location, "__init__.py")):
+            return SourceFile(name, os.path.join(location, "__init__.py"), True)
+        if os.path.isfile(f"{location}.py"):
+            return SourceFile(name, f"{location}.py", False)
+        if os.path.isdir(location) and any(entry.endswith(".py") for entry in os.listdir(location)):
+            return SourceFile(name, os.path.join(location, "__init__.py"), True)  # namespace package
+    raise ModuleNotFoundError(f"No source found for module {spec}", name=spec)
+
+
+class Module(pdocs.doc.Doc):
+    """The documentation of a module, as extracted from its source."""
+
+    def __init__(self, source_file: SourceFile, tree: Optional[ast.Module], lines: List[str]):
+        super().__init__(source_file.name, None, ast.get_docstring(tree, clean=False) if tree else "")
+        self.module = self
+        self.path = source_file.path
+        self.is_package = source_file.is_package
+        self.is_namespace = tree is None
+        self.lines = lines
+        self.parent: Optional[Module] = None
+        self.submodules: List[Module] = []
+        self.doc: Dict[str, pdocs.doc.Doc] = {}
+        self.reexports: Dict[str, str] = {}
+        self.imports: Dict[str, str] = {}
+
+    @property
+    def source(self) -> List[str]:
+        return self.lines
+
+    @property
+    def refname(self) -> str:
+        return self.name
+
+    def variables(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Variable)
+
+    def classes(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Class)
+
+    def functions(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Function)
+
+    def allmodules(self) -> Iterable["Module"]:
+        yield self
+        for submodule in self.submodules:
+            yield from submodule.allmodules()
+
+
+class Class(pdocs.doc.Doc):
+    """The documentation of a class, as extracted from its definition."""
+
+    def __init__(self, node: ast.ClassDef, module: Module, bases: List[str]):
+        super().__init__(node.name, module, ast.get_docstring(node, clean=False) or "")
+        self.bases = bases
+        self.doc: Dict[str, pdocs.doc.Doc] = {}
+        self.doc_init: Dict[str, pdocs.doc.Doc] = {}
+        self.init_params = ["*args", "**kwargs"]
+        self.lines = _definition_source(node, module.lines)
+        self.index: Dict[str, "Class"] = {}
+        self.subclass_index: Dict[str, List["Class"]] = {}
+
+    @property
+    def source(self) -> List[str]:
+        return self.lines
+
+    @property
+    def refname(self) -> str:
+        return f"{self.module.refname}.{self.name}"
+
+    def class_variables(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Variable)
+
+    def instance_variables(self) -> list:
+        return pdocs.doc._filter(self.doc_init.values(), Variable)
+
+    def methods(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Function, attributes_set=("method",))
+
+    def functions(self) -> list:
+        return pdocs.doc._filter(self.doc.values(), Function, attributes_not_set=("method",))
+
+    def params(self) -> List[str]:
+        return self.init_params
+
+    def mro(self) -> list:
+        ancestors: List[pdocs.doc.Doc] = []
+        pending = list(self.bases)
+        while pending:
+            refname = pending.pop(0)
+            if refname in ("builtins.object", self.refname) or refname in [ancestor.refname for ancestor in ancestors]:
+                continue
+            documented = self.index.get(refname)
+            if documented is not None:
+                ancestors.append(documented)
+                pending.extend(documented.bases)
+            else:
+                ancestors.append(pdocs.doc.External(refname))
+                pending.extend(_builtin_bases(refname))
+        return ancestors
+
+    def subclasses(self) -> list:
+        return list(self.subclass_index.get(self.refname, []))
+
+
+class Function(pdocs.doc.Doc):
+    """The documentation of a function or method, as extracted from its definition."""
+
+    def __init__(
+        self,
+        node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
+        module: Module,
+        cls: Optional[Class] = None,
+        method: bool = False,
+        bound: bool = False,
+    ):
+        super().__init__(node.name, module, ast.get_docstring(node, clean=False) or "")
+        self.cls = cls
+        self.method = method
+        self.is_async = isinstance(node, ast.AsyncFunctionDef)
+        self.parameters = _params(node.args, skip_first=bound)
+        self.returns = ast.unparse(node.returns) if node.returns else ""
+        self.lines = _definition_source(node, module.lines)
+
+    @property
+    def source(self) -> List[str]:
+        return self.lines
+
+    @property
+    def refname(self) -> str:
+        return f"{(self.cls or self.module).refname}.{self.name}"
+
+    def funcdef(self) -> str:
+        return "async def" if self.is_async else "def"
+
+    def return_annotation(self) -> str:
+        return self.returns
+
+    def params(self) -> List[str]:
+        return self.parameters
+
+    def __lt__(self, other: Any) -> bool:
+        # __init__ first, as pdocs does
+        if "__init__" in (self.name, other.name):
+            return self.name != other.name and self.name == "__init__"
+        return self.name < other.name
+
+
+class Variable(pdocs.doc.Variable):
+    """The documentation of a module, class or instance variable."""
+
+
+def _submodules(package_dir: str, package_name: str) -> List[SourceFile]:
+    submodules = []
+    for module_info in pkgutil.iter_modules([package_dir]):
+        if module_info.name.startswith("_"):
+            continue
+        if module_info.ispkg:
+            path = os.path.join(package_dir, module_info.name, "__init__.py")
+        else:
+            path = os.path.join(package_dir, f"{module_info.name}.py")
+        if os.path.isfile(path):
+            submodules.append(SourceFile(f"{package_name}.{module_info.name}", path, module_info.ispkg))
+    return sorted(submodules)
+
+
+def _parse(source_file: SourceFile) -> Module:
+    if not os.path.isfile(source_file.path):  # namespace package
+        return Module(source_file, None, [])
+
+    with open(source_file.path, "rb") as source:
+        content = source.read()
+    tree = ast.parse(content, filename=source_file.path)
+    module = Module(source_file, tree, content.decode("utf8", errors="replace").splitlines(keepends=True))
+    module.imports = _imports(tree, source_file)
+
+    exported = _literal_assignment(tree, "__all__")
+    definitions = _definitions(tree.body)
+    for name, definition in definitions.items():
+        if not (name in exported if exported is not None else not name.startswith("_")):
+            continue
+        if isinstance(definition, ast.ClassDef):
+            module.doc[name] = _class(definition, module)
+        elif isinstance(definition, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            module.doc[name] = Function(definition, module)
+        else:
+            module.doc[name] = Variable(name, module, definition)
+    for name in exported or ():
+        if name not in module.doc:
+            module.reexports[name] = module.imports.get(name, "")
+
+    for refname, docstring in (_literal_assignment(tree, "__pdoc__") or {}).items():
+        _override(module, refname, docstring)
+    return module
+
+
+def _definitions(body: List[ast.stmt]) -> Dict[str, Any]:
+    """Returns the definitions within a module or class body: `def` and `class` statements, and
+    for variables their docstring, including those within `if` and `try` blocks.
+    """
+    definitions: Dict[str, Any] = {}
+    for index, node in enumerate(body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions.setdefault(node.name, node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if len(targets) == 1 and isinstance(targets[0], ast.Name):
+                following = body[index + 1] if index + 1 < len(body) else None
+                docstring = ""
+                if isinstance(following, ast.Expr) and isinstance(following.value, ast.Constant):
+                    docstring = following.value.value if isinstance(following.value.value, str) else ""
+                definitions.setdefault(targets[0].id, docstring)
+        elif isinstance(node, ast.If):
+            for name, definition in {**_definitions(node.body), **_definitions(node.orelse)}.items():
+                definitions.setdefault(name, definition)
+        elif isinstance(node, ast.Try):
+            blocks = [node.body, *(handler.body for handler in node.handlers), node.orelse, node.finalbody]
+            for block in blocks:
+                for name, definition in _definitions(block).items():
+                    definitions.setdefault(name, definition)
+    return definitions
+
+
+def _class(node: ast.ClassDef, module: Module) -> Class:
+    documented = Class(node, module, [_resolve(ast.unparse(base), module) for base in node.bases])
+    for name, member in _definitions(node.body).items():
+        if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            decorators = {ast.unparse(decorator) for decorator in member.decorator_list}
+            if name == "__init__":
+                init_params = _params(member.args)
+                documented.init_params = init_params[1:] if init_params[:1] == ["self"] else init_params
+            if name.startswith("_") or any(decorator.endswith((".setter", ".deleter")) for decorator in decorators):
+                continue
+            if decorators & {"property", "functools.cached_property", "cached_property"}:
+                documented.doc_init[name] = Variable(
+                    name, module, ast.get_docstring(member, clean=False) or "", cls=documented
+                )
+            else:
+                static = "staticmethod" in decorators
+                bound = "classmethod" in decorators
+                documented.doc[name] = Function(
+                    member, module, cls=documented, method=not (static or bound), bound=bound
+                )
+        elif not name.startswith("_"):
+            docstring = member if isinstance(member, str) else ""
+            documented.doc[name] = Variable(name, module, docstring, cls=documented)
+    return documented
+
+
+def _link(documented: List[Module]) -> Module:
+    """Connects the separately parsed modules into a tree, resolving re-exported names and the
+    relationships between classes.
+    """
+    modules = {module.name: module for module in documented}
+    definitions: Dict[str, pdocs.doc.Doc] = {}
+    for module in documented:
+        parent = modules.get(module.name.rsplit(".", 1)[0]) if "." in module.name else None
+        if parent is not None and parent is not module:
+            module.parent = parent
+            parent.submodules.append(module)
+        for name, doc in module.doc.items():
+            definitions[f"{module.name}.{name}"] = doc
+
+    for module in documented:
+        for name, refname in module.reexports.items():
+            module.doc[name] = definitions.get(refname) or Variable(name, module, "")
+
+    classes = {doc.refname: doc for doc in definitions.values() if isinstance(doc, Class)}
+    subclasses: Dict[str, List[Class]] = {}
+    for cls in classes.values():
+        for base in cls.bases:
+            subclasses.setdefault(base, []).append(cls)
+    for cls in classes.values():
+        cls.index = classes
+        cls.subclass_index = subclasses
+    return documented[0]
+
+
+def _override(module: Module, refname: str, docstring: Optional[str]) -> None:
+    owner: Union[Module, pdocs.doc.Doc] = module
+    *path, name = refname.split(".")
+    for part in path:
+        owner = getattr(owner, "doc", {}).get(part)  # type: ignore
+        if owner is None:
+            return
+    members = getattr(owner, "doc", {})
+    if docstring is None:
+        members.pop(name, None)
+        getattr(owner, "doc_init", {}).pop(name, None)
+    else:
+        documented = members.get(name) or getattr(owner, "doc_init", {}).get(name)
+        if documented is not None:
+            pdocs.doc.Doc.__init__(documented, documented.name, documented.module, docstring)
+
+
+def _imports(tree: ast.Module, source_file: SourceFile) -> Dict[str, str]:
+    package = source_file.name.split(".")
+    if not source_file.is_package:
+        package = package[:-1]
+
+    imports = {}
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    imports[alias.name.split(".")[0]] = alias.name.split(".")[0]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                base = ".".join(package[: len(package) - node.level + 1] + ([base] if base else []))
+            for alias in node.names:
+                imports[alias.asname or alias.name] = f"{base}.{alias.name}"
+    return imports
+
+
+def _resolve(expression: str, module: Module) -> str:
+    head, _, rest = expression.partition(".")
+    if head in module.imports:
+        return module.imports[head] + (f".{rest}" if rest else "")
+    if isinstance(getattr(builtins, head, None), type) and not rest:
+        return f"builtins.{head}"
+    return f"{module.name}.{expression}"
+
+
+def _builtin_bases(refname: str) -> List[str]:
+    module_name, _, name = refname.rpartition(".")
+    builtin = getattr(builtins, name, None) if module_name == "builtins" else None
+    if not isinstance(builtin, type):
+        return []
+    return [f"{base.__module__}.{base.__qualname__}" for base in builtin.__bases__]
+
+
+def _literal_assignment(tree: ast.Module, name: str) -> Any:
+    value = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == name for target in node.targets
+        ):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+        elif (
+            name == "__pdoc__"
+            and isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Subscript)
+            and isinstance(node.targets[0].value, ast.Name)
+            and node.targets[0].value.id == name
+        ):
+            try:
+                value = {**(value or {}), ast.literal_eval(node.targets[0].slice): ast.literal_eval(node.value)}
+            except ValueError:
+                continue
+    return value
+
+
+def _params(arguments: ast.arguments, skip_first: bool = False) -> List[str]:
+    """Formats parameters the way `inspect.Signature` does, as pdocs shows them."""
+    positional = arguments.posonlyargs + arguments.args
+    defaults: List[Optional[ast.expr]] = [None] * (len(positional) - len(arguments.defaults))
+    defaults += arguments.defaults
+    positional_only = len(arguments.posonlyargs)
+    if skip_first and positional:
+        positional, defaults, positional_only = positional[1:], defaults[1:], max(positional_only - 1, 0)
+
+    params = []
+    for index, (argument, default) in enumerate(zip(positional, defaults, strict=True)):
+        params.append(_param(argument, default))
+        if index + 1 == positional_only:
+            params.append("/")
+    if arguments.vararg:
+        params.append(f"*{_param(arguments.vararg)}")
+    elif arguments.kwonlyargs:
+        params.append("*")
+    for argument, default in zip(arguments.kwonlyargs, arguments.kw_defaults, strict=True):
+        params.append(_param(argument, default))
+    if arguments.kwarg:
+        params.append(f"**{_param(arguments.kwarg)}")
+    return params
+
+
+def _param(argument: ast.arg, default: Optional[ast.expr] = None) -> str:
+    formatted = argument.arg
+    if argument.annotation is not None:
+        formatted += f": {ast.unparse(argument.annotation)}"
+    if default is not None:
+        formatted += f" = {ast.unparse(default)}" if argument.annotation is not None else f"={ast.unparse(default)}"
+    return formatted
+
+
+def _definition_source(node: _Definition, lines: List[str]) -> List[str]:
+    start = min([node.lineno, *(decorator.lineno for decorator in node.decorator_list)])
+    return lines[start - 1 : node.end_lineno]
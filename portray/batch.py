@@ -0,0 +1,102 @@
+"""Defines building the documentation of many projects at once.
+
+Projects are built concurrently on a bounded pool of worker processes. Each worker builds
+many projects in turn, so MkDocs, pdocs, the theme and validated configurations are only
+imported and prepared once per worker rather than once per project.
+"""
+
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from glob import glob
+from typing import Any, Dict, Iterable, List
+
+from portray import config, render, timing
+
+
+def projects(patterns: Iterable[str]) -> List[str]:
+    """Returns the project directories matched by the given directories or glob patterns,
+    in the order given and without duplicates.
+    """
+    directories: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob(pattern, recursive=True)) if any(char in pattern for char in "*?[") else [pattern]
+        for match in matches:
+            directory = os.path.abspath(match)
+            if os.path.isdir(directory) and directory not in directories:
+                directories.append(directory)
+    return directories
+
+
+def build(
+    directories: Iterable[str],
+    config_file: str = "pyproject.toml",
+    output_dir: str = "site",
+    overwrite: bool = False,
+    workers: int = 0,
+) -> List[Dict[str, Any]]:
+    """Builds the documentation of every project directory, returning a report per project.
+
+    - *output_dir*: Where to place each projects documentation, relative to the project.
+    - *workers*: The number of projects to build concurrently (`0` uses one per CPU).
+    """
+    directories = list(directories)
+    workers = workers or os.cpu_count() or 1
+    arguments = [(directory, config_file, output_dir, overwrite) for directory in directories]
+    if workers == 1 or len(directories) <= 1:
+        _initialize()
+        return [_build(*project) for project in arguments]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(directories)), initializer=_initialize) as executor:
+        return list(executor.map(_build, *zip(*arguments, strict=True)))
+
+
+def table(results: List[Dict[str, Any]]) -> str:
+    """Returns the report of a batch build formatted as a plain text table."""
+    rows = [("Project", "Result", "Seconds")]
+    for result in results:
+        status = "ok" if result["ok"] else f"failed: {result['error']}"
+        rows.append((result["directory"], status, f"{result['seconds']:.3f}"))
+    failed = sum(1 for result in results if not result["ok"])
+    rows.append((f"{len(results)} projects", f"{len(results) - failed} ok, {failed} failed", ""))
+
+    width = max(len(row[0]) for row in rows)
+    return "\n".join(f"{row[0].ljust(width)}  {row[2].rjust(8)}  {row[1]}".rstrip() for row in rows)
+
+
+def _initialize() -> None:
+    render.keep_warm()
+
+
+def _build(directory: str, config_file: str, output_dir: str, overwrite: bool) -> Dict[str, Any]:
+    """Builds one project as if `portray as-html` was ran from within its directory."""
+    result: Dict[str, Any] = {
+        "directory": directory,
+        "output_dir": os.path.join(directory, output_dir),
+        "ok": False,
+    }
+    output = io.StringIO()
+    working_directory = os.getcwd()
+    python_path = list(sys.path)
+    started = time.perf_counter()
+    try:
+        os.chdir(directory)
+        with redirect_stdout(output), redirect_stderr(output), timing.record() as timings:
+            project_config = config.project(directory, config_file, output_dir=result["output_dir"])
+            project_config["jobs"] = 1  # projects, rather than their modules, are built in parallel
+            render.documentation(project_config, overwrite=overwrite)
+        result["ok"] = True
+        result["phases"] = timings.as_dict()["phases"]
+    except (Exception, SystemExit) as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["output"] = output.getvalue()
+    finally:
+        os.chdir(working_directory)
+        sys.path[:] = python_path
+        render.forget_modules(directory)
+
+    result["seconds"] = time.perf_counter() - started
+    return result
@@ -0,0 +1,154 @@
+"""Defines `portray`'s build performance benchmark.
+
+A synthetic project of configurable size (modules x functions, Markdown pages and media
+files) is generated and documented repeatedly, timing each phase of the build. The results
+are returned as JSON serializable data so they can be compared between `portray` versions.
+"""
+
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from portray import config, render, timing
+from portray._version import __version__
+
+PACKAGE_NAME = "portray_benchmark_project"
+
+MODULE_TEMPLATE = '''"""Synthetic module {module} generated by the portray benchmark."""
+
+
+'''
+
+FUNCTION_TEMPLATE = '''def function_{function}(first: int, second: str = "default") -> str:
+    """Synthetic function {function} of module {module}.
+
+    - *first*: The first argument.
+    - *second*: The second argument.
+    """
+    return f"{{first}} {{second}}"
+
+
+'''
+
+PAGE_TEMPLATE = """# Synthetic Page {page}
+
+Synthetic documentation page {page} generated by the portray benchmark.
+
+## Section
+
+Some text with `inline code` and a list:
+
+- one
+- two
+- three
+
+```python
+print("page {page}")
+```
+"""
+
+
+def synthetic_project(
+    directory: str,
+    modules: int = 10,
+    functions: int = 10,
+    pages: int = 10,
+    media_files: int = 0,
+    media_size: int = 1024 * 1024,
+) -> str:
+    """Generates a synthetic project within directory, returning the projects root folder.
+
+    - *modules*: The number of Python modules to generate reference documentation for.
+    - *functions*: The number of documented functions within each module.
+    - *pages*: The number of Markdown pages within the projects `docs` directory.
+    - *media_files*: The number of files within the projects `images` directory.
+    - *media_size*: The size, in bytes, of each media file.
+    """
+    project_dir = os.path.join(directory, PACKAGE_NAME)
+    package_dir = os.path.join(project_dir, PACKAGE_NAME)
+    docs_dir = os.path.join(project_dir, "docs")
+    media_dir = os.path.join(project_dir, "images")
+    for folder in (package_dir, docs_dir, media_dir):
+        os.makedirs(folder, exist_ok=True)
+
+    with open(os.path.join(project_dir, "pyproject.toml"), "w") as pyproject:
+        pyproject.write(f'[tool.portray]\nmodules = ["{PACKAGE_NAME}"]\n')
+    with open(os.path.join(project_dir, "README.md"), "w") as readme:
+        readme.write(f"# {PACKAGE_NAME}\n\nA synthetic project generated by the portray benchmark.\n")
+
+    with open(os.path.join(package_dir, "__init__.py"), "w") as package_init:
+        package_init.write('"""Synthetic package generated by the portray benchmark."""\n')
+    for module in range(modules):
+        with open(os.path.join(package_dir, f"module_{module}.py"), "w") as module_file:
+            module_file.write(MODULE_TEMPLATE.format(module=module))
+            for function in range(functions):
+                module_file.write(FUNCTION_TEMPLATE.format(module=module, function=function))
+
+    for page in range(pages):
+        with open(os.path.join(docs_dir, f"page_{page}.md"), "w") as page_file:
+            page_file.write(PAGE_TEMPLATE.format(page=page))
+
+    for media_file in range(media_files):
+        with open(os.path.join(media_dir, f"media_{media_file}.bin"), "wb") as media:
+            media.write(os.urandom(media_size))
+
+    return project_dir
+
+
+def run(
+    modules: int = 10,
+    functions: int = 10,
+    pages: int = 10,
+    media_files: int = 0,
+    media_size: int = 1024 * 1024,
+    repeat: int = 3,
+    **overrides,
+) -> Dict[str, Any]:
+    """Builds a synthetic project `repeat` times, returning the measurements of each build phase
+    along with the median wall time of each phase across builds.
+
+    Any additional keyword arguments override the synthetic projects `portray` configuration.
+    """
+    runs: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        project_dir = synthetic_project(directory, modules, functions, pages, media_files, media_size)
+        output_dir = os.path.join(directory, "site")
+        for _ in range(repeat):
+            # ensure every run pays the cost of importing the documented modules
+            for loaded in [name for name in sys.modules if name.split(".")[0] == PACKAGE_NAME]:
+                del sys.modules[loaded]
+
+            project_config = config.project(project_dir, "pyproject.toml", output_dir=output_dir, **overrides)
+            started = time.perf_counter()
+            with timing.record() as timings:
+                render.documentation(project_config, overwrite=True)
+            runs.append({"total": time.perf_counter() - started, "phases": timings.as_dict()["phases"]})
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    phases = sorted({name for build in runs for name in build["phases"]})
+    return {
+        "portray": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "project": {
+            "modules": modules,
+            "functions": functions,
+            "pages": pages,
+            "media_files": media_files,
+            "media_size": media_size,
+        },
+        "overrides": overrides,
+        "runs": runs,
+        "median": {
+            "total": statistics.median(build["total"] for build in runs),
+            "phases": {
+                name: statistics.median(build["phases"].get(name, {}).get("wall", 0.0) for build in runs)
+                for name in phases
+            },
+        },
+    }
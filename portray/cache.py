@@ -0,0 +1,125 @@
+"""Defines the persistent on-disk build cache `portray` uses to avoid redoing work between builds.
+
+The cache lives in the projects `cache_dir` (`.portray_cache` by default) and holds the staged
+Markdown input, the previously built site, and a manifest of the fingerprints used to build them.
+"""
+
+import filecmp
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Set
+
+MANIFEST_FILE = "manifest.json"
+
+
+def directory(config: dict) -> str:
+    """Returns the absolute location of the build cache for the given project config."""
+    return os.path.join(config["directory"], config["cache_dir"])
+
+
+def file_digest(path: str) -> str:
+    """Returns a content hash of the file at the given path."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def digest(*values: Any) -> str:
+    """Returns a stable hash of any JSON serializable values (falling back to `str` otherwise)."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode("utf8")).hexdigest()
+
+
+def module_sources(module: str) -> List[str]:
+    """Returns every Python source file that makes up the given module (or package)."""
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        if os.path.exists(module):
+            location = module
+        else:
+            return []
+    elif spec.submodule_search_locations:
+        location = list(spec.submodule_search_locations)[0]
+    elif spec.origin and os.path.isfile(spec.origin):
+        return [spec.origin]
+    else:
+        return []
+
+    if os.path.isfile(location):
+        return [location]
+
+    sources = []
+    for root, dirs, files in os.walk(location):
+        dirs[:] = sorted(folder for folder in dirs if folder != "__pycache__")
+        sources.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".py"))
+    return sources
+
+
+def load_manifest(cache_dir: str) -> Dict[str, Any]:
+    """Returns the manifest stored within the given cache directory (or an empty one)."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(cache_dir: str, manifest: Dict[str, Any]) -> None:
+    """Persists the given manifest within the cache directory."""
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, MANIFEST_FILE), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def sync_file(source: str, destination: str) -> bool:
+    """Copies source to destination only if their content differs, leaving the destination's
+    modification time untouched otherwise. Returns `True` if the destination was written to.
+    """
+    if os.path.isfile(destination) and filecmp.cmp(source, destination, shallow=False):
+        return False
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.copyfile(source, destination)
+    return True
+
+
+def sync_tree(source_dir: str, destination_dir: str) -> Set[str]:
+    """Makes destination_dir mirror source_dir, only writing files whose content changed and
+    removing files that no longer exist in the source.
+
+    Returns the set of relative paths that were written or removed.
+    """
+    changed = set()
+    expected = set()
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), source_dir)
+            expected.add(relative)
+            if sync_file(os.path.join(source_dir, relative), os.path.join(destination_dir, relative)):
+                changed.add(relative)
+
+    changed.update(remove_stale(destination_dir, expected))
+    return changed
+
+
+def remove_stale(root_dir: str, expected: Set[str]) -> Set[str]:
+    """Removes every file under root_dir whose relative path isn't expected, pruning any
+    directories left empty. Returns the set of removed relative paths.
+    """
+    removed = set()
+    for root, _, files in os.walk(root_dir, topdown=False):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), root_dir)
+            if relative not in expected:
+                os.remove(os.path.join(root, name))
+                removed.add(relative)
+        if root != root_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
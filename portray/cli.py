@@ -5,19 +5,23 @@ type-annotated CLI interface while maintaining 1:1 compatibility with the progra
 definition in the [API module](/reference/portray/api)
 
 - `portray as-html`: Renders the project as HTML into the `site` or other specified output directory
+- `portray as-html-many`: Renders many projects as HTML at once, reporting on each
 - `portray in-browser`: Runs a server with the rendered documentation pointing a browser to it
 - `portray server`: Starts a local development server (by default at localhost:8000)
 - `portray project-configuration`: Returns back the project configuration as determined by` portray`
 - `portray on-github-pages`: Regenerates and deploys the documentation to GitHub pages
+- `portray daemon`: Runs a resident build daemon that keeps `as-html` builds warm
+- `portray bench`: Benchmarks portray's build phases against a generated synthetic project
 """
 
+import json
 import sys
 from pprint import pprint
 from typing import List, Optional
 
 import typer
 
-from portray import api, logo
+from portray import api, daemon, exceptions, logo, timing
 from portray._version import __version__
 
 
@@ -65,6 +69,11 @@ def main(
 
 
 opt_modules = typer.Option(None, help="One or more modules to render reference documentation for")
+opt_jobs = typer.Option(
+    None,
+    help="The number of processes to generate reference documentation with (0 uses one per CPU).",
+)
+arg_directories = typer.Argument(..., help="The root folders of the projects, or glob patterns.")
 
 
 @app.command()
@@ -77,21 +86,69 @@ def as_html(
         help="If set to True any existing documentation output will be removed before generating new documentation.",
     ),
     modules: Optional[List[str]] = opt_modules,
+    incremental: bool = typer.Option(
+        False,
+        help="If set only pages whose inputs changed since the last build are regenerated, using the build cache.",
+    ),
+    jobs: Optional[int] = opt_jobs,
+    timings: bool = typer.Option(False, help="If set the time spent within each phase of the build is printed."),
+    profile: str = typer.Option("", help="If set a cProfile profile of the build is written to this path."),
+    use_daemon: bool = typer.Option(
+        True, "--daemon/--no-daemon", help="If set the build is sent to a running `portray daemon`, when there is one."
+    ),
 ) -> None:
     """Produce HTML documentation for a Python project placing it into output_dir."""
-    api.as_html(
-        directory=directory,
-        config_file=config_file,
-        output_dir=output_dir,
-        overwrite=overwrite,
-        modules=modules,
-    )
+    arguments = {
+        "directory": directory,
+        "config_file": config_file,
+        "output_dir": output_dir,
+        "overwrite": overwrite,
+        "modules": modules,
+        "incremental": incremental,
+        "jobs": jobs,
+        "profile": profile,
+    }
+    measured = None
+    if use_daemon:
+        try:
+            measured = daemon.request("as_html", arguments)
+        except exceptions.DaemonUnavailable:
+            pass  # no daemon running, build in-process
+    if measured is None:
+        measured = api.as_html(**arguments)  # type: ignore
+    if timings:
+        print(timing.table(measured))
 
 
 # Add alias for as-html
 app.command(name="as-html")(as_html)
 
 
+@app.command(name="as-html-many")
+def as_html_many(
+    directories: List[str] = arg_directories,
+    config_file: str = typer.Option("pyproject.toml", help="The TOML formatted config file each project uses."),
+    output_dir: str = typer.Option("site", help="The directory, relative to each project, to place its HTML into."),
+    overwrite: bool = typer.Option(
+        False,
+        help="If set to True any existing documentation output will be removed before generating new documentation.",
+    ),
+    workers: int = typer.Option(0, help="The number of projects to build concurrently (0 uses one per CPU)."),
+    report: str = typer.Option("", help="If given, a file path to write the per project report to as JSON."),
+) -> None:
+    """Produce HTML documentation for many Python projects, building them concurrently."""
+    results = api.as_html_many(
+        directories=directories,
+        config_file=config_file,
+        output_dir=output_dir,
+        overwrite=overwrite,
+        workers=workers,
+        report=report,
+    )
+    if not all(result["ok"] for result in results):
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def project_configuration(
     directory: str = typer.Argument("", help="The root folder of your project."),
@@ -125,6 +182,14 @@ def server(
     host: Optional[str] = typer.Option(None, help="The host to expose your documentation on (defaults to 127.0.0.1)"),
     modules: Optional[List[str]] = opt_modules,
     reload: bool = typer.Option(False, help="If true the server will live load any changes"),
+    jobs: Optional[int] = opt_jobs,
+    production: bool = typer.Option(
+        False, help="If true a production grade static server, for many concurrent users, is used instead."
+    ),
+    workers: int = typer.Option(0, help="The number of processes the production server uses (0 uses one per CPU)."),
+    lazy: bool = typer.Option(
+        False, help="If true pages are rendered as they're requested, with the rest rendered in the background."
+    ),
 ) -> None:
     """Run a development webserver enabling you to browse documentation locally."""
     api.server(
@@ -135,6 +200,10 @@ def server(
         host=host,
         modules=modules,
         reload=reload,
+        jobs=jobs,
+        production=production,
+        workers=workers,
+        lazy=lazy,
     )
 
 
@@ -146,9 +215,18 @@ def in_browser(
     host: Optional[str] = typer.Option(None, help="The host to expose your documentation on (defaults to 127.0.0.1)"),
     modules: Optional[List[str]] = opt_modules,
     reload: bool = typer.Option(False, help="If true the server will live load any changes"),
+    jobs: Optional[int] = opt_jobs,
 ) -> None:
     """Open your default web browser to a locally started development webserver."""
-    api.in_browser(directory=directory, config_file=config_file, port=port, host=host, modules=modules, reload=reload)
+    api.in_browser(
+        directory=directory,
+        config_file=config_file,
+        port=port,
+        host=host,
+        modules=modules,
+        reload=reload,
+        jobs=jobs,
+    )
 
 
 # Add alias for in-browser
@@ -182,5 +260,36 @@ def on_github_pages(
 app.command(name="on-github-pages")(on_github_pages)
 
 
+@app.command(name="daemon")
+def run_daemon(
+    socket_path: str = typer.Option("", help="The Unix socket to listen on (defaults to a per user socket)."),
+) -> None:
+    """Run a resident build daemon that `as-html` sends its builds to, keeping them warm."""
+    api.daemon(socket_path=socket_path)
+
+
+@app.command()
+def bench(
+    module_count: int = typer.Option(10, help="The number of Python modules in the synthetic project."),
+    function_count: int = typer.Option(10, help="The number of documented functions within each module."),
+    page_count: int = typer.Option(10, help="The number of Markdown documentation pages."),
+    media_count: int = typer.Option(0, help="The number of media files within the projects images directory."),
+    media_size: int = typer.Option(1024 * 1024, help="The size, in bytes, of each media file."),
+    repeat: int = typer.Option(3, help="The number of times to build the synthetic project."),
+    output: str = typer.Option("", help="A file path to write the results to as JSON."),
+) -> None:
+    """Benchmark portray's build phases against a generated synthetic project."""
+    results = api.bench(
+        module_count=module_count,
+        function_count=function_count,
+        page_count=page_count,
+        media_count=media_count,
+        media_size=media_size,
+        repeat=repeat,
+        output=output,
+    )
+    print(json.dumps(results, indent=2))
+
+
 if __name__ == "__main__":
     app()
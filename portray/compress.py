@@ -0,0 +1,133 @@
+"""Defines the optional post-build stage writing precompressed sidecars for a built site.
+
+Every compressible asset above a size threshold gets a `.gz` sidecar (and a `.br` one when the
+`brotli` package is installed), which web servers such as nginx (`gzip_static`) can serve
+directly instead of compressing on the fly. Compressed output is kept in a content addressed
+store within the build cache, so only files whose content changed since the last build are
+compressed again, and those are compressed in parallel across all cores.
+"""
+
+import gzip
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from portray import staging
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".map", ".svg", ".txt", ".xml")
+GZIP = ("gzip", ".gz")
+BROTLI = ("br", ".br")
+
+
+def encodings() -> List[Tuple[str, str]]:
+    """Returns the (content encoding, sidecar extension) pairs available, most efficient first."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return [GZIP]
+    return [BROTLI, GZIP]
+
+
+def sidecars(site_dir: str, store_dir: str, min_size: int = 1024, jobs: int = 0) -> Dict[str, int]:
+    """Writes precompressed sidecars next to every compressible file of site_dir at least
+    min_size bytes large, reusing the compressed output kept in store_dir whenever the files
+    content is unchanged.
+
+    Returns counts of the `compressed` and `reused` sidecars, along with the `size` of the
+    compressed sidecars in bytes.
+    """
+    available = encodings()
+    pending: Dict[str, Tuple[str, str]] = {}
+    sidecar_sources: List[Tuple[str, str]] = []
+    for root, _, files in os.walk(site_dir):
+        for file_name in files:
+            if not file_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, file_name)
+            if os.path.getsize(path) < min_size:
+                for _, extension in available:
+                    if os.path.isfile(path + extension):
+                        os.remove(path + extension)  # left over from when the file was larger
+                continue
+
+            with open(path, "rb") as source:
+                content_digest = hashlib.sha256(source.read()).hexdigest()
+            for encoding, extension in available:
+                stored = os.path.join(store_dir, content_digest[:2], content_digest + extension)
+                if not os.path.isfile(stored):
+                    pending[stored] = (path, encoding)
+                sidecar_sources.append((path, stored))
+
+    os.makedirs(store_dir, exist_ok=True)
+    work = [(source, encoding, stored) for stored, (source, encoding) in pending.items()]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as executor:
+            list(executor.map(_compress, *zip(*work, strict=True), chunksize=max(1, len(work) // (jobs * 4))))
+    else:
+        for arguments in work:
+            _compress(*arguments)
+
+    stats = {
+        "compressed": len(work),
+        "reused": len(sidecar_sources) - len(work),
+        "size": sum(os.path.getsize(stored) for stored in pending),
+    }
+    used = set()
+    for path, stored in sidecar_sources:
+        used.add(stored)
+        sidecar = path + os.path.splitext(stored)[1]
+        if os.path.getsize(stored) < os.path.getsize(path):
+            if not staging.is_current(stored, sidecar):
+                staging.stage_file(stored, sidecar, staging.HARDLINK)
+        elif os.path.lexists(sidecar):  # compression doesn't pay off
+            os.remove(sidecar)
+
+    _prune(store_dir, used)
+    return stats
+
+
+def sidecar(path: str, accept_encoding: str, compressed_html: bool = True) -> Optional[Tuple[str, str]]:
+    """Returns the (sidecar path, content encoding) to serve for path given the requests
+    `Accept-Encoding` header, or `None` if the file should be served as is.
+    """
+    if not compressed_html and path.endswith(".html"):
+        return None
+
+    accepted = set()
+    for token in accept_encoding.split(","):
+        encoding, _, parameters = token.strip().partition(";")
+        quality = parameters.strip()
+        if not (quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000")):
+            accepted.add(encoding.strip().lower())
+
+    for encoding, extension in (BROTLI, GZIP):
+        if (encoding in accepted or "*" in accepted) and os.path.isfile(path + extension):
+            return path + extension, encoding
+    return None
+
+
+def _compress(source: str, encoding: str, stored: str) -> None:
+    with open(source, "rb") as source_file:
+        content = source_file.read()
+    if encoding == BROTLI[0]:
+        import brotli
+
+        compressed = brotli.compress(content, quality=11)
+    else:
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+    os.makedirs(os.path.dirname(stored), exist_ok=True)
+    partial = f"{stored}.{os.getpid()}.partial"
+    with open(partial, "wb") as stored_file:
+        stored_file.write(compressed)
+    os.replace(partial, stored)
+
+
+def _prune(store_dir: str, used: set) -> None:
+    for root, _, files in os.walk(store_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if path not in used:
+                os.remove(path)
@@ -2,17 +2,18 @@
 
 import _ast
 import ast
+import copy
 import os
 import re
 import warnings
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import mkdocs.config as _mkdocs_config  # noqa
-import mkdocs.exceptions as _mkdocs_exceptions  # noqa
-from git import Repo
 from toml import load as toml_load
 
+from portray import gitconfig, listings, navigation, search
+from portray.cache import digest
 from portray.exceptions import NoProjectFound
 
 PORTRAY_DEFAULTS = {
@@ -25,11 +26,27 @@ PORTRAY_DEFAULTS = {
     "include_reference_documentation": True,
     "labels": {"Cli": "CLI", "Api": "API", "Http": "HTTP", "Pypi": "PyPI"},
     "extra_markdown_extensions": [],
+    "incremental": False,
+    "cache_dir": ".portray_cache",
+    "jobs": 1,
+    "staging": "copy",
+    "publish": "replace",
+    "reload_quiet_period": 0.5,
+    "compress": False,
+    "compress_min_size": 1024,
+    "search_shards": False,
+    "collapsed_nav": False,
+    "reference_isolation": False,
+    "reference_timeout": 600,
+    "reference_memory_limit": 0,
+    "reference_worker_modules": 10,
+    "lazy_cache_pages": 256,
+    "markdown_cache": False,
+    "highlight_cache": False,
+    "highlight_cache_size": 256,
 }
 
 MKDOCS_DEFAULTS: Dict[str, Any] = {
-    "site_name": os.path.basename(os.getcwd()),
-    "config_file_path": os.getcwd(),
     "theme": {
         "name": "material",
         "palette": {"primary": "green", "accent": "lightgreen"},
@@ -46,11 +63,54 @@ MKDOCS_DEFAULTS: Dict[str, Any] = {
 
 PDOCS_DEFAULTS: Dict = {"overwrite": True, "exclude_source": False}
 
+PROJECT_CACHE_SIZE = 64
+_project_cache: Dict[str, Tuple[tuple, List[str], dict]] = {}
+_repository_cache: Dict[str, Tuple[List[str], tuple, Dict[str, Optional[str]]]] = {}
+_repository_files: ContextVar[Optional[List[str]]] = ContextVar("portray_repository_files", default=None)
+
 
 def project(directory: str, config_file: str, **overrides) -> dict:
     """Returns back the complete configuration - including all sub configuration components
     defined below that `portray` was able to determine for the project
+
+    Resolved configurations are cached, only being recomputed once one of their input files
+    (the config file, `setup.py` or any of the git config files read, includes and worktree
+    config included) changes. Each call returns its own copy.
     """
+    key = digest(os.path.abspath(directory), config_file, os.getcwd(), overrides)
+    cached = _project_cache.get(key)
+    if cached is None or cached[0] != _project_fingerprint(directory, config_file, cached[1]):
+        if cached is None and len(_project_cache) >= PROJECT_CACHE_SIZE:
+            del _project_cache[next(iter(_project_cache))]
+        read_files: List[str] = []
+        token = _repository_files.set(read_files)
+        try:
+            project_config = _project(directory, config_file, **overrides)
+        finally:
+            _repository_files.reset(token)
+        fingerprint = _project_fingerprint(directory, config_file, read_files)
+        cached = _project_cache[key] = (fingerprint, read_files, project_config)
+
+    return copy.deepcopy(cached[2])
+
+
+def _project_fingerprint(directory: str, config_file: str, read_files: Iterable[str]) -> tuple:
+    paths = (config_file, "setup.py", ".git", os.path.join(".git", "config"))
+    return _fingerprint([*(os.path.join(directory, path) for path in paths), *read_files])
+
+
+def _fingerprint(paths: Iterable[str]) -> tuple:
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except (OSError, ValueError):
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def _project(directory: str, config_file: str, **overrides) -> dict:
     if not (
         os.path.isfile(os.path.join(directory, config_file))
         or os.path.isfile(os.path.join(directory, "setup.py"))
@@ -71,6 +131,12 @@ def project(directory: str, config_file: str, **overrides) -> dict:
     mkdocs_config = project_config.get("mkdocs", {})
     mkdocs_config.setdefault("extra_markdown_extensions", project_config.get("extra_markdown_extensions", []))
     project_config["mkdocs"] = mkdocs(directory, **mkdocs_config)
+    if project_config["collapsed_nav"]:
+        # read by portray's theme overrides
+        project_config["mkdocs"]["extra"] = {**project_config["mkdocs"].get("extra", {}), navigation.THEME_FLAG: True}
+    if project_config["search_shards"]:
+        # read by portray's theme overrides
+        project_config["mkdocs"]["extra"] = {**project_config["mkdocs"].get("extra", {}), search.THEME_FLAG: True}
     if "pdoc3" in project_config:
         warnings.warn(
             "pdoc3 config usage is deprecated in favor of pdocs. " "pdoc3 section will be ignored. ",
@@ -78,6 +144,9 @@ def project(directory: str, config_file: str, **overrides) -> dict:
             stacklevel=1,
         )
     project_config["pdocs"] = pdocs(directory, **project_config.get("pdocs", {}))
+    if project_config["pdocs"].get("split_source"):
+        # read by portray's theme overrides
+        project_config["mkdocs"]["extra"] = {**project_config["mkdocs"].get("extra", {}), listings.THEME_FLAG: True}
     return project_config
 
 
@@ -151,10 +220,33 @@ def repository(
 ) -> Dict[str, Optional[str]]:
     """Returns back any information that can be determined by introspecting the projects git repo
     (if there is one).
+
+    Results are cached per repository until one of the git config files they were read from changes.
     """
+    key = digest(os.path.abspath(directory), repo_url, repo_name, edit_uri, normalize_repo_url)
+    cached = _repository_cache.get(key)
+    if cached is None or _fingerprint(cached[0]) != cached[1]:
+        read_files: List[str] = []
+        repository_config = _repository(directory, repo_url, repo_name, edit_uri, normalize_repo_url, read_files)
+        cached = _repository_cache[key] = (read_files, _fingerprint(read_files), repository_config)
+
+    project_files = _repository_files.get()
+    if project_files is not None:  # resolving a project, whose cache is invalidated along with these files
+        project_files.extend(cached[0])
+    return dict(cached[2])
+
+
+def _repository(
+    directory: str,
+    repo_url: Optional[str],
+    repo_name: Optional[str],
+    edit_uri: Optional[str],
+    normalize_repo_url: bool,
+    read_files: List[str],
+) -> Dict[str, Optional[str]]:
     try:
         if repo_url is None:
-            repo_url = Repo(directory).remotes.origin.url
+            repo_url = _origin_url(directory, read_files)
         if repo_name is None:
             match = re.search(r"(:(//)?)([\w\.@\:/\-~]+)(\.git)?(/)?", repo_url)
             if match:
@@ -195,9 +287,28 @@ def repository(
         return {}
 
 
+def _origin_url(directory: str, read_files: List[str]) -> str:
+    """Returns the URL of the repositories `origin` remote, reading the git config directly and
+    only falling back to GitPython (which spawns `git`) when that isn't enough.
+    """
+    repo_url = gitconfig.remote_url(directory, "origin", read_files)
+    if repo_url is None:
+        if gitconfig.git_dir(directory) is None and "GIT_DIR" not in os.environ:
+            raise ValueError(f"No git repository found in {directory}")
+
+        from git import Repo  # imported lazily as GitPython is slow to import
+
+        read_files.append(os.path.expanduser("~/.gitconfig"))
+        repo_url = Repo(directory).remotes.origin.url
+    return repo_url
+
+
 def mkdocs(directory: str, **overrides) -> dict:
     """Returns back the configuration that will be used when running mkdocs"""
     mkdocs_config: Dict[str, Any] = {
+        # determined on every call, as long running processes build projects from many directories
+        "site_name": os.path.basename(os.getcwd()),
+        "config_file_path": os.getcwd(),
         **MKDOCS_DEFAULTS,
         **repository(directory, **overrides),
         **overrides,
@@ -0,0 +1,156 @@
+"""Defines `portray daemon`: a resident build server that keeps MkDocs, pdocs, the theme and
+validated configurations warm between builds.
+
+The daemon listens on a local Unix socket and accepts one build request at a time, each a
+single line of JSON answered by a single line of JSON:
+
+    {"command": "as_html", "cwd": "/path/to/project", "arguments": {"overwrite": true}}
+
+`portray as-html` sends its builds to a running daemon, building in-process otherwise.
+Modules imported from a project are discarded after each of its builds so that reference
+documentation always reflects the projects current source.
+"""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict
+
+from portray import exceptions
+
+SOCKET_ENVIRONMENT_VARIABLE = "PORTRAY_DAEMON_SOCKET"
+COMMANDS = ("as_html",)
+
+
+def default_socket_path() -> str:
+    """Returns the socket used when none is given: `$PORTRAY_DAEMON_SOCKET` if set, otherwise
+    a per user socket within the runtime (or temporary) directory.
+    """
+    if os.environ.get(SOCKET_ENVIRONMENT_VARIABLE):
+        return os.environ[SOCKET_ENVIRONMENT_VARIABLE]
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return os.path.join(runtime_dir, f"portray-{user}.sock")
+
+
+def request(command: str, arguments: Dict[str, Any], socket_path: str = "") -> Any:
+    """Runs an `api` command within the daemon, on behalf of the current working directory,
+    printing its output and returning its result.
+
+    Raises `DaemonUnavailable` if no daemon is listening, or the socket isn't owned by the
+    current user, allowing callers to fall back to running the command in-process.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+        raise exceptions.DaemonUnavailable(socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            if hasattr(os, "getuid") and os.stat(socket_path).st_uid != os.getuid():
+                # possibly created by another user, expecting to receive our builds
+                raise exceptions.DaemonUnavailable(socket_path)
+            connection.connect(socket_path)
+        except OSError as error:
+            raise exceptions.DaemonUnavailable(socket_path) from error
+
+        message = {"command": command, "cwd": os.getcwd(), "arguments": arguments}
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(message).encode("utf8") + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline() or b'{"error": "DaemonBuildFailed"}')
+
+    if response.get("output"):
+        print(response["output"], end="")
+    if "error" in response:
+        error_class = getattr(exceptions, response["error"], None)
+        if isinstance(error_class, type) and issubclass(error_class, exceptions.PortrayError):
+            if "directory" in response:
+                raise error_class(response["directory"])
+        raise exceptions.DaemonBuildFailed(response.get("message", "The daemon closed the connection"))
+    return response["result"]
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serves build requests one at a time, as builds change the working directory."""
+
+    def __init__(self, socket_path: str):
+        from portray import api, render  # imported up front so requests find them warm
+
+        render.keep_warm()
+        self.api = api
+        self.render = render
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def run(self, command: str, cwd: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if command not in COMMANDS:
+            return {"error": "DaemonBuildFailed", "message": f"Unknown command '{command}'"}
+
+        output = io.StringIO()
+        working_directory = os.getcwd()
+        python_path = list(sys.path)
+        response: Dict[str, Any] = {}
+        try:
+            os.chdir(cwd)
+            with redirect_stdout(output), redirect_stderr(output):
+                response["result"] = getattr(self.api, command)(**arguments)
+        except (Exception, SystemExit) as error:
+            traceback.print_exc(file=output)
+            response["error"] = type(error).__name__
+            response["message"] = str(error)
+            if hasattr(error, "directory"):
+                response["directory"] = error.directory  # type: ignore
+        finally:
+            os.chdir(working_directory)
+            sys.path[:] = python_path
+            self.render.forget_modules(os.path.join(cwd, arguments.get("directory", "")))
+
+        response["output"] = output.getvalue()
+        return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return  # a liveness check
+
+        message = json.loads(line)
+        response = self.server.run(message["command"], message["cwd"], message.get("arguments", {}))
+        self.wfile.write(json.dumps(response, default=str).encode("utf8") + b"\n")
+
+
+def serve(socket_path: str = "") -> None:
+    """Runs the daemon until interrupted, replacing any stale socket left by a previous one."""
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        if _listening(socket_path):
+            raise exceptions.DaemonBuildFailed(f"A portray daemon is already listening on '{socket_path}'")
+        os.remove(socket_path)
+
+    with DaemonServer(socket_path) as server:
+        print(f"portray daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def _listening(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+            return True
+        except OSError:
+            return False
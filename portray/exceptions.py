@@ -25,3 +25,19 @@ class DocumentationAlreadyExists(PortrayError):  # noqa: N818
     def __init__(self, directory: str):
         super().__init__(self, f"Documentation already exists in '{directory}'. Use --overwrite to ignore")
         self.directory = directory
+
+
+class DaemonUnavailable(PortrayError):  # noqa: N818
+    """Thrown when no `portray daemon` is listening on the requested socket"""
+
+    def __init__(self, socket_path: str):
+        super().__init__(self, f"No portray daemon is listening on '{socket_path}'")
+        self.socket_path = socket_path
+
+
+class DaemonBuildFailed(PortrayError):  # noqa: N818
+    """Thrown when a build requested from a `portray daemon` failed"""
+
+    def __init__(self, message: str):
+        super().__init__(self, message)
+        self.message = message
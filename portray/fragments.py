@@ -0,0 +1,131 @@
+"""Defines the cache of the HTML fragments MkDocs converts the Markdown of each page into.
+
+Converting Markdown is the bulk of a MkDocs build for text heavy documentation. With
+`markdown_cache` enabled the converted HTML body and table of contents of each page are kept
+within the build cache, keyed on the page's Markdown, its location, the site's files its links
+are resolved against, the Markdown extensions along with their configuration, and the versions
+of the packages converting it. Rebuilds then only convert the pages whose Markdown changed,
+while every page is still rendered through the theme's templates. Pages including other files,
+through extensions such as `pymdownx.snippets`, are always converted, as the files they include
+aren't part of their key.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional, Set
+
+from mkdocs.structure.files import Files
+from mkdocs.structure.pages import Page, _RelativePathExtension
+from mkdocs.structure.toc import get_toc
+
+from portray import cache
+
+PACKAGES = ("markdown", "mkdocs", "pymdown-extensions", "Pygments")
+INCLUDE_MARKERS = {
+    "pymdownx.snippets": "--8<--",
+    "mdx_include": "{!",
+    "markdown_include.include": "{!",
+}
+
+_directory: Optional[str] = None
+_used: Set[str] = set()
+
+
+@contextmanager
+def cached(directory: str, prune: bool = False) -> Iterator[None]:
+    """Caches the HTML fragments of the pages MkDocs renders within the context in directory.
+
+    If `prune` is set, fragments that weren't used within the context are removed on leaving it,
+    which is only correct for builds rendering every page. Given no directory nothing is cached.
+    """
+    global _directory
+    if not directory:
+        yield
+        return
+
+    if not getattr(Page.render, "_portray_cached", False):
+        Page.render = _render  # type: ignore
+    _directory = directory
+    _used.clear()
+    try:
+        yield
+        if prune and os.path.isdir(directory):
+            cache.remove_stale(directory, {os.path.join(key[:2], f"{key}.json") for key in _used})
+    finally:
+        _directory = None
+
+
+def key(page: Page, config, files: Files) -> str:
+    """Returns the key the HTML fragment of page is cached on."""
+    return cache.digest(
+        page.markdown,
+        page.file.src_path,
+        page.file.url,
+        _files_digest(files),
+        config["markdown_extensions"],
+        config["mdx_configs"],
+        _versions(),
+    )
+
+
+def _render(page: Page, config, files: Files) -> None:
+    # a replacement of `Page.render`, keeping the table of contents tokens of the converted page
+    if _directory is None or _includes(page, config):
+        _uncached_render(page, config, files)
+        return
+
+    fragment_key = key(page, config, files)
+    _used.add(fragment_key)
+    path = os.path.join(_directory, fragment_key[:2], f"{fragment_key}.json")
+    if os.path.isfile(path):
+        with open(path) as fragment_file:
+            fragment = json.load(fragment_file)
+    else:
+        import markdown
+
+        converter = markdown.Markdown(
+            extensions=[_RelativePathExtension(page.file, files)] + config["markdown_extensions"],
+            extension_configs=config["mdx_configs"] or {},
+        )
+        fragment = {
+            "content": converter.convert(page.markdown),
+            "toc": getattr(converter, "toc_tokens", []),
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fragment_file:
+            json.dump(fragment, fragment_file)
+
+    page.content = fragment["content"]
+    page.toc = get_toc(fragment["toc"])
+
+
+_render._portray_cached = True  # type: ignore
+_uncached_render = Page.render
+
+
+def _includes(page: Page, config) -> bool:
+    """Returns whether the Markdown of page includes other files, through an extension doing so."""
+    return any(
+        marker in page.markdown
+        for extension, marker in INCLUDE_MARKERS.items()
+        if extension in config["markdown_extensions"]
+    )
+
+
+def _files_digest(files: Files) -> str:
+    # links are resolved against every file of the site, which is the same for all of its pages
+    # unless files are added to it (as lazily rendered sites do)
+    count, digest = getattr(files, "_portray_digest", (None, ""))
+    if count != len(files):
+        count, digest = len(files), cache.digest(sorted((file.src_path, file.url) for file in files))
+        files._portray_digest = (count, digest)  # type: ignore
+    return digest
+
+
+@lru_cache(maxsize=None)
+def _versions() -> tuple:
+    from portray.render import _package_version
+
+    return tuple(_package_version(package) for package in PACKAGES)
@@ -0,0 +1,168 @@
+"""Reads git remotes straight from a repositories config files, without spawning `git` or
+importing GitPython.
+
+Supports regular repositories, worktrees and submodules (whose `.git` is a `gitdir:` file),
+`[include]` and the `gitdir`, `gitdir/i` and `onbranch` conditions of `[includeIf]`. Only the
+repositories own config is read, so callers should fall back to GitPython when a remote
+isn't found.
+"""
+
+import os
+from fnmatch import fnmatchcase
+from typing import Iterator, List, Optional, Tuple
+
+MAX_INCLUDE_DEPTH = 10
+
+
+def git_dir(directory: str) -> Optional[str]:
+    """Returns the git directory of the repository rooted at directory, if there is one."""
+    dot_git = os.path.join(directory, ".git")
+    if os.path.isdir(dot_git):
+        return os.path.abspath(dot_git)
+
+    try:
+        with open(dot_git, encoding="utf8") as git_file:
+            content = git_file.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    return os.path.abspath(os.path.join(directory, content[len("gitdir:") :].strip()))
+
+
+def remote_url(directory: str, remote: str = "origin", read_files: Optional[List[str]] = None) -> Optional[str]:
+    """Returns the URL of the named remote of the repository rooted at directory, or `None` if
+    it can't be determined from the repositories config.
+
+    Every file consulted is appended to `read_files`, allowing callers to cache the result
+    until one of them changes.
+    """
+    read_files = read_files if read_files is not None else []
+    read_files.append(os.path.join(directory, ".git"))
+    repository_dir = git_dir(directory)
+    if repository_dir is None:
+        return None
+    read_files.append(os.path.join(repository_dir, "HEAD"))  # consulted by `onbranch` includes
+
+    common_dir = repository_dir
+    commondir_file = os.path.join(repository_dir, "commondir")
+    if os.path.isfile(commondir_file):  # a worktree, sharing the main repositories config
+        read_files.append(commondir_file)
+        with open(commondir_file, encoding="utf8") as commondir:
+            common_dir = os.path.normpath(os.path.join(repository_dir, commondir.read().strip()))
+
+    url = None
+    config_files = [os.path.join(common_dir, "config"), os.path.join(repository_dir, "config.worktree")]
+    for config_file in config_files:
+        for section, subsection, key, value in _entries(config_file, repository_dir, read_files):
+            if section == "remote" and subsection == remote and key == "url":
+                url = value  # as with `git config --get`, the last value wins
+    return url
+
+
+def _entries(
+    config_file: str, repository_dir: str, read_files: List[str], depth: int = 0
+) -> Iterator[Tuple[str, Optional[str], str, str]]:
+    """Yields the (section, subsection, key, value) entries of a git config file, following includes."""
+    read_files.append(config_file)
+    try:
+        with open(config_file, encoding="utf8") as config:
+            lines = config.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return
+
+    section, subsection = "", None
+    pending = ""
+    for line in lines:
+        if line.endswith("\\") and not line.endswith("\\\\"):
+            pending += line[:-1]
+            continue
+        line, pending = (pending + line).strip(), ""
+        if not line or line[0] in "#;":
+            continue
+
+        if line.startswith("["):
+            section, subsection = _section(line)
+            continue
+
+        key, separator, raw_value = line.partition("=")
+        key = key.strip().lower()
+        value = _value(raw_value) if separator else "true"  # a key without value is a true boolean
+        if (
+            key == "path"
+            and depth < MAX_INCLUDE_DEPTH
+            and (
+                section == "include"
+                or (section == "includeif" and _included(subsection or "", config_file, repository_dir))
+            )
+        ):
+            include = os.path.expanduser(value)
+            if not os.path.isabs(include):
+                include = os.path.join(os.path.dirname(config_file), include)
+            yield from _entries(include, repository_dir, read_files, depth + 1)
+        else:
+            yield section, subsection, key, value
+
+
+def _section(line: str) -> Tuple[str, Optional[str]]:
+    header = line[1 : line.index("]")] if "]" in line else line[1:]
+    if '"' in header:
+        name, _, quoted = header.partition('"')
+        subsection = quoted.rsplit('"', 1)[0].replace('\\"', '"').replace("\\\\", "\\")
+        return name.strip().lower(), subsection
+    if "." in header:  # deprecated `[section.subsection]` syntax
+        name, _, subsection = header.partition(".")
+        return name.strip().lower(), subsection.strip().lower()
+    return header.strip().lower(), None
+
+
+def _value(raw_value: str) -> str:
+    escapes = {"n": "\n", "t": "\t", "b": "\b", '"': '"', "\\": "\\"}
+    value = ""
+    quoted = False
+    index = 0
+    while index < len(raw_value):
+        character = raw_value[index]
+        if character == "\\" and index + 1 < len(raw_value):
+            index += 1
+            value += escapes.get(raw_value[index], raw_value[index])
+        elif character == '"':
+            quoted = not quoted
+        elif character in "#;" and not quoted:
+            break
+        else:
+            value += character
+        index += 1
+    return value.strip()
+
+
+def _included(condition: str, config_file: str, repository_dir: str) -> bool:
+    kind, _, pattern = condition.partition(":")
+    if kind in ("gitdir", "gitdir/i"):
+        if pattern.startswith("~/"):
+            pattern = os.path.expanduser(pattern)
+        elif pattern.startswith("./"):
+            pattern = os.path.join(os.path.dirname(config_file), pattern[2:])
+        elif not os.path.isabs(pattern):
+            pattern = f"**/{pattern}"
+        if pattern.endswith("/"):
+            pattern += "**"
+
+        candidates = {repository_dir, os.path.realpath(repository_dir)}
+        if kind == "gitdir/i":
+            return any(fnmatchcase(candidate.lower(), pattern.lower()) for candidate in candidates)
+        return any(fnmatchcase(candidate, pattern) for candidate in candidates)
+
+    if kind == "onbranch":
+        try:
+            with open(os.path.join(repository_dir, "HEAD"), encoding="utf8") as head:
+                reference = head.read().strip()
+        except OSError:
+            return False
+        if not reference.startswith("ref: refs/heads/"):
+            return False
+        if pattern.endswith("/"):
+            pattern += "**"
+        return fnmatchcase(reference[len("ref: refs/heads/") :], pattern)
+
+    return False  # conditions such as `hasconfig` aren't supported
@@ -0,0 +1,121 @@
+"""Defines the cache of the syntax highlighted HTML Pygments renders code blocks into.
+
+With the default `exclude_source: false` every reference page embeds the source of each of its
+functions and classes, and highlighting it all is often the bulk of rendering a site. With
+`highlight_cache` enabled the HTML of every code block highlighted by the `codehilite` or
+`pymdownx.highlight` extensions is kept within the build cache, keyed on the code along with the
+lexer and formatter (and their options) highlighting it, so code that is unchanged between builds,
+or duplicated within one, is only ever highlighted once. The least recently used entries are
+evicted once the cache grows beyond `highlight_cache_size` MiB.
+"""
+
+import importlib
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+import pygments
+
+from portray import cache
+
+MODULES = ("markdown.extensions.codehilite", "pymdownx.highlight")
+
+_directory: Optional[str] = None
+
+
+@contextmanager
+def cached(directory: str, max_size: int = 0, evict: bool = True) -> Iterator[None]:
+    """Caches the code highlighted within the context in directory.
+
+    Unless `evict` is unset, the least recently used entries are removed on leaving the context
+    until the cache is no larger than `max_size` bytes (`0` meaning unbounded).
+    Given no directory nothing is cached.
+    """
+    global _directory
+    if not directory:
+        yield
+        return
+
+    _install()
+    _directory = directory
+    try:
+        yield
+    finally:
+        _directory = None
+    if evict and max_size:
+        evict_entries(directory, max_size)
+
+
+def key(code: str, lexer: Any, formatter: Any) -> str:
+    """Returns the key the HTML code is highlighted into by lexer and formatter is cached on."""
+    return cache.digest(
+        code,
+        _class_name(lexer),
+        lexer.options,
+        _class_name(formatter),
+        formatter.options,
+        pygments.__version__,
+    )
+
+
+def evict_entries(directory: str, max_size: int) -> List[str]:
+    """Removes the least recently used entries until directory is no larger than max_size bytes,
+    returning the paths of the removed entries.
+    """
+    entries: List[Tuple[float, int, str]] = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # pragma: no cover
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    removed = []
+    for _, entry_size, path in sorted(entries):
+        if size <= max_size:
+            break
+        os.remove(path)
+        size -= entry_size
+        removed.append(path)
+    return removed
+
+
+def _highlight(code: str, lexer: Any, formatter: Any, outfile: Any = None) -> Any:
+    # a replacement of `pygments.highlight` within the modules of the highlighting extensions
+    if _directory is None or outfile is not None:
+        return pygments.highlight(code, lexer, formatter, outfile)
+
+    entry_key = key(code, lexer, formatter)
+    path = os.path.join(_directory, entry_key[:2], f"{entry_key}.html")
+    try:
+        with open(path, encoding="utf8") as entry:
+            highlighted = entry.read()
+        os.utime(path)  # marks the entry as recently used
+        return highlighted
+    except FileNotFoundError:
+        pass
+
+    highlighted = pygments.highlight(code, lexer, formatter)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf8", dir=os.path.dirname(path), delete=False) as entry:
+        entry.write(highlighted)
+    os.replace(entry.name, path)
+    return highlighted
+
+
+def _install() -> None:
+    for module_name in MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:  # pragma: no cover
+            continue
+        if callable(getattr(module, "highlight", None)):  # imported from pygments, if it is installed
+            module.highlight = _highlight  # type: ignore
+
+
+def _class_name(instance: Any) -> str:
+    return f"{type(instance).__module__}.{type(instance).__qualname__}"
@@ -0,0 +1,362 @@
+"""Defines the lazily rendered site `portray server --lazy` serves.
+
+Building a complete site before serving its first page can take minutes for large projects.
+A lazy site instead only stages the documentation and resolves the configuration and nav up front,
+rendering each page (along with the reference documentation of its module) the first time it's
+requested, while a background thread renders the rest of the site. Rendered pages are kept in
+memory, up to `lazy_cache_pages` of them, and on disk within the build cache (along with their
+search index entries) keyed on their sources, so pages that didn't change are neither rendered
+again when requested nor in the background after the server restarts.
+"""
+
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+from mkdocs.commands import build as mkdocs_build
+from mkdocs.structure.files import File, get_files
+from mkdocs.structure.nav import get_navigation
+
+from portray import (
+    ast_reference,
+    cache,
+    fragments,
+    highlighting,
+    navigation,
+    render,
+    search,
+    workers,
+)
+from portray._version import __version__
+
+REFERENCE_STUB = """# Module {module}
+
+The reference documentation of `{module}` is generated the first time this page is requested.
+"""
+
+
+class Site:
+    """A site whose pages are rendered the first time they're requested.
+
+    The site is built from `config` into `input_dir` and `site_dir`, which are emptied
+    every time the site is (re)prepared.
+    """
+
+    def __init__(self, config: dict, input_dir: str, site_dir: str):
+        self.project_config = self.config = config
+        self.input_dir = input_dir
+        self.site_dir = site_dir
+        self.cache_dir = os.path.join(cache.directory(config), "lazy")
+        self.complete = threading.Event()
+        self._lock = threading.RLock()
+        self._reference_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._filler: Optional[threading.Thread] = None
+        self._pages: "OrderedDict[str, bytes]" = OrderedDict()
+        self._documents: Dict[str, File] = {}
+        self._modules: Dict[str, str] = {}
+        self._documented: Set[str] = set()
+        self._built: Set[str] = set()
+        self._fingerprint = ""
+
+    def prepare(self) -> None:
+        """(Re)stages the documentation and resolves the configuration and nav of the site,
+        without rendering any of its pages.
+        """
+        self.stop()
+        with self._lock:
+            config = self.config = copy.deepcopy(self.project_config)
+            if config["append_directory_to_python_path"] and config["directory"] not in sys.path:
+                sys.path.append(config["directory"])
+            render.forget_modules(config["directory"])
+            for directory in (self.input_dir, self.site_dir):
+                shutil.rmtree(directory, ignore_errors=True)
+                os.makedirs(directory)
+
+            staged = render._stage(config, self.input_dir)
+            config["mkdocs"].setdefault("docs_dir", self.input_dir)
+            config["mkdocs"].setdefault("site_dir", self.site_dir)
+            nav = render._nav(config, self.input_dir, staged)
+            self._modules = {}
+            self._documented = set()
+            if config["include_reference_documentation"]:
+                config["pdocs"].setdefault("output_dir", os.path.join(self.input_dir, "reference"))
+                self._modules = self._reference_stubs()
+                nav.append({"Reference": render._nested_docs(config["pdocs"]["output_dir"], self.input_dir, config)})
+
+            render._mkdocs_logging()
+            mkdocs_config = render._mkdocs_config(config["mkdocs"])
+            mkdocs_config = mkdocs_config["plugins"].run_event("config", mkdocs_config)
+            mkdocs_config["plugins"].run_event("pre_build", config=mkdocs_config)
+            files = get_files(mkdocs_config)
+            environment = mkdocs_config["theme"].get_env()
+            files.add_files_from_theme(environment, mkdocs_config)
+            files = mkdocs_config["plugins"].run_event("files", files, config=mkdocs_config)
+            site_nav = get_navigation(files, mkdocs_config)
+            site_nav = mkdocs_config["plugins"].run_event("nav", site_nav, config=mkdocs_config, files=files)
+            environment = mkdocs_config["plugins"].run_event("env", environment, config=mkdocs_config, files=files)
+            files.copy_static_files()
+            if config["collapsed_nav"]:
+                navigation.write_tree(
+                    self.site_dir, nav, use_directory_urls=config["mkdocs"].get("use_directory_urls", True)
+                )
+
+            self.mkdocs_config, self.files, self.nav, self.environment = mkdocs_config, files, site_nav, environment
+            self._documents = {file.dest_path.replace(os.sep, "/"): file for file in files.documentation_pages()}
+            self._pages.clear()
+            self._built = set()
+            self._fingerprint = cache.digest(
+                __version__,
+                render._package_version("mkdocs"),
+                render._package_version("pdocs"),
+                {
+                    **config,
+                    # the temporary directories of each server are the only settings allowed to differ
+                    "mkdocs": {
+                        key: value for key, value in config["mkdocs"].items() if key not in ("docs_dir", "site_dir")
+                    },
+                    "pdocs": {key: value for key, value in config["pdocs"].items() if key != "output_dir"},
+                },
+            )
+
+    def start(self) -> None:
+        """Starts rendering the pages that haven't been requested yet in the background."""
+        self._stopping.clear()
+        self.complete.clear()
+        self._filler = threading.Thread(target=self.fill, name="portray-lazy-site", daemon=True)
+        self._filler.start()
+
+    def stop(self) -> None:
+        """Stops rendering pages in the background, once the page being rendered is done."""
+        self._stopping.set()
+        if self._filler is not None:
+            self._filler.join()
+            self._filler = None
+
+    def page(self, path: str) -> Optional[bytes]:
+        """Returns the HTML of the page served at the site relative path, rendering it if it
+        hasn't been yet, or `None` if there is no such page.
+        """
+        with self._lock:
+            location = self.location(path)
+            if location is None:
+                return None
+            if location in self._pages:
+                self._pages.move_to_end(location)
+                return self._pages[location]
+            document = self._documents[location]
+            key = self._key(document)
+
+        content = self._restore(document, key)
+        if content is None:
+            content = self._build(document, key)
+
+        with self._lock:
+            self._pages[location] = content
+            while len(self._pages) > self.config["lazy_cache_pages"]:
+                self._pages.popitem(last=False)
+        return content
+
+    def location(self, path: str) -> Optional[str]:
+        """Returns the site relative location of the page served at path, or `None` if there is no such page."""
+        path = path.lstrip("/")
+        if not path or path.endswith("/"):
+            path += "index.html"
+        return path if path in self._documents else None
+
+    def fill(self) -> None:
+        """Renders every page that hasn't been rendered yet, followed by the files that depend on
+        all of them, such as the search index, and removes the cached pages that are no longer part
+        of the site. Stops early if the site is stopped.
+        """
+        for module in self.config["pdocs"].get("modules", []) if self._modules else []:
+            if self._stopping.is_set():
+                return
+            self._document(module)
+
+        keys = set()
+        for location, document in list(self._documents.items()):
+            if self._stopping.is_set():
+                return
+            key = self._key(document)
+            keys.add(key)
+            if location not in self._built and self._restore(document, key) is None:
+                self._build(document, key)
+
+        with self._lock:
+            for template in self.mkdocs_config["theme"].static_templates:
+                mkdocs_build._build_theme_template(template, self.environment, self.files, self.mkdocs_config, self.nav)
+            for template in self.mkdocs_config["extra_templates"]:
+                mkdocs_build._build_extra_template(template, self.files, self.mkdocs_config, self.nav)
+            self.mkdocs_config["plugins"].run_event("post_build", config=self.mkdocs_config)
+        highlight_cache = render._highlight_cache(self.config)
+        if highlight_cache.get("highlight_cache_size"):
+            highlighting.evict_entries(highlight_cache["highlight_cache"], highlight_cache["highlight_cache_size"])
+        if self.config["search_shards"]:
+            search.shard(
+                self.site_dir,
+                self.config["mkdocs"]["nav"],
+                use_directory_urls=self.config["mkdocs"].get("use_directory_urls", True),
+            )
+        if os.path.isdir(self.cache_dir):
+            # the pages cached before their sources last changed
+            cache.remove_stale(
+                self.cache_dir, {f"{key}{extension}" for key in keys for extension in (".html", ".json")}
+            )
+        self.complete.set()
+
+    def _reference_stubs(self) -> Dict[str, str]:
+        """Writes a stub page in place of the reference documentation of every module that can be
+        found without importing it, returning the module each stub page documents. Modules that
+        can't be found this way are documented straight away.
+        """
+        output_dir = self.config["pdocs"]["output_dir"]
+        modules: Dict[str, str] = {}
+        for module in self.config["pdocs"]["modules"]:
+            try:
+                source_files = ast_reference.module_files(module)
+            except ModuleNotFoundError:
+                self._document(module)
+                continue
+
+            packages = {source_file.name.rsplit(".", 1)[0] for source_file in source_files}
+            for source_file in source_files:
+                page = os.path.join(output_dir, *source_file.name.split("."))
+                page = os.path.join(page, "index.md") if source_file.name in packages else f"{page}.md"
+                os.makedirs(os.path.dirname(page), exist_ok=True)
+                with open(page, "w") as stub:
+                    stub.write(REFERENCE_STUB.format(module=source_file.name))
+                modules[os.path.relpath(page, self.input_dir).replace(os.sep, "/")] = source_file.name
+        return modules
+
+    def _document(self, module: str) -> None:
+        """Generates the reference documentation of module, and of its submodules, unless done already."""
+        with self._reference_lock:
+            if module in self._documented:
+                return
+
+            config = self.config
+            with tempfile.TemporaryDirectory() as reference_dir:
+                render.pdocs(
+                    {**config["pdocs"], "modules": [module], "output_dir": reference_dir},
+                    cache_dir=os.path.join(cache.directory(config), "reference"),
+                    limits=workers.Limits.from_config(config),
+                )
+                shutil.copytree(reference_dir, config["pdocs"]["output_dir"], dirs_exist_ok=True)
+                self._add_static_files(reference_dir)
+            self._documented.update(
+                name for name in self._modules.values() if name == module or name.startswith(f"{module}.")
+            )
+            self._documented.add(module)
+
+    def _add_static_files(self, reference_dir: str) -> None:
+        """Adds the files other than pages generated along with reference documentation, such as
+        split out source listings, to the site.
+        """
+        output_dir = self.config["pdocs"]["output_dir"]
+        for root, _, names in os.walk(reference_dir):
+            for name in names:
+                if name.endswith(".md"):
+                    continue
+                generated = os.path.join(output_dir, os.path.relpath(os.path.join(root, name), reference_dir))
+                src_path = os.path.relpath(generated, self.input_dir)
+                if self.files.get_file_from_path(src_path) is None:
+                    use_directory_urls = self.mkdocs_config["use_directory_urls"]
+                    static_file = File(src_path, self.input_dir, self.site_dir, use_directory_urls)
+                    static_file.copy_file()
+                    self.files.append(static_file)
+
+    def _build(self, document: File, key: str) -> bytes:
+        module = self._modules.get(document.src_path.replace(os.sep, "/"))
+        if module is not None:
+            self._document(module)
+
+        highlight_cache = render._highlight_cache(self.config).get("highlight_cache", "")
+        stripped_dir = render._stripped_source_dir(self.config, self.input_dir)
+        with self._lock, fragments.cached(render._markdown_cache(self.config)), highlighting.cached(highlight_cache):
+            search_index = self._search_index()
+            indexed = len(search_index._entries) if search_index is not None else 0
+            with search.stripped_source(stripped_dir):
+                mkdocs_build._populate_page(document.page, self.mkdocs_config, self.files)
+                mkdocs_build._build_page(
+                    document.page, self.mkdocs_config, self.files.documentation_pages(), self.nav, self.environment
+                )
+            entries = search_index._entries[indexed:] if search_index is not None else []
+            self._built.add(document.dest_path.replace(os.sep, "/"))
+
+        with open(document.abs_dest_path, "rb") as built_page:
+            content = built_page.read()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, f"{key}.json"), "w") as cached_entries:
+            json.dump(entries, cached_entries)
+        with open(os.path.join(self.cache_dir, f"{key}.html"), "wb") as cached:
+            cached.write(content)
+        return content
+
+    def _restore(self, document: File, key: str) -> Optional[bytes]:
+        """Returns the HTML of the page as cached on disk, if it is, adding it to the site along
+        with its search index entries unless it is part of it already.
+        """
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.html"), "rb") as cached:
+                content = cached.read()
+            with open(os.path.join(self.cache_dir, f"{key}.json")) as cached_entries:
+                entries = json.load(cached_entries)
+        except FileNotFoundError:
+            return None
+
+        location = document.dest_path.replace(os.sep, "/")
+        with self._lock:
+            if location not in self._built:
+                os.makedirs(os.path.dirname(document.abs_dest_path), exist_ok=True)
+                with open(document.abs_dest_path, "wb") as restored_page:
+                    restored_page.write(content)
+                search_index = self._search_index()
+                if search_index is not None:
+                    search_index._entries.extend(entries)
+                self._built.add(location)
+        return content
+
+    def _search_index(self) -> Any:
+        """Returns the index of the search plugin, to which pages are added as they're built, if any."""
+        for plugin in self.mkdocs_config["plugins"].values():
+            if hasattr(getattr(plugin, "search_index", None), "_entries"):
+                return plugin.search_index
+        return None
+
+    def _key(self, document: File) -> str:
+        """Returns the key the rendered page is cached on: the site's configuration along with the
+        page's source, or the source of the module it documents.
+        """
+        module = self._modules.get(document.src_path.replace(os.sep, "/"))
+        if module is None:
+            return cache.digest(self._fingerprint, document.src_path, cache.file_digest(document.abs_src_path))
+        return cache.digest(
+            self._fingerprint,
+            document.src_path,
+            [(source, cache.file_digest(source)) for source in ast_reference.module_sources(module)],
+        )
+
+
+@contextmanager
+def site(config: dict, background: bool = True) -> Iterator[Site]:
+    """Prepares a lazily rendered site for the project config within temporary directories, yielding
+    it before they are deleted. Unless `background` is unset the rest of the site is rendered in the
+    background while the site is in use.
+    """
+    with render._build_directories({**config, "incremental": False}) as (input_dir, site_dir):
+        lazy_site = Site(config, input_dir, site_dir)
+        lazy_site.prepare()
+        if background:
+            lazy_site.start()
+        try:
+            yield lazy_site
+        finally:
+            lazy_site.stop()
@@ -0,0 +1,101 @@
+"""Defines how the source listings pdocs embeds within reference documentation are split out of it.
+
+Unless `exclude_source` is set every reference page embeds the source of the module along with
+each of its functions and classes, making pages megabytes large for big modules and with them
+the time spent converting, highlighting and indexing them. With pdocs' `split_source` set each
+listing is instead highlighted once into its own file, next to its page and named after its
+content, with the page only linking to it. portray's theme loads the listings as they are expanded
+and, as they aren't pages themselves, the search index no longer includes them.
+"""
+
+import hashlib
+import os
+from typing import List
+
+SOURCE_HEADER = '??? example "View Source"'
+SOURCE_INDENT = " " * 8
+LINK = '    [View the source]({path}){{: .portray-source }}\n'
+THEME_FLAG = "portray_split_source"
+
+
+def split(output_dir: str, module: str = "") -> List[str]:
+    """Splits the source listings out of the reference pages pdocs rendered module into (or all
+    pages within output_dir), returning the paths of the pages that were rewritten.
+    """
+    pages = []
+    for location in _module_locations(output_dir, module):
+        if os.path.isfile(location):
+            pages.append(location)
+        for root, _, files in os.walk(location):
+            pages.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".md"))
+
+    rewritten = []
+    for page in pages:
+        with open(page, encoding="utf8") as page_file:
+            content = page_file.read()
+        split_content = split_page(content, page)
+        if split_content != content:
+            with open(page, "w", encoding="utf8") as page_file:
+                page_file.write(split_content)
+            rewritten.append(page)
+    return rewritten
+
+
+def split_page(content: str, page: str) -> str:
+    """Returns the Markdown content of page with each source listing replaced by a link to the
+    file it is written to, within a directory named after page.
+    """
+    lines = content.splitlines(keepends=True)
+    listings_dir = f"{os.path.splitext(os.path.basename(page))[0]}.source"
+    split_lines: List[str] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        if line.rstrip("\n") != SOURCE_HEADER:
+            split_lines.append(line)
+            continue
+
+        source: List[str] = []
+        while index < len(lines):
+            if lines[index].startswith(SOURCE_INDENT):
+                source.append(lines[index][len(SOURCE_INDENT) :])
+            elif not (lines[index] == "\n" and _continues(lines, index)):
+                break
+            index += 1
+
+        split_lines.append(line)
+        if not source:
+            continue
+        code = "".join(source).rstrip() + "\n"
+        name = f"{hashlib.sha256(code.encode('utf8')).hexdigest()[:16]}.html"
+        path = os.path.join(os.path.dirname(page), listings_dir, name)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf8") as listing:
+                listing.write(_highlight(code))
+        split_lines.append(LINK.format(path=f"{listings_dir}/{name}"))
+    return "".join(split_lines)
+
+
+def _continues(lines: List[str], index: int) -> bool:
+    # pdocs separates each line of a listing by an empty line, which only ends it if no more source follows
+    return index + 1 < len(lines) and lines[index + 1].startswith(SOURCE_INDENT)
+
+
+def _module_locations(output_dir: str, module: str) -> List[str]:
+    if not module:
+        return [output_dir]
+    if os.sep in module or (os.altsep and os.altsep in module):
+        module = os.path.splitext(os.path.basename(module.rstrip("/" + os.sep)))[0]
+    module_path = os.path.join(output_dir, *module.split("."))
+    return [module_path, f"{module_path}.md"]
+
+
+def _highlight(code: str) -> str:
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import PythonLexer
+
+    # the markup codehilite renders code blocks into, which the theme styles
+    return highlight(code, PythonLexer(), HtmlFormatter(cssclass="codehilite", wrapcode=True))
@@ -0,0 +1,116 @@
+/* Fills in the nav sections portray's collapsed_nav leaves empty, from the site's nav tree,
+   the first time each of them is expanded. */
+(function () {
+  var config = JSON.parse(document.getElementById("__config").textContent);
+  var indexes = (config.features || []).indexOf("navigation.indexes") !== -1;
+  var tree = null;
+
+  function load() {
+    if (tree === null) {
+      tree = fetch(config.base + "/assets/portray/nav.json").then(function (response) {
+        return response.json();
+      });
+    }
+    return tree;
+  }
+
+  function node(nodes, path) {
+    var current = { children: nodes };
+    path.replace(/^__nav_/, "").split("_").forEach(function (position) {
+      current = current.children[parseInt(position, 10) - 1];
+    });
+    return current;
+  }
+
+  // the rule of MkDocs' url template filter: fully qualified URLs, absolute paths and anchors are kept as they are
+  function href(url) {
+    return /^([a-z][a-z0-9+.-]*:|\/|#)/i.test(url) ? url : config.base + "/" + url;
+  }
+
+  function element(tag, attributes, text) {
+    var created = document.createElement(tag);
+    Object.keys(attributes).forEach(function (name) {
+      created.setAttribute(name, attributes[name]);
+    });
+    if (text) {
+      created.appendChild(document.createTextNode(text));
+    }
+    return created;
+  }
+
+  function item(child, path, level) {
+    var li = element("li", { class: "md-nav__item" });
+    if (!child.children) {
+      li.appendChild(element("a", { href: href(child.url), class: "md-nav__link" }, child.title));
+      return li;
+    }
+
+    li.className += " md-nav__item--nested";
+    li.appendChild(
+      element("input", { class: "md-nav__toggle md-toggle", "data-md-toggle": path, type: "checkbox", id: path })
+    );
+    var index = indexes && child.children.filter(function (nested) { return nested.index; })[0];
+    if (index) {
+      var link = element("div", { class: "md-nav__link md-nav__link--index" });
+      link.appendChild(element("a", { href: href(index.url) }, child.title));
+      var toggle = element("label", { for: path });
+      toggle.appendChild(element("span", { class: "md-nav__icon md-icon" }));
+      link.appendChild(toggle);
+      li.appendChild(link);
+    } else {
+      var label = element("label", { class: "md-nav__link", for: path }, child.title);
+      label.appendChild(element("span", { class: "md-nav__icon md-icon" }));
+      li.appendChild(label);
+    }
+    var nav = element("nav", { class: "md-nav", "aria-label": child.title, "data-md-level": level });
+    var title = element("label", { class: "md-nav__title", for: path });
+    title.appendChild(element("span", { class: "md-nav__icon md-icon" }));
+    title.appendChild(document.createTextNode(child.title));
+    nav.appendChild(title);
+    nav.appendChild(
+      element("ul", {
+        class: "md-nav__list",
+        "data-md-scrollfix": "",
+        "data-portray-nav": path,
+        "data-portray-nav-level": level,
+      })
+    );
+    li.appendChild(nav);
+    watch(li.querySelector("input"));
+    return li;
+  }
+
+  function expand(list) {
+    if (list.hasAttribute("data-portray-nav-loaded")) {
+      return;
+    }
+    list.setAttribute("data-portray-nav-loaded", "");
+    var path = list.getAttribute("data-portray-nav");
+    var level = parseInt(list.getAttribute("data-portray-nav-level"), 10) + 1;
+    load().then(function (nodes) {
+      var section = node(nodes, path);
+      var index = indexes && section.children.filter(function (nested) { return nested.index; })[0];
+      section.children.forEach(function (child, position) {
+        if (child !== index) {
+          list.appendChild(item(child, path + "_" + (position + 1), level));
+        }
+      });
+    });
+  }
+
+  function watch(toggle) {
+    var list = toggle.parentNode.querySelector("[data-portray-nav]");
+    if (toggle.checked) {
+      expand(list);
+    }
+    toggle.addEventListener("change", function () {
+      if (toggle.checked) {
+        expand(list);
+      }
+    });
+  }
+
+  document.querySelectorAll("[data-portray-nav]").forEach(function (list) {
+    watch(document.getElementById(list.getAttribute("data-portray-nav")));
+  });
+})();
@@ -0,0 +1,57 @@
+/* Provides the theme's search with the index portray's search_shards split into shards, only
+   loading them (in parallel) once search is first used, falling back to the monolithic index. */
+(function () {
+  var script = document.currentScript;
+  var manifestUrl = new URL(script.getAttribute("data-manifest"), window.location.href);
+  var indexUrl = new URL(script.getAttribute("data-index"), window.location.href);
+
+  function json(url) {
+    return fetch(url).then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.json();
+    });
+  }
+
+  function load() {
+    return json(manifestUrl)
+      .then(function (manifest) {
+        var shards = manifest.shards.map(function (shard) {
+          return json(new URL(shard.path, manifestUrl));
+        });
+        return Promise.all(shards).then(function (loaded) {
+          var docs = [];
+          loaded.forEach(function (shard) {
+            docs = docs.concat(shard.docs);
+          });
+          return { config: manifest.config, docs: docs };
+        });
+      })
+      .catch(function () {
+        return json(indexUrl);
+      });
+  }
+
+  var index = new Promise(function (resolve) {
+    // search results are highlighted on the pages they link to, which needs the index straight away
+    if (new URLSearchParams(window.location.search).has("h")) {
+      resolve(load());
+      return;
+    }
+
+    function requested(event) {
+      var target = event.target;
+      if (target.matches("[data-md-component=search-query]") || (target.id === "__search" && target.checked)) {
+        document.removeEventListener("focusin", requested, true);
+        document.removeEventListener("change", requested, true);
+        resolve(load());
+      }
+    }
+    document.addEventListener("focusin", requested, true);
+    document.addEventListener("change", requested, true);
+  });
+
+  // read by the theme when it starts, which is why this script is included ahead of it
+  window.__search = Object.assign(window.__search || {}, { index: index });
+})();
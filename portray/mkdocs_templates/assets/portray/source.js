@@ -0,0 +1,39 @@
+/* Replaces the links portray's split_source leaves within reference pages by the source listings
+   they point to, the first time each of them is expanded. */
+(function () {
+  function load(details) {
+    var link = details.querySelector("a.portray-source");
+    if (!link || link.hasAttribute("data-portray-source-loading")) {
+      return;
+    }
+    link.setAttribute("data-portray-source-loading", "");
+    fetch(link.href)
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.text();
+      })
+      .then(function (listing) {
+        var container = link.parentNode;
+        var template = document.createElement("template");
+        template.innerHTML = listing;
+        container.parentNode.replaceChild(template.content, container);
+      })
+      .catch(function () {
+        link.removeAttribute("data-portray-source-loading");
+      });
+  }
+
+  // toggle events don't bubble, but are still seen while capturing
+  document.addEventListener(
+    "toggle",
+    function (event) {
+      if (event.target.tagName === "DETAILS" && event.target.open) {
+        load(event.target);
+      }
+    },
+    true
+  );
+  document.querySelectorAll("details[open]").forEach(load);
+})();
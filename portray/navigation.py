@@ -0,0 +1,72 @@
+"""Defines the site navigation tree `portray` ships alongside a generated site.
+
+The material theme renders the complete nav into every page, making the size of a site (and the
+time spent rendering it) grow quadratically with its page count. With `collapsed_nav` enabled
+portray's theme overrides only render the ancestors and siblings of each page, leaving the
+remaining sections collapsed, and the full tree is written once to `assets/portray/nav.json`
+from where the theme's script fills in collapsed sections as they are expanded.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+TREE_FILE = os.path.join("assets", "portray", "nav.json")
+THEME_FLAG = "portray_collapsed_nav"
+
+
+def write_tree(site_dir: str, nav: list, use_directory_urls: bool = True) -> str:
+    """Writes the full tree of nav into site_dir, returning the path of the written file."""
+    path = os.path.join(site_dir, TREE_FILE)
+    content = json.dumps(tree(nav, use_directory_urls), separators=(",", ":"))
+    if os.path.isfile(path):
+        with open(path) as existing_file:
+            if existing_file.read() == content:
+                return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as tree_file:
+        tree_file.write(content)
+    return path
+
+
+def tree(nav: list, use_directory_urls: bool = True) -> List[Dict[str, Any]]:
+    """Returns nav as a list of `{"title", "url", "index"}` pages and `{"title", "children"}`
+    sections, in the order the theme numbers them.
+    """
+    nodes: List[Dict[str, Any]] = []
+    for item in nav:
+        entries = item.items() if isinstance(item, dict) else [(None, item)]
+        for label, value in entries:
+            if isinstance(value, list):
+                nodes.append({"title": label or "", "children": tree(value, use_directory_urls)})
+            else:
+                nodes.append(_page(label, value, use_directory_urls))
+    return nodes
+
+
+def page_url(path: str, use_directory_urls: bool = True) -> str:
+    """Returns the site relative URL MkDocs renders the Markdown page at path to."""
+    parsed = urlsplit(path)
+    if parsed.scheme or parsed.netloc or path.startswith(("/", "#")):  # links MkDocs leaves as they are
+        return path
+
+    directory, name = os.path.split(path.replace(os.sep, "/"))
+    stem = os.path.splitext(name)[0]
+    if stem in ("index", "README"):
+        if use_directory_urls:
+            return f"{directory}/" if directory else ""
+        return f"{directory}/index.html" if directory else "index.html"
+    if use_directory_urls:
+        return f"{directory}/{stem}/" if directory else f"{stem}/"
+    return f"{directory}/{stem}.html" if directory else f"{stem}.html"
+
+
+def _page(label: Optional[str], path: str, use_directory_urls: bool) -> Dict[str, Any]:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return {
+        "title": label or stem.replace("-", " ").replace("_", " ").title(),
+        "url": page_url(path, use_directory_urls),
+        "index": stem in ("index", "README"),
+    }
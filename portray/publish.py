@@ -0,0 +1,107 @@
+"""Defines how a built site is published into the projects `output_dir`.
+
+The `sync` publish mode assembles the new site next to the existing output, reusing (hard
+linking) every file whose content is unchanged, and then atomically swaps it into place so
+web servers never observe a partially written tree.
+"""
+
+import ctypes
+import ctypes.util
+import filecmp
+import os
+import shutil
+import sys
+from typing import Dict
+
+REPLACE = "replace"
+SYNC = "sync"
+MODES = (REPLACE, SYNC)
+
+RENAME_EXCHANGE = 2
+
+
+def sync(site_dir: str, output_dir: str) -> Dict[str, int]:
+    """Publishes site_dir into output_dir only writing files that changed, dropping files that
+    no longer exist and atomically swapping the result into place.
+
+    Returns counts of the `written`, `unchanged` and `removed` files, along with the `size`
+    of the written files in bytes.
+    """
+    output_dir = os.path.abspath(output_dir.rstrip(os.sep))
+    if not os.path.isdir(output_dir):
+        shutil.copytree(site_dir, output_dir)
+        return {**written(output_dir), "unchanged": 0, "removed": 0}
+
+    parent, name = os.path.split(output_dir)
+    staged_dir = os.path.join(parent, f".{name}.portray-new")
+    shutil.rmtree(staged_dir, ignore_errors=True)
+
+    stats = {"written": 0, "size": 0, "unchanged": 0, "removed": 0}
+    published = set()
+    for root, _, files in os.walk(site_dir):
+        relative_root = os.path.relpath(root, site_dir)
+        os.makedirs(os.path.normpath(os.path.join(staged_dir, relative_root)), exist_ok=True)
+        for file_name in files:
+            relative = os.path.normpath(os.path.join(relative_root, file_name))
+            published.add(relative)
+            built = os.path.join(site_dir, relative)
+            existing = os.path.join(output_dir, relative)
+            staged = os.path.join(staged_dir, relative)
+            if _unchanged(built, existing) and _link(existing, staged):
+                stats["unchanged"] += 1
+            else:
+                shutil.copyfile(built, staged)
+                stats["written"] += 1
+                stats["size"] += os.path.getsize(staged)
+
+    for root, _, files in os.walk(output_dir):
+        for file_name in files:
+            if os.path.relpath(os.path.join(root, file_name), output_dir) not in published:
+                stats["removed"] += 1
+
+    _swap(staged_dir, output_dir)
+    shutil.rmtree(staged_dir, ignore_errors=True)
+    return stats
+
+
+def written(directory: str) -> Dict[str, int]:
+    """Returns the count of the `written` files, and their `size` in bytes, of a freshly published directory."""
+    stats = {"written": 0, "size": 0}
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            stats["written"] += 1
+            stats["size"] += os.path.getsize(os.path.join(root, file_name))
+    return stats
+
+
+def _unchanged(built: str, existing: str) -> bool:
+    try:
+        return os.path.isfile(existing) and filecmp.cmp(built, existing, shallow=False)
+    except OSError:
+        return False
+
+
+def _link(existing: str, staged: str) -> bool:
+    try:
+        os.link(existing, staged)
+        return True
+    except OSError:
+        return False
+
+
+def _swap(new_dir: str, output_dir: str) -> None:
+    """Exchanges new_dir and output_dir atomically when the platform allows it, otherwise with
+    two consecutive renames. After returning output_dir holds the new site and new_dir the old.
+    """
+    if sys.platform.startswith("linux"):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        renameat2 = getattr(libc, "renameat2", None)
+        if renameat2 is not None:
+            at_fdcwd = -100
+            if renameat2(at_fdcwd, os.fsencode(new_dir), at_fdcwd, os.fsencode(output_dir), RENAME_EXCHANGE) == 0:
+                return
+
+    old_dir = f"{new_dir}.old"
+    os.rename(output_dir, old_dir)
+    os.rename(new_dir, output_dir)
+    os.rename(old_dir, new_dir)
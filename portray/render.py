@@ -2,23 +2,46 @@
 included documentation generation utilities.
 """
 
+import copy
+import importlib
+import importlib.metadata
+import json
 import logging
 import os
+import re
 import shutil
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
-from glob import glob
-from typing import Dict, Iterator, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 import mkdocs.config as mkdocs_config
 import mkdocs.exceptions as _mkdocs_exceptions
 from mkdocs.commands.build import build as mkdocs_build
 from mkdocs.config.defaults import get_schema as mkdocs_schema
+from mkdocs.theme import Theme
 from mkdocs.utils import is_markdown_file
 from pdocs import as_markdown as pdocs_as_markdown
 from yaspin import yaspin
 
+from portray import (
+    ast_reference,
+    cache,
+    compress,
+    fragments,
+    highlighting,
+    listings,
+    navigation,
+    publish,
+    search,
+    staging,
+    timing,
+    watch,
+    workers,
+)
+from portray._version import __version__
 from portray.exceptions import DocumentationAlreadyExists
 
 NO_HOME_PAGE = """
@@ -28,6 +51,9 @@ NO_HOME_PAGE = """
 It appears you do not yet have a README.md file created.
 """
 
+_warm_configs: Optional[Dict[str, mkdocs_config.Config]] = None
+_warm_environments: Optional[Dict[Tuple[Tuple[str, ...], str], Any]] = None
+
 
 def documentation(config: dict, overwrite: bool = False) -> None:
     """Renders the entire project given the project config into the config's
@@ -42,152 +68,576 @@ def documentation(config: dict, overwrite: bool = False) -> None:
         generated py pdoc. MkDocs outputs an HTML representation to a new temporary
         directory.
     - The html temporary directory is copied into your specified output location
+        (or, using the `sync` publish mode, only the files that changed are written
+        and the result is atomically swapped into place)
     - Both temporary directories are deleted.
     """
+    if config["publish"] not in publish.MODES:
+        raise ValueError(f"Unknown publish mode '{config['publish']}', expected one of: {', '.join(publish.MODES)}")
+
     if os.path.exists(config["output_dir"]):
-        if overwrite:
-            shutil.rmtree(config["output_dir"])
-        else:
+        if not overwrite:
             raise DocumentationAlreadyExists(config["output_dir"])
+        if config["publish"] == publish.REPLACE:
+            shutil.rmtree(config["output_dir"])
 
     with documentation_in_temp_folder(config) as (_, documentation_output):
-        shutil.copytree(documentation_output, config["output_dir"])
+        with timing.phase("publish") as published:
+            if config["publish"] == publish.SYNC:
+                stats = publish.sync(documentation_output, config["output_dir"])
+            else:
+                shutil.copytree(documentation_output, config["output_dir"])
+                stats = publish.written(config["output_dir"])
+            published.files = stats["written"]
+            published.size = stats["size"]
 
 
-def pdocs(config: dict) -> None:
+def pdocs(config: dict, cache_dir: str = "", jobs: int = 1, limits: Optional[workers.Limits] = None) -> None:
     """Render this project using the specified pdoc config passed into pdoc.
 
     This rendering is from code definition to Markdown so that
     it will be compatible with MkDocs.
-    """
-    pdocs_as_markdown(**config)
 
+    If a `cache_dir` is given the Markdown generated for each module is stored there, keyed
+    on the module's source, the pdocs options and the versions of pdocs and portray. Modules whose
+    key is already cached are copied straight into the output directory without running pdocs.
+
+    If more than one of `jobs` is requested (`0` meaning one per CPU), the modules are split
+    across a pool of worker processes, each rendering its own subtree of the output directory.
+    With the `ast` reference `mode` modules are never imported, and the source files of
+    each module are parsed across the pool instead.
 
-def mkdocs(config: dict):
+    If `limits` are given each module is instead documented within a supervised worker process,
+    with modules exceeding them documented by a placeholder page reporting the failure.
+    """
+    mode = config.get("mode", ast_reference.IMPORT)
+    if mode not in ast_reference.MODES:
+        raise ValueError(f"Unknown reference mode '{mode}', expected one of: {', '.join(ast_reference.MODES)}")
+
+    modules = config["modules"]
+    jobs = jobs or os.cpu_count() or 1
+    if limits is not None:
+        workers.reference(modules, config, cache_dir, jobs, limits)
+    elif mode == ast_reference.AST:
+        for module in modules:
+            timing.merge(_module_reference(module, config, cache_dir, jobs))
+    elif jobs > 1 and len(modules) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(modules)), initializer=_extend_python_path, initargs=(sys.path,)
+        ) as pool:
+            for rendering in [pool.submit(_module_reference, module, config, cache_dir) for module in modules]:
+                timing.merge(rendering.result())
+    else:
+        for module in modules:
+            timing.merge(_module_reference(module, config, cache_dir))
+
+
+def _extend_python_path(python_path: list) -> None:
+    sys.path.extend(path for path in python_path if path not in sys.path)
+
+
+def _module_reference(module: str, config: dict, cache_dir: str = "", jobs: int = 1) -> Dict[str, timing.Phase]:
+    # measured separately so the same measurements can be returned from worker processes
+    with timing.record() as timings, timing.phase(f"pdocs/{module}"):
+        if cache_dir:
+            _cached_module_reference(module, config, cache_dir, jobs)
+        else:
+            _reference_markdown({**config, "modules": [module]}, jobs)
+    return timings.phases
+
+
+def _cached_module_reference(module: str, config: dict, cache_dir: str, jobs: int = 1) -> None:
+    options = {key: value for key, value in config.items() if key not in ("modules", "output_dir")}
+    if config.get("mode") == ast_reference.AST:
+        sources = ast_reference.module_sources(module)
+    else:
+        sources = cache.module_sources(module)
+    if not sources:  # nothing to key the cache on
+        _reference_markdown({**config, "modules": [module]}, jobs)
+        return
+
+    key = cache.digest(
+        module,
+        options,
+        [(source, cache.file_digest(source)) for source in sources],
+        _package_version("pdocs"),
+        __version__,
+    )
+    module_cache_dir = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", module))
+    entry = os.path.join(module_cache_dir, key)
+    if not os.path.isdir(entry):
+        with tempfile.TemporaryDirectory() as render_dir:
+            _reference_markdown({**config, "modules": [module], "output_dir": render_dir}, jobs)
+            shutil.rmtree(module_cache_dir, ignore_errors=True)
+            shutil.copytree(render_dir, entry)
+
+    shutil.copytree(entry, config["output_dir"], dirs_exist_ok=True)
+
+
+def _reference_markdown(config: dict, jobs: int = 1) -> None:
+    options = {key: value for key, value in config.items() if key not in ("mode", "split_source")}
+    if config.get("mode") == ast_reference.AST:
+        ast_reference.as_markdown(**options, jobs=jobs)
+    else:
+        pdocs_as_markdown(**options)
+    if config.get("split_source"):
+        for module in config["modules"]:
+            listings.split(config["output_dir"], module)
+
+
+def mkdocs(
+    config: dict,
+    dirty: bool = False,
+    markdown_cache: str = "",
+    highlight_cache: str = "",
+    highlight_cache_size: int = 0,
+):
     """Render the project's associated Markdown documentation using the specified
     MkDocs config passed into the MkDocs `build` command.
 
-    This rendering is from `.md` Markdown documents into HTML
+    This rendering is from `.md` Markdown documents into HTML.
+    If `dirty` is set only pages whose source changed since they were last rendered are rebuilt.
+    If a `markdown_cache` directory is given the HTML each page's Markdown converts into is cached
+    there, only converting the pages whose Markdown changed since it was cached.
+    Likewise given a `highlight_cache` directory the highlighted HTML of each code block is cached
+    there, keeping up to `highlight_cache_size` bytes of the most recently used code blocks.
     """
     config_instance = _mkdocs_config(config)
+    _mkdocs_logging(dirty)
+    with fragments.cached(markdown_cache, prune=not dirty), highlighting.cached(highlight_cache, highlight_cache_size):
+        return mkdocs_build(config_instance, dirty=dirty)
+
+
+def _markdown_cache(config: dict) -> str:
+    """Returns the directory the project's Markdown conversions are cached in, if enabled."""
+    return os.path.join(cache.directory(config), "markdown") if config["markdown_cache"] else ""
 
+
+def _highlight_cache(config: dict) -> Dict[str, Any]:
+    """Returns the `mkdocs` arguments caching the project's highlighted code, if enabled."""
+    if not config["highlight_cache"]:
+        return {}
+    return {
+        "highlight_cache": os.path.join(cache.directory(config), "highlight"),
+        "highlight_cache_size": config["highlight_cache_size"] * 1024 * 1024,
+    }
+
+
+def _stripped_source_dir(config: dict, input_dir: str) -> str:
+    """Returns the input_dir relative directory of the reference pages whose embedded source
+    is left out of the search index, if it is sharded.
+    """
+    if not config["search_shards"]:
+        return ""
+    return os.path.relpath(config["pdocs"].get("output_dir", os.path.join(input_dir, "reference")), input_dir)
+
+
+def _mkdocs_logging(dirty: bool = False) -> None:
     logger = logging.getLogger('mkdocs')
     # Don't restrict level on logger; use handler
     logger.setLevel(1)
     logger.propagate = False
 
+    for handler in list(logger.handlers):
+        if handler.name == 'MkDocsStreamHandler':
+            logger.removeHandler(handler)  # left by a previous build within this process
     stream = logging.StreamHandler()
     from mkdocs.__main__ import ColorFormatter
 
     stream.setFormatter(ColorFormatter())
     stream.setLevel(logging.WARNING)
+    if dirty:
+        # portray only performs dirty builds when the nav is unchanged, making MkDocs warning moot
+        stream.addFilter(lambda record: "'dirty' build" not in record.getMessage())
     stream.name = 'MkDocsStreamHandler'
     logger.addHandler(stream)
 
-    return mkdocs_build(config_instance)
-
 
 @contextmanager
-def documentation_in_temp_folder(config: dict) -> Iterator[Tuple[str, str]]:
-    """Build documentation within a temp folder, returning that folder name before it is deleted."""
+def documentation_in_temp_folder(config: dict, changes: Optional[watch.Changes] = None) -> Iterator[Tuple[str, str]]:
+    """Build documentation within a temp folder, returning that folder name before it is deleted.
+
+    When the project is configured as `incremental` the persistent build cache is used instead
+    of temporary folders, and only pages whose inputs changed since the last build are rendered.
+    Incremental builds given the `changes` since the previous build only restage the changed
+    pages and only regenerate reference documentation for the changed modules.
+    """
     if config["append_directory_to_python_path"] and config["directory"] not in sys.path:
         sys.path.append(config["directory"])
 
+    incremental = bool(config["incremental"])
+    targeted = incremental and changes is not None and not changes.full
+    with _build_directories(config) as (input_dir, temp_output_dir):
+        with yaspin(text="Copying source documentation to temporary compilation directory") as spinner:
+            with timing.phase("staging", input_dir):
+                staged = _stage(config, input_dir, incremental, changes.pages if targeted else None)  # type: ignore
+            spinner.ok("Done")
+
+        if "docs_dir" not in config["mkdocs"]:
+            config["mkdocs"]["docs_dir"] = input_dir
+        if "site_dir" not in config["mkdocs"]:
+            config["mkdocs"]["site_dir"] = temp_output_dir
+        with timing.phase("nav"):
+            nav = _nav(config, input_dir, staged, incremental)
+
+        if config["include_reference_documentation"] and (
+            config["include_reference_documentation"] not in ("false", "False")
+            or config["include_reference_documentation"]
+        ):
+            with yaspin(text="Auto generating reference documentation using pdocs") as spinner:
+                if "output_dir" not in config["pdocs"]:
+                    config["pdocs"]["output_dir"] = os.path.join(input_dir, "reference")
+                try:
+                    with timing.phase("pdocs", config["pdocs"]["output_dir"]):
+                        if targeted:
+                            if changes.modules or not os.path.isdir(config["pdocs"]["output_dir"]):  # type: ignore
+                                _incremental_pdocs(config, changes.modules)  # type: ignore
+                        elif incremental:
+                            _incremental_pdocs(config)
+                        else:
+                            pdocs(config["pdocs"], jobs=config["jobs"], limits=workers.Limits.from_config(config))
+                except Exception as exc:
+                    import traceback
+
+                    tb = traceback.format_tb(exc.__traceback__)
+                    print("".join(tb), file=sys.stderr)
+                    raise exc
+                with timing.phase("nav"):
+                    reference_docs = _nested_docs(config["pdocs"]["output_dir"], input_dir, config)
+                nav.append({"Reference": reference_docs})  # type: ignore
+                spinner.ok("Done")
+
+        with yaspin(text="Rendering complete website from Markdown using MkDocs") as spinner:
+            stripped_dir = _stripped_source_dir(config, input_dir)
+            with timing.phase("mkdocs", config["mkdocs"]["site_dir"]), search.stripped_source(stripped_dir):
+                if incremental:
+                    _incremental_mkdocs(config, input_dir, staged)
+                else:
+                    mkdocs(config["mkdocs"], markdown_cache=_markdown_cache(config), **_highlight_cache(config))
+            spinner.ok("Done")
+
+        if config["collapsed_nav"]:
+            with timing.phase("nav"):
+                navigation.write_tree(
+                    config["mkdocs"]["site_dir"],
+                    config["mkdocs"]["nav"],
+                    use_directory_urls=config["mkdocs"].get("use_directory_urls", True),
+                )
+
+        if config["search_shards"]:
+            with timing.phase("search", os.path.join(config["mkdocs"]["site_dir"], search.SEARCH_DIR)):
+                search.shard(
+                    config["mkdocs"]["site_dir"],
+                    config["mkdocs"]["nav"],
+                    use_directory_urls=config["mkdocs"].get("use_directory_urls", True),
+                )
+
+        if config["compress"]:
+            with yaspin(text="Precompressing the website's assets") as spinner:
+                with timing.phase("compress") as compressed:
+                    stats = compress.sidecars(
+                        config["mkdocs"]["site_dir"],
+                        os.path.join(cache.directory(config), "compressed"),
+                        min_size=config["compress_min_size"],
+                    )
+                    compressed.files = stats["compressed"]
+                    compressed.size = stats["size"]
+                spinner.ok("Done")
+
+        # remove any settings pointing to the temp dirs
+        if config["mkdocs"]["docs_dir"].startswith(input_dir):
+            del config["mkdocs"]["docs_dir"]
+        if config["mkdocs"]["site_dir"].startswith(temp_output_dir):
+            del config["mkdocs"]["site_dir"]
+        if config["pdocs"].get("output_dir") and config["pdocs"]["output_dir"].startswith(input_dir):
+            del config["pdocs"]["output_dir"]
+        if config["include_reference_documentation"]:
+            nav.pop()
+
+        yield input_dir, temp_output_dir
+
+
+def _nav(config: dict, input_dir: str, staged: Set[str], incremental: bool = False) -> list:
+    """Returns the MkDocs nav for the staged documentation, generating a default one from the
+    staged files if none is configured.
+    """
+    if "nav" not in config["mkdocs"]:
+        nav = config["mkdocs"]["nav"] = []
+
+        root_docs = [doc for doc in _markdown_tree(input_dir, recursive=False).files if doc != "README.md"]
+        if "README.md" not in staged:  # a README.md left within the build cache by a previous build is replaced
+            _write(os.path.join(input_dir, "README.md"), NO_HOME_PAGE, incremental)
+            staged.add("README.md")
+
+        nav.append({"Home": "README.md"})
+
+        nav.extend({_label(doc, config): doc} for doc in root_docs)
+
+        nav.extend(_nested_docs(os.path.join(input_dir, config["docs_dir"]), input_dir, config))
+    else:
+        nav = config["mkdocs"]["nav"]
+        if nav:
+            index_nav = nav[0]
+            index_page: str = ""
+            if index_nav and isinstance(index_nav, dict):
+                index_page = tuple(index_nav.values())[0]
+            elif isinstance(index_nav, str):  # pragma: no cover
+                index_page = index_nav
+
+            if index_page:
+
+                destination_index_page = os.path.join(input_dir, "index.md")
+                if index_page != "README.md" and index_page != "index.md":
+                    if incremental and "index.md" not in staged:
+                        cache.sync_file(os.path.join(input_dir, index_page), destination_index_page)
+                        staged.add("index.md")
+                    elif not os.path.exists(destination_index_page):
+                        shutil.copyfile(os.path.join(input_dir, index_page), destination_index_page)
+
+    return nav
+
+
+@contextmanager
+def _build_directories(config: dict) -> Iterator[Tuple[str, str]]:
+    """Yields the (input, output) directories a build should use: persistent folders within the
+    build cache for incremental builds, or temporary folders that are removed afterwards.
+    """
+    if config["incremental"]:
+        cache_dir = cache.directory(config)
+        input_dir = os.path.join(cache_dir, "input")
+        output_dir = os.path.join(cache_dir, "site")
+        os.makedirs(input_dir, exist_ok=True)
+        os.makedirs(output_dir, exist_ok=True)
+        yield input_dir, output_dir
+        return
+
     with tempfile.TemporaryDirectory() as input_dir:
         input_dir = os.path.join(input_dir, "input")
         os.mkdir(input_dir)
-        with tempfile.TemporaryDirectory() as temp_output_dir:
+        with tempfile.TemporaryDirectory() as output_dir:
+            yield input_dir, output_dir
 
-            with yaspin(text="Copying source documentation to temporary compilation directory") as spinner:
-                for root_file in os.listdir(config["directory"]):
-                    root_file_absolute = os.path.join(config["directory"], root_file)
-                    if os.path.isfile(root_file_absolute) and is_markdown_file(root_file_absolute):
-                        shutil.copyfile(root_file_absolute, os.path.join(input_dir, root_file))
 
-                for source_directory in [config["docs_dir"]] + config["extra_dirs"]:
-                    directory_absolute = os.path.join(config["directory"], source_directory)
-                    if os.path.isdir(directory_absolute):
-                        shutil.copytree(directory_absolute, os.path.join(input_dir, source_directory))
+def _stage(config: dict, input_dir: str, incremental: bool = False, only: Optional[Iterable[str]] = None) -> Set[str]:
+    """Stages the projects root Markdown files, `docs_dir` and `extra_dirs` into input_dir
+    using the configured `staging` strategy.
 
-                spinner.ok("Done")
+    Incremental builds only stage files that changed since they were last staged, or if
+    given, `only` the listed project relative paths.
+    Returns the set of staged paths relative to input_dir.
+    """
+    staged: Set[str] = set()
+    if only is not None:
+        for relative in only:
+            staging.stage_file(
+                os.path.join(config["directory"], relative), os.path.join(input_dir, relative), config["staging"]
+            )
+        reference_dir = os.path.join(input_dir, "reference")
+        for root, _, files in os.walk(input_dir):
+            if root != reference_dir and not root.startswith(reference_dir + os.sep):
+                staged.update(os.path.relpath(os.path.join(root, name), input_dir) for name in files)
+        return staged
+
+    sources: Dict[str, str] = {}
+    for root_file in os.listdir(config["directory"]):
+        root_file_absolute = os.path.join(config["directory"], root_file)
+        if os.path.isfile(root_file_absolute) and is_markdown_file(root_file_absolute):
+            sources[root_file] = root_file_absolute
+
+    for source_directory in [config["docs_dir"]] + config["extra_dirs"]:
+        directory_absolute = os.path.join(config["directory"], source_directory)
+        for root, _, files in os.walk(directory_absolute):
+            for name in files:
+                sources[os.path.relpath(os.path.join(root, name), config["directory"])] = os.path.join(root, name)
+
+    for relative, source in sources.items():
+        destination = os.path.join(input_dir, relative)
+        if not (incremental and staging.is_current(source, destination)):
+            staging.stage_file(source, destination, config["staging"])
+        staged.add(relative)
+
+    if incremental:
+        # generated pages and the reference tree are kept in sync separately
+        kept = staged | {"README.md", "index.md"}
+        for root, _, files in os.walk(os.path.join(input_dir, "reference")):
+            kept.update(os.path.relpath(os.path.join(root, name), input_dir) for name in files)
+        cache.remove_stale(input_dir, kept)
+
+    return staged
+
+
+def _write(path: str, content: str, incremental: bool = False) -> None:
+    """Writes content to path, leaving an identical existing file untouched for incremental builds."""
+    if incremental and os.path.isfile(path):
+        with open(path) as existing_file:
+            if existing_file.read() == content:
+                return
+
+    with open(path, "w") as output_file:
+        output_file.write(content)
+
+
+def _incremental_pdocs(config: dict, modules: Iterable[str] = ()) -> None:
+    """Renders reference documentation into the build cache, reusing the cached Markdown of
+    every unchanged module and only touching files whose rendered content changed so
+    unchanged pages keep their modification times.
+
+    If `modules` are given only their reference documentation is regenerated, after making
+    sure any previously imported version of them is reloaded.
+    """
+    pdocs_config = config["pdocs"]
+    for module in modules:
+        for loaded in [name for name in sys.modules if name == module or name.startswith(f"{module}.")]:
+            del sys.modules[loaded]
+    if modules:
+        importlib.invalidate_caches()
+    with tempfile.TemporaryDirectory() as reference_dir:
+        pdocs(
+            {**pdocs_config, "modules": list(modules or pdocs_config["modules"]), "output_dir": reference_dir},
+            cache_dir=os.path.join(cache.directory(config), "reference"),
+            jobs=config["jobs"],
+            limits=workers.Limits.from_config(config),
+        )
+        if not modules:
+            cache.sync_tree(reference_dir, pdocs_config["output_dir"])
+            return
+
+        for module in modules:
+            module_path = os.path.join(*module.split("."))
+            for rendered in (module_path, f"{module_path}.md", f"{module_path}.source"):
+                source = os.path.join(reference_dir, rendered)
+                if os.path.isdir(source):
+                    cache.sync_tree(source, os.path.join(pdocs_config["output_dir"], rendered))
+                elif os.path.isfile(source):
+                    cache.sync_file(source, os.path.join(pdocs_config["output_dir"], rendered))
+
+
+def _incremental_mkdocs(config: dict, input_dir: str, staged: Set[str]) -> None:
+    """Renders the staged Markdown into the build cache's site directory.
+
+    A full build is performed whenever the resolved configuration (including the nav and with
+    it the set of pages) changed since the last build, otherwise only pages whose source is
+    newer than their rendered output are rebuilt.
+    """
+    cache_dir = cache.directory(config)
+    reference_dir = config["pdocs"].get("output_dir", "")
+    if reference_dir.startswith(input_dir) and os.path.isdir(reference_dir):
+        for root, _, files in os.walk(reference_dir):
+            staged.update(os.path.relpath(os.path.join(root, name), input_dir) for name in files)
+    cache.remove_stale(input_dir, staged)
+
+    manifest = cache.load_manifest(cache_dir)
+    # the nav is the same whether or not the home page is generated, so it is fingerprinted separately
+    fingerprint = cache.digest(__version__, _package_version("mkdocs"), config, _generated_home_page(input_dir))
+    site_dir = config["mkdocs"]["site_dir"]
+    search_index_file = os.path.join(site_dir, "search", "search_index.json")
+    dirty = manifest.get("site") == fingerprint and os.path.isfile(search_index_file)
+    if dirty:
+        with open(search_index_file) as previous_index_file:
+            previous_index = json.load(previous_index_file)
+    else:
+        shutil.rmtree(site_dir, ignore_errors=True)
+        os.makedirs(site_dir)
+
+    mkdocs(config["mkdocs"], dirty=dirty, markdown_cache=_markdown_cache(config), **_highlight_cache(config))
+
+    if dirty:
+        with open(search_index_file) as search_index:
+            current_index = json.load(search_index)
+        with open(search_index_file, "w") as search_index:
+            json.dump(_merge_search_index(previous_index, current_index), search_index)
+
+    manifest["site"] = fingerprint
+    cache.save_manifest(cache_dir, manifest)
+
+
+def _generated_home_page(input_dir: str) -> bool:
+    """Returns whether the staged home page is the one generated for projects without a README.md."""
+    try:
+        with open(os.path.join(input_dir, "README.md")) as home_page:
+            return home_page.read() == NO_HOME_PAGE
+    except FileNotFoundError:
+        return False
+
+
+def _merge_search_index(previous: dict, current: dict) -> dict:
+    """Dirty MkDocs builds only index the pages they rebuilt, this restores the entries of
+    every page that was left untouched from the previous builds search index.
+    """
+    rebuilt = {doc["location"].split("#")[0] for doc in current.get("docs", [])}
+    kept = [doc for doc in previous.get("docs", []) if doc["location"].split("#")[0] not in rebuilt]
+    return {**current, "docs": kept + current.get("docs", [])}
 
-            if "docs_dir" not in config["mkdocs"]:
-                config["mkdocs"]["docs_dir"] = input_dir
-            if "site_dir" not in config["mkdocs"]:
-                config["mkdocs"]["site_dir"] = temp_output_dir
-            if "nav" not in config["mkdocs"]:
-                nav = config["mkdocs"]["nav"] = []
-
-                root_docs = sorted(glob(os.path.join(input_dir, "*.md")))
-                readme_doc = os.path.join(input_dir, "README.md")
-                if readme_doc in root_docs:
-                    root_docs.remove(readme_doc)
-                else:
-                    with open(readme_doc, "w") as readme_doc_file:
-                        readme_doc_file.write(NO_HOME_PAGE)
 
-                nav.append({"Home": "README.md"})
+def _package_version(package: str) -> str:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+        return ""
 
-                nav.extend(_doc(doc, input_dir, config) for doc in root_docs)
 
-                nav.extend(_nested_docs(os.path.join(input_dir, config["docs_dir"]), input_dir, config))
-            else:
-                nav = config["mkdocs"]["nav"]
-                if nav:
-                    index_nav = nav[0]
-                    index_page: str = ""
-                    if index_nav and isinstance(index_nav, dict):
-                        index_page = tuple(index_nav.values())[0]
-                    elif isinstance(index_nav, str):  # pragma: no cover
-                        index_page = index_nav
-
-                    if index_page:
-
-                        destination_index_page = os.path.join(input_dir, "index.md")
-                        if (
-                            index_page != "README.md"
-                            and index_page != "index.md"
-                            and not os.path.exists(destination_index_page)
-                        ):
-                            shutil.copyfile(os.path.join(input_dir, index_page), destination_index_page)
-
-            if config["include_reference_documentation"] and (
-                config["include_reference_documentation"] not in ("false", "False")
-                or config["include_reference_documentation"]
-            ):
-                with yaspin(text="Auto generating reference documentation using pdocs") as spinner:
-                    if "output_dir" not in config["pdocs"]:
-                        config["pdocs"]["output_dir"] = os.path.join(input_dir, "reference")
-                    try:
-                        pdocs(config["pdocs"])
-                    except Exception as exc:
-                        import traceback
-
-                        tb = traceback.format_tb(exc.__traceback__)
-                        print("".join(tb), file=sys.stderr)
-                        raise exc
-                    reference_docs = _nested_docs(config["pdocs"]["output_dir"], input_dir, config)
-                    nav.append({"Reference": reference_docs})  # type: ignore
-                    spinner.ok("Done")
+def keep_warm() -> None:
+    """Keeps validated MkDocs configurations and theme template environments in memory between
+    builds. Intended for long running processes that build repeatedly, such as `portray daemon`.
+    """
+    global _warm_configs, _warm_environments
+    if _warm_configs is None:
+        _warm_configs = {}
+    if _warm_environments is None:
+        _warm_environments = {}
+
+    if not getattr(Theme.get_env, "_portray_warm", False):
+        uncached_get_env = Theme.get_env
+
+        def get_env(theme: Theme):
+            if _warm_environments is None:
+                return uncached_get_env(theme)
+
+            key = (tuple(theme.dirs), str(theme["locale"]))
+            if key not in _warm_environments:
+                environment = uncached_get_env(theme)
+                # compiled templates are kept, but still reloaded if edited on disk
+                environment.auto_reload = True
+                _warm_environments[key] = environment
+            return _warm_environments[key]
+
+        get_env._portray_warm = True  # type: ignore
+        Theme.get_env = get_env  # type: ignore
+
+
+def forget_modules(directory: str) -> None:
+    """Discards the modules imported from within the projects directory, so that processes
+    building repeatedly document the projects current source. Modules of the environment
+    `portray` runs from (such as a `.venv` within the project) and `portray` itself are kept.
+    """
+    directory = os.path.abspath(directory) + os.sep
+    environments = tuple(os.path.abspath(prefix) + os.sep for prefix in {sys.prefix, sys.exec_prefix})
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None) or ""
+        if (
+            module_file.startswith(directory)
+            and not module_file.startswith(environments)
+            and name.split(".")[0] != "portray"
+        ):
+            del sys.modules[name]
 
-            with yaspin(text="Rendering complete website from Markdown using MkDocs") as spinner:
-                mkdocs(config["mkdocs"])
-                spinner.ok("Done")
 
-            # remove any settings pointing to the temp dirs
-            if config["mkdocs"]["docs_dir"].startswith(input_dir):
-                del config["mkdocs"]["docs_dir"]
-            if config["mkdocs"]["site_dir"].startswith(temp_output_dir):
-                del config["mkdocs"]["site_dir"]
-            if config["pdocs"].get("output_dir") and config["pdocs"]["output_dir"].startswith(input_dir):
-                del config["pdocs"]["output_dir"]
-            if config["include_reference_documentation"]:
-                nav.pop()
+def _mkdocs_config(config: dict) -> mkdocs_config.Config:
+    if _warm_configs is not None:
+        # builds use fresh temporary directories, which are the only settings allowed to differ
+        key = cache.digest({name: value for name, value in config.items() if name not in ("docs_dir", "site_dir")})
+        if key not in _warm_configs:
+            _warm_configs[key] = _validated_mkdocs_config(config)
+        config_instance = copy.deepcopy(_warm_configs[key])
+        for directory_setting in ("docs_dir", "site_dir"):
+            if directory_setting in config:
+                config_instance[directory_setting] = os.path.abspath(config[directory_setting])
+        return config_instance
 
-            yield input_dir, temp_output_dir
+    return _validated_mkdocs_config(config)
 
 
-def _mkdocs_config(config: dict) -> mkdocs_config.Config:
+def _validated_mkdocs_config(config: dict) -> mkdocs_config.Config:
     config_instance = mkdocs_config.Config(schema=mkdocs_schema())
     config_instance.load_dict(config)
 
@@ -205,26 +655,64 @@ def _mkdocs_config(config: dict) -> mkdocs_config.Config:
     return config_instance
 
 
+class _MarkdownTree(NamedTuple):
+    """The Markdown files within a directory, along with every subdirectory containing any."""
+
+    files: List[str]
+    directories: List[Tuple[str, "_MarkdownTree"]]
+
+    def __bool__(self) -> bool:
+        return bool(self.files or self.directories)
+
+
+def _markdown_tree(directory: str, recursive: bool = True) -> _MarkdownTree:
+    """Indexes the Markdown files within directory, scanning each directory exactly once.
+
+    Entries are sorted and hidden entries skipped, matching the ordering of `glob`.
+    """
+    files = []
+    directories = []
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return _MarkdownTree([], [])
+
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir():
+            if recursive:
+                nested_tree = _markdown_tree(entry.path)
+                if nested_tree:
+                    directories.append((entry.name, nested_tree))
+        elif entry.name.endswith(".md"):
+            files.append(entry.name)
+
+    # glob sorts directories by their path, including the trailing separator
+    directories.sort(key=lambda directory: directory[0] + os.sep)
+    return _MarkdownTree(files, directories)
+
+
 def _nested_docs(directory: str, root_directory: str, config: dict) -> list:
-    nav = [_doc(doc, root_directory, config) for doc in sorted(glob(os.path.join(directory, "*.md")))]
+    return _tree_nav(_markdown_tree(directory), os.path.relpath(directory, root_directory), config)
+
 
-    nested_dirs = sorted(glob(os.path.join(directory, "*/")))
-    for nested_dir in nested_dirs:
-        if len(glob(os.path.join(nested_dir, "*.md")) + glob(os.path.join(nested_dir, "**/*.md"))) > 0:
-            dir_nav = {_label(nested_dir[:-1], config): _nested_docs(nested_dir, root_directory, config)}
-            nav.append(dir_nav)  # type: ignore
+def _tree_nav(tree: _MarkdownTree, relative_directory: str, config: dict) -> list:
+    nav: list = [{_label(doc, config): os.path.join(relative_directory, doc)} for doc in tree.files]
+    for nested_dir, nested_tree in tree.directories:
+        nested_nav = _tree_nav(nested_tree, os.path.join(relative_directory, nested_dir), config)
+        nav.append({_label(nested_dir, config): nested_nav})
 
     return nav
 
 
 def _label(path: str, config: Dict) -> str:
-    label = os.path.basename(path)
-    if "." in label:
-        label = ".".join(label.split(".")[:-1])
-    label = label.replace("-", " ").replace("_", " ").title()
+    label = _title(os.path.basename(path))
     return config["labels"].get(label, label)
 
 
-def _doc(path: str, root_path: str, config: dict) -> Dict[str, str]:
-    path = os.path.relpath(path, root_path)
-    return {_label(path, config): path}
+@lru_cache(maxsize=None)
+def _title(name: str) -> str:
+    if "." in name:
+        name = ".".join(name.split(".")[:-1])
+    return name.replace("-", " ").replace("_", " ").title()
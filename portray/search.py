@@ -0,0 +1,165 @@
+"""Defines the optional post-build stage splitting a built site's search index into shards.
+
+MkDocs writes a single `search/search_index.json` which, for projects with large reference
+documentation, can reach tens of megabytes that every browser has to download and parse before
+search works. With `search_shards` enabled the index is split by top level nav section (with
+the `Reference` section split per package) into `search/shards/`, alongside a small
+`search/manifest.json` describing them. portray's theme only loads the shards once search is
+first used, fetching them in parallel, rather than the monolithic index other themes still read.
+Embedded source code is left out of the indexed text of reference pages, as it is stripped from
+their HTML before MkDocs indexes it.
+"""
+
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from portray import navigation
+
+SEARCH_DIR = "search"
+INDEX_FILE = "search_index.json"
+MANIFEST_FILE = "manifest.json"
+SHARDS_DIR = "shards"
+REFERENCE_SECTION = "Reference"
+DEFAULT_SECTION = "Home"
+THEME_FLAG = "portray_search_shards"
+
+_SOURCE_BLOCK = re.compile(r"<details[^>]*>\s*<summary>\s*View Source\s*</summary>.*?</details>", re.S)
+_reference_dir: Optional[str] = None
+_unstripped_add_entry_from_context: Any = None  # MkDocs' own, once replaced
+
+
+@contextmanager
+def stripped_source(reference_dir: str) -> Iterator[None]:
+    """Strips embedded source code from the reference pages beneath reference_dir (relative to
+    MkDocs' `docs_dir`) indexed within the context, leaving the pages themselves untouched.
+    Given no directory nothing is stripped.
+    """
+    global _reference_dir, _unstripped_add_entry_from_context
+    if not reference_dir:
+        yield
+        return
+
+    # imported lazily along with MkDocs
+    from mkdocs.contrib.search.search_index import SearchIndex
+
+    if not getattr(SearchIndex.add_entry_from_context, "_portray_stripped", False):
+        _unstripped_add_entry_from_context = SearchIndex.add_entry_from_context
+        SearchIndex.add_entry_from_context = _add_entry_from_context  # type: ignore
+    _reference_dir = reference_dir.replace(os.sep, "/").strip("/") + "/"
+    try:
+        yield
+    finally:
+        _reference_dir = None
+
+
+def shard(site_dir: str, nav: list, use_directory_urls: bool = True) -> Dict:
+    """Splits the search index of the site built into site_dir into one shard per section of nav.
+
+    Returns the manifest written next to the index, or an empty one if the site has no index.
+    """
+    search_dir = os.path.join(site_dir, SEARCH_DIR)
+    index_file = os.path.join(search_dir, INDEX_FILE)
+    if not os.path.isfile(index_file):
+        return {}
+
+    with open(index_file) as index:
+        search_index = json.load(index)
+
+    sections = _page_sections(nav, use_directory_urls)
+    shards: Dict[str, List[dict]] = {}
+    for doc in search_index.get("docs", []):
+        shards.setdefault(sections.get(doc["location"].split("#")[0], DEFAULT_SECTION), []).append(doc)
+
+    shards_dir = os.path.join(search_dir, SHARDS_DIR)
+    shutil.rmtree(shards_dir, ignore_errors=True)
+    os.makedirs(shards_dir)
+    manifest: Dict[str, Any] = {"config": search_index.get("config", {}), "shards": []}
+    docs = []
+    for section, section_docs in shards.items():
+        shard_file = f"{_slug(section)}.json"
+        if os.path.exists(os.path.join(shards_dir, shard_file)):  # sections differing only in punctuation
+            shard_file = f"{_slug(section)}-{len(manifest['shards'])}.json"
+        _write_json(os.path.join(shards_dir, shard_file), {"docs": section_docs})
+        manifest["shards"].append(
+            {
+                "section": section,
+                "path": f"{SHARDS_DIR}/{shard_file}",
+                "documents": len(section_docs),
+                "size": os.path.getsize(os.path.join(shards_dir, shard_file)),
+            }
+        )
+        docs.extend(section_docs)
+
+    _write_json(index_file, {**search_index, "docs": docs})
+    _write_json(os.path.join(search_dir, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def strip_source(html: str) -> str:
+    """Removes the embedded source code of pdocs' "View Source" blocks from the HTML of a page."""
+    return _SOURCE_BLOCK.sub("", html)
+
+
+def _add_entry_from_context(index, page) -> None:
+    # a replacement of MkDocs' `SearchIndex.add_entry_from_context`, which the indexes of themes extend
+    if _reference_dir is None or not page.file.src_path.replace(os.sep, "/").startswith(_reference_dir):
+        _unstripped_add_entry_from_context(index, page)
+        return
+
+    content = page.content
+    page.content = strip_source(content)
+    try:
+        _unstripped_add_entry_from_context(index, page)
+    finally:
+        page.content = content
+
+
+_add_entry_from_context._portray_stripped = True  # type: ignore
+
+
+def _page_sections(nav: list, use_directory_urls: bool) -> Dict[str, str]:
+    sections = {}
+    for section, path in _section_pages(nav):
+        sections.setdefault(navigation.page_url(path, use_directory_urls), section)
+    return sections
+
+
+def _section_pages(nav: list) -> Iterator[Tuple[str, str]]:
+    for item in nav:
+        for label, value in _nav_items(item):
+            if isinstance(value, str):
+                yield DEFAULT_SECTION, value
+            elif label == REFERENCE_SECTION and isinstance(value, list):
+                for package, package_value in (entry for child in value for entry in _nav_items(child)):
+                    section = f"{REFERENCE_SECTION}/{package}" if package else REFERENCE_SECTION
+                    yield from ((section, path) for path in _pages(package_value))
+            else:
+                yield from ((label, path) for path in _pages(value))
+
+
+def _pages(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            for _, nested_value in _nav_items(item):
+                yield from _pages(nested_value)
+
+
+def _nav_items(item: Any) -> List[Tuple[Optional[str], Any]]:
+    if isinstance(item, dict):
+        return list(item.items())
+    return [(None, item)]
+
+
+def _slug(section: str) -> str:
+    return re.sub(r"[^\w.-]+", "-", section.lower()).strip("-") or "section"
+
+
+def _write_json(path: str, content: dict) -> None:
+    with open(path, "w") as json_file:
+        json.dump(content, json_file, separators=(",", ":"))
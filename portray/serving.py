@@ -0,0 +1,91 @@
+"""Defines how `portray`'s local server serves a generated site.
+
+Precompressed sidecars written by the `compress` build stage are served to clients that
+accept them, rather than the uncompressed files, and the pages of lazily rendered sites are
+rendered as they're requested.
+"""
+
+from typing import Optional
+
+from livereload.handlers import StaticFileHandler
+from tornado.ioloop import IOLoop
+from tornado.web import RequestHandler
+
+from portray import compress, lazy
+
+
+class SidecarStaticFileHandler(StaticFileHandler):
+    """Serves the `.br` or `.gz` sidecar of a requested file when the client accepts it.
+
+    HTML is only served compressed when `compressed_html` is set, as live reloading injects
+    its script into uncompressed HTML pages.
+    """
+
+    compressed_html = True
+
+    def validate_absolute_path(self, root: str, absolute_path: str):
+        absolute_path = super().validate_absolute_path(root, absolute_path)
+        self.requested_path = absolute_path
+        if absolute_path is None:
+            return None
+
+        self.add_header("Vary", "Accept-Encoding")
+        sidecar = compress.sidecar(absolute_path, self.request.headers.get("Accept-Encoding", ""), self.compressed_html)
+        if sidecar is None:
+            return absolute_path
+
+        sidecar_path, encoding = sidecar
+        self.set_header("Content-Encoding", encoding)
+        if hasattr(self, "_stat_result"):
+            del self._stat_result  # cached by tornado for the requested, rather than the served, file
+        return sidecar_path
+
+    def get_content_type(self) -> str:
+        # the type of the requested file, rather than of its compressed sidecar
+        served_path = self.absolute_path
+        self.absolute_path = self.requested_path
+        try:
+            return super().get_content_type()
+        finally:
+            self.absolute_path = served_path
+
+
+class LiveSidecarStaticFileHandler(SidecarStaticFileHandler):
+    """Serves sidecars while live reloading, leaving HTML pages uncompressed."""
+
+    compressed_html = False
+
+
+class LazyStaticFileHandler(SidecarStaticFileHandler):
+    """Serves the pages of a lazily rendered `site`, rendering each the first time it's requested."""
+
+    compressed_html = False
+    site: Optional[lazy.Site] = None
+
+    async def get(self, path: str, include_body: bool = True) -> None:
+        if self.site is None:
+            await super().get(path, include_body)
+            return
+
+        content = None
+        if self.site.location(path) is not None:
+            # rendering a page can take a while, during which other requests are still served
+            content = await IOLoop.current().run_in_executor(None, self.site.page, path)
+        if content is None and not path.endswith("/") and self.site.location(f"{path}/") is not None:
+            self.redirect(f"/{path}/")
+        elif content is None:
+            await super().get(path, include_body)
+        else:
+            self.set_header("Content-Type", "text/html; charset=UTF-8")
+            if include_body:
+                self.write(content)
+
+    def compute_etag(self) -> Optional[str]:
+        if getattr(self, "absolute_path", None) is None:
+            return RequestHandler.compute_etag(self)  # of the rendered page, rather than of a file
+        return super().compute_etag()
+
+
+def lazy_handler(site: lazy.Site) -> type:
+    """Returns a handler serving the pages of the given lazily rendered site."""
+    return type("LazySiteStaticFileHandler", (LazyStaticFileHandler,), {"site": site})
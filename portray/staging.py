@@ -0,0 +1,95 @@
+"""Defines how project files are staged into the temporary compilation directory.
+
+Beyond plain copies, files can be staged as hard links, reflinks (copy-on-write clones) or
+symbolic links, so that large media directories cost a few syscalls rather than full copies.
+Whenever the filesystem doesn't support the requested strategy, staging falls back to a copy.
+"""
+
+import errno
+import os
+import shutil
+import sys
+from typing import Callable, Dict
+
+COPY = "copy"
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+SYMLINK = "symlink"
+STRATEGIES = (COPY, HARDLINK, REFLINK, SYMLINK)
+
+FICLONE = 0x40049409  # Linux ioctl used by `cp --reflink`
+
+
+def stage_file(source: str, destination: str, strategy: str = COPY) -> str:
+    """Stages source at destination using the given strategy, replacing anything already there.
+
+    Returns the strategy that was actually used, which will be `copy` whenever the requested
+    strategy isn't supported for the given files.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown staging strategy '{strategy}', expected one of: {', '.join(STRATEGIES)}")
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    if os.path.lexists(destination):
+        # never write through a previously staged link into the projects own files
+        os.remove(destination)
+
+    if strategy != COPY:
+        try:
+            _STAGERS[strategy](source, destination)
+            return strategy
+        except (OSError, NotImplementedError):
+            if os.path.lexists(destination):
+                os.remove(destination)
+
+    shutil.copy2(source, destination)
+    return COPY
+
+
+def is_current(source: str, destination: str) -> bool:
+    """Returns `True` if destination is already an up to date staged version of source,
+    regardless of the strategy it was staged with.
+    """
+    try:
+        if os.path.islink(destination):
+            return os.readlink(destination) == os.path.abspath(source)
+
+        source_stat = os.stat(source)
+        destination_stat = os.stat(destination)
+    except OSError:
+        return False
+
+    return os.path.samestat(source_stat, destination_stat) or (
+        source_stat.st_size == destination_stat.st_size and source_stat.st_mtime == destination_stat.st_mtime
+    )
+
+
+def _hardlink(source: str, destination: str) -> None:
+    os.link(source, destination)
+
+
+def _symlink(source: str, destination: str) -> None:
+    os.symlink(os.path.abspath(source), destination)
+
+
+def _reflink(source: str, destination: str) -> None:
+    if not sys.platform.startswith("linux"):
+        raise NotImplementedError("reflinks are only supported on Linux")
+
+    import fcntl
+
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        try:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+        except OSError as error:
+            if error.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+                raise NotImplementedError(str(error)) from error
+            raise
+    shutil.copystat(source, destination)
+
+
+_STAGERS: Dict[str, Callable[[str, str], None]] = {
+    HARDLINK: _hardlink,
+    REFLINK: _reflink,
+    SYMLINK: _symlink,
+}
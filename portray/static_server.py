@@ -0,0 +1,278 @@
+"""Defines `portray`'s production static file server, used to serve an already built site
+to many concurrent users (such as behind a load balancer) rather than for live reloading.
+
+It is a small asyncio HTTP/1.1 server supporting keep-alive connections, `ETag` /
+`If-None-Match` and `Last-Modified` / `If-Modified-Since` revalidation, single byte `Range`
+requests, precompressed `.br` / `.gz` sidecars (see `portray.compress`) and zero-copy
+`sendfile` for large files. Multiple worker processes can share one listening socket.
+"""
+
+import asyncio
+import email.utils
+import mimetypes
+import os
+import signal
+import socket
+import urllib.parse
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from portray import compress
+
+SENDFILE_THRESHOLD = 64 * 1024
+MAX_HEADER_SIZE = 64 * 1024
+KEEP_ALIVE_TIMEOUT = 15.0
+TEXT_TYPES = ("application/javascript", "application/json", "application/xml", "image/svg+xml")
+REASONS = {
+    200: "OK",
+    206: "Partial Content",
+    301: "Moved Permanently",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+}
+
+
+def serve(root: str, host: str = "127.0.0.1", port: int = 8000, workers: int = 1) -> None:
+    """Serves the site within root until interrupted, using `workers` processes that share
+    one listening socket (`0` uses one per CPU).
+    """
+    workers = workers or os.cpu_count() or 1
+    listening_socket = socket.create_server((host, port), backlog=2048)
+    print(f"Serving {root} on http://{host}:{port} with {workers} worker(s)")
+    if workers == 1 or not hasattr(os, "fork"):
+        _run(listening_socket, root)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                _run(listening_socket, root)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    listening_socket.close()
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+async def start(root: str, listening_socket: socket.socket) -> asyncio.AbstractServer:
+    """Starts serving the site within root on an already bound socket, returning the server."""
+    root = os.path.abspath(root)
+    return await asyncio.start_server(partial(_connection, root), sock=listening_socket, limit=MAX_HEADER_SIZE)
+
+
+def _run(listening_socket: socket.socket, root: str) -> None:
+    async def run() -> None:
+        server = await start(root, listening_socket)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+async def _connection(root: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    connection_socket = writer.get_extra_info("socket")
+    if connection_socket is not None and connection_socket.family in (socket.AF_INET, socket.AF_INET6):
+        connection_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        keep_alive = True
+        while keep_alive:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                return
+
+            request = _parse(head)
+            if request is None:
+                await _send(writer, 400, {}, b"Bad Request", keep_alive=False)
+                return
+            method, target, version, headers = request
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+            if "content-length" in headers:  # requests for static files don't carry bodies
+                keep_alive = False
+
+            await _respond(writer, root, method, target, headers, keep_alive)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def _parse(head: bytes) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    try:
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        return None
+    if not version.startswith("HTTP/1."):
+        return None
+
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+async def _respond(
+    writer: asyncio.StreamWriter, root: str, method: str, target: str, headers: Dict[str, str], keep_alive: bool
+) -> None:
+    if method not in ("GET", "HEAD"):
+        await _send(writer, 405, {"Allow": "GET, HEAD"}, b"Method Not Allowed", keep_alive)
+        return
+
+    split_target = urllib.parse.urlsplit(target)
+    request_path = urllib.parse.unquote(split_target.path)
+    path = os.path.normpath(os.path.join(root, request_path.lstrip("/")))
+    if "\x00" in path or (path != root and not path.startswith(root + os.sep)):
+        await _not_found(writer, root, method, keep_alive)
+        return
+
+    if os.path.isdir(path):
+        if not request_path.endswith("/"):
+            location = split_target.path + "/" + (f"?{split_target.query}" if split_target.query else "")
+            await _send(writer, 301, {"Location": location}, b"", keep_alive)
+            return
+        path = os.path.join(path, "index.html")
+    if not os.path.isfile(path):
+        await _not_found(writer, root, method, keep_alive)
+        return
+
+    response_headers = {"Content-Type": _content_type(path), "Vary": "Accept-Encoding", "Accept-Ranges": "bytes"}
+    served_path = path
+    sidecar = compress.sidecar(path, headers.get("accept-encoding", ""))
+    if sidecar is not None:
+        served_path, response_headers["Content-Encoding"] = sidecar
+
+    stat = os.stat(served_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response_headers["ETag"] = etag
+    response_headers["Last-Modified"] = email.utils.formatdate(stat.st_mtime, usegmt=True)
+    if _not_modified(headers, etag, stat.st_mtime):
+        await _send(writer, 304, response_headers, b"", keep_alive)
+        return
+
+    status, offset, length = 200, 0, stat.st_size
+    byte_range = headers.get("range")
+    if byte_range and headers.get("if-range", etag) == etag:
+        parsed_range = _range(byte_range, stat.st_size)
+        if parsed_range is None:
+            response_headers["Content-Range"] = f"bytes */{stat.st_size}"
+            await _send(writer, 416, response_headers, b"", keep_alive)
+            return
+        if parsed_range != (0, stat.st_size):
+            status, (offset, length) = 206, parsed_range
+            response_headers["Content-Range"] = f"bytes {offset}-{offset + length - 1}/{stat.st_size}"
+
+    response_headers["Content-Length"] = str(length)
+    head = _head(status, response_headers, keep_alive)
+    if method != "GET" or not length:
+        writer.write(head)
+    else:
+        with open(served_path, "rb") as served_file:
+            if length >= SENDFILE_THRESHOLD:
+                writer.write(head)
+                await writer.drain()
+                await asyncio.get_running_loop().sendfile(writer.transport, served_file, offset, length)
+            else:  # a single write, so small responses go out in as few packets as possible
+                served_file.seek(offset)
+                writer.write(head + served_file.read(length))
+    await writer.drain()
+
+
+def _not_modified(headers: Dict[str, str], etag: str, modified: float) -> bool:
+    if "if-none-match" in headers:
+        candidates = [candidate.strip() for candidate in headers["if-none-match"].split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if "if-modified-since" in headers:
+        try:
+            since = email.utils.parsedate_to_datetime(headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(modified) <= since
+    return False
+
+
+def _range(byte_range: str, size: int) -> Optional[Tuple[int, int]]:
+    """Returns the (offset, length) of a single byte range, the whole file for ranges that are
+    ignored (such as multiple ranges), or `None` if the range can't be satisfied.
+    """
+    unit, _, ranges = byte_range.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return 0, size
+
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if not start:  # the last `end` bytes
+            suffix = int(end)
+            return (max(size - suffix, 0), min(suffix, size)) if suffix and size else None
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return 0, size
+    if first >= size or last < first:
+        return None
+    return first, last - first + 1
+
+
+def _content_type(path: str) -> str:
+    content_type, _ = mimetypes.guess_type(path)
+    content_type = content_type or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in TEXT_TYPES:
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+async def _not_found(writer: asyncio.StreamWriter, root: str, method: str, keep_alive: bool) -> None:
+    body = b"Not Found"
+    headers = {"Content-Type": "text/plain; charset=utf-8"}
+    not_found_page = os.path.join(root, "404.html")
+    if os.path.isfile(not_found_page):
+        with open(not_found_page, "rb") as page:
+            body = page.read()
+        headers["Content-Type"] = "text/html; charset=utf-8"
+    await _send(writer, 404, headers, body if method != "HEAD" else b"", keep_alive, len(body))
+
+
+async def _send(
+    writer: asyncio.StreamWriter,
+    status: int,
+    headers: Dict[str, str],
+    body: bytes,
+    keep_alive: bool,
+    content_length: Optional[int] = None,
+) -> None:
+    if status != 304:
+        headers["Content-Length"] = str(len(body) if content_length is None else content_length)
+    writer.write(_head(status, headers, keep_alive) + body)
+    await writer.drain()
+
+
+def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines: List[str] = [
+        f"HTTP/1.1 {status} {REASONS[status]}",
+        f"Date: {email.utils.formatdate(usegmt=True)}",
+        "Server: portray",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
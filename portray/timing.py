@@ -0,0 +1,154 @@
+"""Defines the lightweight instrumentation used to measure each phase of a documentation build.
+
+Phases are only measured while a recording is active, making instrumentation free otherwise:
+
+    with timing.record() as timings:
+        render.documentation(config)
+    print(timings.table())
+
+Sub phases, such as the reference documentation of each module, are named `phase/detail`.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_recording: ContextVar[Optional["Timings"]] = ContextVar("portray_timings", default=None)
+
+
+class Phase:
+    """The measurements of a single build phase.
+
+    - *wall*: Elapsed wall clock time, in seconds.
+    - *cpu*: CPU time used by the building process (excluding any worker processes), in seconds.
+    - *files*: The number of files the phase wrote. Unless the phase reports them itself, the
+        files created or modified within its output directory while it ran.
+    - *size*: The total size of those files, in bytes.
+    """
+
+    def __init__(self, wall: float = 0.0, cpu: float = 0.0, files: int = 0, size: int = 0):
+        self.wall = wall
+        self.cpu = cpu
+        self.files = files
+        self.size = size
+
+    def add(self, other: "Phase") -> None:
+        self.wall += other.wall
+        self.cpu += other.cpu
+        self.files += other.files
+        self.size += other.size
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"wall": self.wall, "cpu": self.cpu, "files": self.files, "size": self.size}
+
+
+class Timings:
+    """The measurements of every phase of a build, keyed by phase name."""
+
+    def __init__(self):
+        self.phases: Dict[str, Phase] = {}
+
+    def add(self, name: str, phase: Phase) -> None:
+        self.phases.setdefault(name, Phase()).add(phase)
+
+    def merge(self, phases: Dict[str, Phase]) -> None:
+        for name, phase in phases.items():
+            self.add(name, phase)
+
+    @property
+    def total(self) -> float:
+        """The wall time spent within all top level phases."""
+        return sum(phase.wall for name, phase in self.phases.items() if "/" not in name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "phases": {name: phase.as_dict() for name, phase in self.phases.items()}}
+
+    def table(self) -> str:
+        """Returns the measurements formatted as a plain text table."""
+        return table(self.as_dict())
+
+
+@contextmanager
+def record() -> Iterator[Timings]:
+    """Records the measurements of every phase ran within the context."""
+    timings = Timings()
+    token = _recording.set(timings)
+    try:
+        yield timings
+    finally:
+        _recording.reset(token)
+
+
+def merge(phases: Dict[str, Phase]) -> None:
+    """Adds phases measured elsewhere (such as within a worker process) to the active recording."""
+    timings = _recording.get()
+    if timings is not None:
+        timings.merge(phases)
+
+
+@contextmanager
+def phase(name: str, directory: str = "") -> Iterator[Phase]:
+    """Measures the contained code as the named phase, if a recording is active.
+
+    If an output `directory` is given, the files created or modified within it while the phase
+    ran are counted as written. Otherwise the phase can report the files it wrote by setting the
+    `files` and `size` of the yielded `Phase`.
+    """
+    measured = Phase()
+    timings = _recording.get()
+    if timings is None:
+        yield measured
+        return
+
+    existing = _snapshot(directory)
+    started = time.perf_counter()
+    started_cpu = time.process_time()
+    try:
+        yield measured
+    finally:
+        measured.wall = time.perf_counter() - started
+        measured.cpu = time.process_time() - started_cpu
+        for path, (size, modified, inode) in _snapshot(directory).items():
+            if existing.get(path) != (size, modified, inode):
+                measured.files += 1
+                measured.size += size
+        timings.add(name, measured)
+
+
+def _snapshot(directory: str) -> Dict[str, Tuple[int, int, int]]:
+    """Returns the size, modification time and inode of every file within directory, by path."""
+    files: Dict[str, Tuple[int, int, int]] = {}
+    if not directory or not os.path.isdir(directory):
+        return files
+
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed while walking the directory
+                continue
+            files[path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return files
+
+
+def table(measurements: Dict[str, Any]) -> str:
+    """Formats measurements, as returned by `Timings.as_dict`, as a plain text table."""
+    rows = [("Phase", "Wall (s)", "CPU (s)", "Files", "Bytes")]
+    for name, measured in measurements["phases"].items():
+        label = f"  {name.split('/', 1)[1]}" if "/" in name else name
+        rows.append(
+            (label, f"{measured['wall']:.3f}", f"{measured['cpu']:.3f}", str(measured["files"]), str(measured["size"]))
+        )
+    rows.append(("total", f"{measurements['total']:.3f}", "", "", ""))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])] + [
+            value.rjust(width) for value, width in zip(row[1:], widths[1:], strict=True)
+        ]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
@@ -0,0 +1,194 @@
+"""Defines how file changes observed by the live-reloading server map onto the smallest
+rebuild that still reflects them:
+
+- Changes to Markdown or other files within the projects documentation directories only
+  restage and rerender those pages, regenerating the nav too for pages that aren't in it yet.
+- Changes to the Python source of a documented module only regenerate that modules
+  reference documentation.
+- Changes to the projects configuration, or files being removed, trigger a full rebuild.
+
+Bursts of changes (a `git checkout`, a formatter run) are coalesced by a `ChangeBatcher`
+into as few rebuilds as possible.
+"""
+
+import os
+import sys
+import threading
+import traceback
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from mkdocs.utils import is_markdown_file
+
+from portray import ast_reference
+
+CONFIG_FILES = ("setup.py",)
+
+
+class Changes(NamedTuple):
+    """The rebuild required to reflect a set of changed files."""
+
+    full: bool = False
+    pages: FrozenSet[str] = frozenset()
+    modules: FrozenSet[str] = frozenset()
+    nav: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.full or self.pages or self.modules or self.nav)
+
+
+def classify(config: dict, paths: Iterable[str]) -> Changes:
+    """Returns the changes to rebuild given the project config and the changed file paths.
+
+    Pages are returned relative to the projects directory, modules as configured in `pdocs`.
+    Markdown pages that aren't within the nav of the last build yet, such as newly created ones,
+    require the nav to be regenerated.
+    """
+    directory = os.path.abspath(config["directory"])
+    config_files = {os.path.join(directory, config_file) for config_file in CONFIG_FILES}
+    if config.get("file"):
+        config_files.add(os.path.abspath(config["file"]))
+    page_dirs = [os.path.join(directory, page_dir) for page_dir in [config["docs_dir"]] + config["extra_dirs"]]
+
+    module_roots: Optional[Dict[str, str]] = None
+    # without a nav, one is generated by the next build anyway
+    nav_pages = set(_nav_pages(config["mkdocs"]["nav"])) if "nav" in config["mkdocs"] else None
+    pages = set()
+    modules = set()
+    nav = False
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.exists(path) or path in config_files:
+            return Changes(full=True)
+
+        if (os.path.dirname(path) == directory and is_markdown_file(path)) or any(
+            path.startswith(page_dir + os.sep) for page_dir in page_dirs
+        ):
+            page = os.path.relpath(path, directory)
+            pages.add(page)
+            if nav_pages is not None and is_markdown_file(path) and page.replace(os.sep, "/") not in nav_pages:
+                nav = True
+        elif path.endswith(".py"):
+            if module_roots is None:
+                module_roots = _module_roots(config)
+            for root, module in module_roots.items():
+                if path == root or path.startswith(root + os.sep):
+                    modules.add(module)
+
+    return Changes(pages=frozenset(pages), modules=frozenset(modules), nav=nav)
+
+
+def _module_roots(config: dict) -> Dict[str, str]:
+    """Returns the documented module each source file, or package directory, found (without
+    importing anything) for the modules configured in `pdocs` belongs to.
+    """
+    roots = {}
+    for module in config["pdocs"]["modules"]:
+        try:
+            source_file = ast_reference.locate(module)
+        except ModuleNotFoundError:
+            continue
+        root = os.path.dirname(source_file.path) if source_file.is_package else source_file.path
+        roots[os.path.abspath(root)] = module
+    return roots
+
+
+def _nav_pages(nav: Any) -> Iterator[str]:
+    if isinstance(nav, str):
+        yield nav
+    elif isinstance(nav, dict):
+        for value in nav.values():
+            yield from _nav_pages(value)
+    elif isinstance(nav, list):
+        for item in nav:
+            yield from _nav_pages(item)
+
+
+class ChangeBatcher:
+    """Coalesces bursts of file changes into as few rebuilds as possible.
+
+    Changed paths are collected until no further change has been reported for `quiet_period`
+    seconds, then `rebuild` is called once, on a background thread, with the merged paths
+    (or `None` if any change was reported without paths, requiring a full rebuild).
+    Changes reported while a rebuild is running supersede each other, being merged into a
+    single follow up rebuild once the running one completes (a running MkDocs build can't
+    safely be interrupted). `on_complete` is called whenever the batcher becomes idle again
+    after rebuilding.
+    """
+
+    def __init__(
+        self,
+        rebuild: Callable[[Optional[List[str]]], None],
+        quiet_period: float = 0.5,
+        on_complete: Optional[Callable[[], None]] = None,
+    ):
+        self.rebuild = rebuild
+        self.quiet_period = quiet_period
+        self.on_complete = on_complete
+        self._pending: Set[str] = set()
+        self._full = False
+        self._has_pending = False
+        self._running = False
+        self._timer: Optional[threading.Timer] = None
+        self._condition = threading.Condition()
+
+    def add(self, paths: Optional[Iterable[str]] = None) -> None:
+        """Reports changed paths, or a change requiring a full rebuild if no paths are given."""
+        with self._condition:
+            if paths is None:
+                self._full = True
+            else:
+                self._pending.update(paths)
+            self._has_pending = True
+
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.quiet_period, self._quiet)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every reported change has been rebuilt, returning `False` on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not (self._has_pending or self._running), timeout)
+
+    def _quiet(self) -> None:
+        with self._condition:
+            self._timer = None
+            if self._running or not self._has_pending:
+                return  # the running rebuild picks up the pending changes once it completes
+            self._running = True
+
+        threading.Thread(target=self._rebuild_pending, daemon=True).start()
+
+    def _rebuild_pending(self) -> None:
+        while True:
+            with self._condition:
+                if not self._has_pending or self._timer is not None:
+                    # nothing left, or changes are still arriving and will be rebuilt when quiet
+                    idle = not self._has_pending
+                    self._running = False
+                    self._condition.notify_all()
+                    break
+                paths = None if self._full else sorted(self._pending)
+                self._pending = set()
+                self._full = False
+                self._has_pending = False
+
+            try:
+                self.rebuild(paths)
+            except Exception:  # pragma: no cover
+                traceback.print_exc(file=sys.stderr)
+
+        if idle and self.on_complete is not None:
+            self.on_complete()
@@ -0,0 +1,193 @@
+"""Defines the supervised worker processes reference documentation is generated within when
+`reference_isolation` is enabled.
+
+Generating reference documentation imports the documented modules, and a module that hangs
+or balloons in memory while being imported would otherwise stall or bring down the whole build.
+Instead each module is documented within a worker process that is killed once it exceeds the
+per module `reference_timeout` (in seconds) or `reference_memory_limit` (resident memory, in
+MiB, enforced where `/proc` is available). Modules that fail are documented by a placeholder page
+reporting the failure, and workers are replaced after `reference_worker_modules` modules to
+bound the memory they accumulate.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import warnings
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from portray import ast_reference, timing
+
+POLL_INTERVAL = 0.1
+
+PLACEHOLDER = """# Module {module}
+
+!!! failure "Reference documentation could not be generated"
+    {reason}
+{report}"""
+
+
+class Limits(NamedTuple):
+    """The limits worker processes are supervised with, `0` meaning unlimited."""
+
+    timeout: float = 0
+    memory_limit: int = 0
+    modules_per_worker: int = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["Limits"]:
+        """Returns the limits configured for the project, or `None` if isolation isn't enabled."""
+        if not config["reference_isolation"]:
+            return None
+        return cls(config["reference_timeout"], config["reference_memory_limit"], config["reference_worker_modules"])
+
+
+class _Worker:
+    def __init__(self, python_path: List[str]):
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(worker_connection, python_path), daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.module: Optional[str] = None
+        self.started = 0.0
+        self.documented = 0
+
+    def submit(self, module: str, config: dict, cache_dir: str) -> None:
+        self.module = module
+        self.started = time.monotonic()
+        self.connection.send((module, config, cache_dir))
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except OSError:  # pragma: no cover
+                pass
+            self.process.join(timeout=5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def reference(modules: List[str], config: dict, cache_dir: str, jobs: int, limits: Limits) -> Dict[str, str]:
+    """Renders the reference documentation of each module within supervised worker processes,
+    running up to `jobs` of them at once.
+
+    Returns the reason reference documentation couldn't be generated for each module that failed,
+    after writing a placeholder page reporting it in its place.
+    """
+    pending = list(modules)
+    idle: List[_Worker] = []
+    busy: List[_Worker] = []
+    failures: Dict[str, Tuple[str, str]] = {}
+    try:
+        while pending or busy:
+            while pending and len(busy) < jobs:
+                worker = idle.pop() if idle else _Worker(sys.path)
+                worker.submit(pending.pop(0), config, cache_dir)
+                busy.append(worker)
+
+            ready = wait([worker.connection for worker in busy], timeout=POLL_INTERVAL)
+            for worker in list(busy):
+                outcome = _outcome(worker, worker.connection in ready, limits)
+                if outcome is None:
+                    continue
+
+                busy.remove(worker)
+                succeeded, result = outcome
+                if succeeded:
+                    timing.merge(result)
+                else:
+                    failures[worker.module] = result  # type: ignore
+                    _placeholder(config["output_dir"], worker.module, *result)  # type: ignore
+
+                worker.documented += 1
+                if not worker.process.is_alive():
+                    worker.kill()
+                elif limits.modules_per_worker and worker.documented >= limits.modules_per_worker:
+                    worker.stop()
+                else:
+                    idle.append(worker)
+    finally:
+        for worker in idle + busy:
+            worker.stop()
+
+    for module, (reason, _) in failures.items():
+        warnings.warn(f"Reference documentation for {module} could not be generated: {reason}", stacklevel=2)
+    return {module: reason for module, (reason, _) in failures.items()}
+
+
+def _outcome(worker: _Worker, ready: bool, limits: Limits) -> Optional[Tuple[bool, Any]]:
+    """Returns whether the module the worker is documenting succeeded along with its timings, or
+    the reason and report of its failure, or `None` if it is still being documented.
+    """
+    if ready:
+        try:
+            return worker.connection.recv()
+        except EOFError:
+            worker.process.join()
+            return False, (f"The worker process exited with code {worker.process.exitcode}", "")
+
+    elapsed = time.monotonic() - worker.started
+    if limits.timeout and elapsed > limits.timeout:
+        worker.kill()
+        return False, (f"Timed out after {limits.timeout} seconds", "")
+
+    rss = _rss(worker.process.pid)  # type: ignore
+    if limits.memory_limit and rss is not None and rss > limits.memory_limit * 1024 * 1024:
+        worker.kill()
+        return False, (f"Exceeded the memory limit of {limits.memory_limit} MiB", "")
+
+    if not worker.process.is_alive():
+        worker.process.join()
+        return False, (f"The worker process exited with code {worker.process.exitcode}", "")
+    return None
+
+
+def _serve(connection: Connection, python_path: List[str]) -> None:
+    sys.path.extend(path for path in python_path if path not in sys.path)
+    from portray import render
+
+    while True:
+        task = connection.recv()
+        if task is None:
+            return
+
+        module, config, cache_dir = task
+        try:
+            result: Tuple[bool, Any] = (True, render._module_reference(module, config, cache_dir))
+        except BaseException as error:
+            result = (False, (f"{type(error).__name__}: {error}", traceback.format_exc()))
+        connection.send(result)
+
+
+def _rss(pid: int) -> Optional[int]:
+    """Returns the resident memory of the process in bytes, or `None` where it can't be determined."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _placeholder(output_dir: str, module: str, reason: str, report: str) -> None:
+    try:
+        source_file = ast_reference.locate(module)
+        name, is_package = source_file.name, source_file.is_package
+    except ModuleNotFoundError:
+        name, is_package = module, False
+    # where pdocs would have written the page, packages being documented by the index of their directory
+    path = os.path.join(output_dir, *name.split("."))
+    path = os.path.join(path, "index.md") if is_package else f"{path}.md"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if report:
+        report = "\n    ```\n" + "".join(f"    {line}\n" for line in report.rstrip().splitlines()) + "    ```\n"
+    with open(path, "w") as placeholder:
+        placeholder.write(PLACEHOLDER.format(module=module, reason=reason, report=report))
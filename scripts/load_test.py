@@ -0,0 +1,157 @@
+"""Load test portray's servers against a built site.
+
+Compares the throughput and latency of the live reloading development server (`portray server`)
+with the production static server (`portray server --production`) under many concurrent
+keep-alive connections:
+
+    python scripts/load_test.py --concurrency 200 --duration 10
+    python scripts/load_test.py --site path/to/site --workers 4
+
+Without `--site`, a synthetic project is generated and built (see `portray.benchmark`).
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+DEV_SERVER = """
+import sys
+from livereload import Server
+from portray import serving
+
+server = Server()
+server.SFH = serving.SidecarStaticFileHandler
+server.serve(root=sys.argv[1], host="127.0.0.1", port=int(sys.argv[2]), restart_delay=0)
+"""
+
+PRODUCTION_SERVER = """
+import sys
+from portray import static_server
+
+static_server.serve(sys.argv[1], host="127.0.0.1", port=int(sys.argv[2]), workers=int(sys.argv[3]))
+"""
+
+
+def build_site(directory: str) -> str:
+    from portray import benchmark, config, render
+
+    project_dir = benchmark.synthetic_project(directory, modules=20, functions=10, pages=50)
+    site_dir = os.path.join(directory, "site")
+    render.documentation(config.project(project_dir, "pyproject.toml", output_dir=site_dir, compress=True))
+    return site_dir
+
+
+def site_paths(site_dir: str) -> List[str]:
+    paths = []
+    for root, _, files in os.walk(site_dir):
+        for file_name in files:
+            if file_name.endswith((".html", ".css", ".js", ".json")):
+                paths.append("/" + os.path.relpath(os.path.join(root, file_name), site_dir).replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} didn't start")
+
+
+async def client(port: int, paths: List[str], deadline: float, offset: int, results: Dict[str, list]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    index = offset
+    try:
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n\r\n".encode("latin-1"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            status = int(head.split(b" ", 2)[1])
+            results["latencies"].append(time.perf_counter() - started)
+            results["ok" if status < 400 else "errors"].append(status)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        results["errors"].append("connection")
+    finally:
+        writer.close()
+
+
+async def load(port: int, paths: List[str], concurrency: int, duration: float) -> Dict[str, list]:
+    results: Dict[str, list] = {"latencies": [], "ok": [], "errors": []}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(client(port, paths, deadline, offset, results) for offset in range(concurrency)))
+    return results
+
+
+def report(name: str, results: Dict[str, list], duration: float) -> str:
+    latencies = sorted(results["latencies"]) or [0.0]
+    percentile_99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (
+        f"{name:<12} {len(results['ok']) / duration:>10.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:>8.1f} ms  p99 {percentile_99 * 1000:>8.1f} ms  "
+        f"errors {len(results['errors'])}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--site", default="", help="An already built site to serve (built from a synthetic project otherwise)."
+    )
+    parser.add_argument("--concurrency", type=int, default=100, help="The number of concurrent keep-alive connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="How long to load each server for, in seconds.")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Production server worker processes (0 uses one per CPU)."
+    )
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        site_dir = arguments.site or build_site(directory)
+        paths = site_paths(site_dir)
+        print(f"Serving {len(paths)} files from {site_dir} to {arguments.concurrency} concurrent connections")
+
+        servers = {
+            "development": [DEV_SERVER],
+            "production": [PRODUCTION_SERVER, str(arguments.workers)],
+        }
+        for name, (script, *extra) in servers.items():
+            port = free_port()
+            process = subprocess.Popen(
+                [sys.executable, "-c", script, site_dir, str(port), *extra],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_for(port)
+                results = asyncio.run(load(port, paths, arguments.concurrency, arguments.duration))
+                print(report(name, results, arguments.duration))
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import tempfile
 import mkdocs.commands.gh_deploy
 import pytest
 import toml
-from portray import api, exceptions
+from portray import api, exceptions, render, serving
 
 CUSTOM_NAV = """
 [[tool.portray.mkdocs.nav]]
@@ -72,6 +72,13 @@ def test_as_html(temporary_dir, project_dir, chdir):
             # Unless we enable overwritting destination
             api.as_html(overwrite=True)
 
+            # Which can also be done by syncing only the changes into place
+            pyproject_toml = toml.load(os.path.join(temp_project_dir, "pyproject.toml"))
+            pyproject_toml["tool"]["portray"]["publish"] = "sync"
+            with open(os.path.join(temp_project_dir, "pyproject.toml"), "w") as pyproject:
+                toml.dump(pyproject_toml, pyproject)
+            api.as_html(overwrite=True)
+
             # Or, we output to a different location
             with tempfile.TemporaryDirectory() as new_temp_directory:
                 api.as_html(output_dir=os.path.join(new_temp_directory, "site"))
@@ -92,19 +99,80 @@ def test_as_html_custom_nav(temporary_dir, project_dir, chdir):
             api.as_html()
 
 
+def test_as_html_incremental(temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open(os.path.join(temporary_dir, "my_module.py"), "w") as module:
+            module.write('"""My module"""\n\ndef my_method():\n    pass\n')
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n")
+
+        measured = api.as_html(modules=["my_module"], incremental=True, profile="build.prof")
+        assert {"staging", "pdocs", "mkdocs", "publish"}.issubset(measured["phases"])
+        assert os.path.isfile(os.path.join(temporary_dir, "build.prof"))
+        cache_dir = os.path.join(temporary_dir, ".portray_cache")
+        assert os.path.isfile(os.path.join(cache_dir, "manifest.json"))
+        reference_page = os.path.join(cache_dir, "site", "reference", "my_module", "index.html")
+        reference_mtime = os.path.getmtime(reference_page)
+
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n\nUpdated\n")
+        api.as_html(modules=["my_module"], incremental=True, overwrite=True)
+
+        assert os.path.getmtime(reference_page) == reference_mtime
+        with open(os.path.join(temporary_dir, "site", "index.html")) as home_page:
+            assert "Updated" in home_page.read()
+
+
+def test_as_html_incremental_home_page(temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open(os.path.join(temporary_dir, "my_module.py"), "w") as module:
+            module.write('"""My module"""\n')
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n\nHello\n")
+        api.as_html(modules=["my_module"], incremental=True)
+
+        os.remove(os.path.join(temporary_dir, "README.md"))
+        api.as_html(modules=["my_module"], incremental=True, overwrite=True)
+        with open(os.path.join(temporary_dir, "site", "index.html")) as home_page:
+            content = home_page.read()
+            assert "Hello" not in content
+            assert "It appears you do not yet have a README.md file created." in content
+
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n\nHello again\n")
+        api.as_html(modules=["my_module"], incremental=True, overwrite=True)
+        with open(os.path.join(temporary_dir, "site", "index.html")) as home_page:
+            content = home_page.read()
+            assert "Hello again" in content
+            assert "It appears you do not yet have a README.md file created." not in content
+
+
 def test_server(mocker, project_dir, chdir):
     with chdir(project_dir):
-        mocker.patch("portray.api.Server")
+        server_class = mocker.patch("livereload.Server")
         api.server()
-        api.Server.assert_called_once()
-        api.Server.return_value.serve.assert_called_once()
+        server_class.assert_called_once()
+        server_class.return_value.serve.assert_called_once()
+
+
+def test_lazy_server(mocker, project_dir, chdir):
+    with chdir(project_dir):
+        server_class = mocker.patch("livereload.Server")
+        api.server(lazy=True)
+        server_instance = server_class.return_value
+        server_instance.serve.assert_called_once()
+        assert issubclass(server_instance.SFH, serving.LazyStaticFileHandler)
+        assert server_instance.SFH.site is not None
+
+        with pytest.raises(ValueError):
+            api.server(lazy=True, production=True)
 
 
 def test_reloading_server(mocker, project_dir, chdir):
     with chdir(project_dir):
-        mocker.patch("portray.api.Server")
+        server_class = mocker.patch("livereload.Server")
         api.server(reload=True)
-        server_instance = api.Server.return_value
+        server_instance = server_class.return_value
         server_instance.serve.assert_called_once()
         assert len(server_instance.watch.call_args_list) == 5
 
@@ -131,6 +199,42 @@ def test_reloading_server(mocker, project_dir, chdir):
             assert len(server_instance.watch.call_args_list) == 7
 
 
+def test_reloading_server_targeted_rebuilds(mocker, temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open(os.path.join(temporary_dir, "reloaded_module.py"), "w") as module:
+            module.write('"""My module"""\n')
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n")
+
+        server_class = mocker.patch("livereload.Server")
+        api.server(modules=["reloaded_module"], reload=True)
+        batcher = server_class.return_value.watch.call_args_list[0][0][1].__self__
+
+        def reloader(changed_paths):
+            batcher.add(changed_paths)
+            assert batcher.wait(timeout=60)
+
+        site_dir = os.path.join(temporary_dir, ".portray_cache", "site")
+
+        documentation_in_temp_folder = mocker.spy(render, "documentation_in_temp_folder")
+        with open(os.path.join(temporary_dir, "README.md"), "w") as readme:
+            readme.write("# My Project\n\nUpdated\n")
+        reloader([os.path.join(temporary_dir, "README.md")])
+        assert documentation_in_temp_folder.call_args[0][1].pages == {"README.md"}
+        with open(os.path.join(site_dir, "index.html")) as home_page:
+            assert "Updated" in home_page.read()
+
+        with open(os.path.join(temporary_dir, "reloaded_module.py"), "w") as module:
+            module.write('"""My updated module"""\n')
+        reloader([os.path.join(temporary_dir, "reloaded_module.py")])
+        assert documentation_in_temp_folder.call_args[0][1].modules == {"reloaded_module"}
+        with open(os.path.join(site_dir, "reference", "reloaded_module", "index.html")) as reference_page:
+            assert "My updated module" in reference_page.read()
+
+        reloader([os.path.join(temporary_dir, "tests.txt")])
+        assert documentation_in_temp_folder.call_args[0][1].full
+
+
 def project_configuration(project_dir, chdir):
     with chdir(project_dir):
         config = api.project_configuration()
@@ -140,10 +244,10 @@ def project_configuration(project_dir, chdir):
 
 def test_in_browser(mocker, project_dir, chdir):
     with chdir(project_dir):
-        mocker.patch("portray.api.Server")
+        server_class = mocker.patch("livereload.Server")
         mocker.patch("webbrowser.open_new")
         api.in_browser()
-        server_instance = api.Server.return_value
+        server_instance = server_class.return_value
         server_instance.serve.assert_called_once()
 
         server_instance.reset_mock()
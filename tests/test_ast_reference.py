@@ -0,0 +1,122 @@
+import os
+import sys
+
+import pdocs.render
+import pytest
+from portray import ast_reference, render
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as source_file:
+        source_file.write(content)
+
+
+def _package(directory):
+    _write(
+        os.path.join(directory, "unimportable", "__init__.py"),
+        '"""A package that must never be imported."""\n\n'
+        "from .shapes import Square\n\n"
+        '__all__ = ["Square", "area"]\n\n'
+        'raise RuntimeError("imported")\n\n\n'
+        "def area(side: int, *, scale: float = 1.0) -> float:\n"
+        '    """Returns the area of a square."""\n'
+        "    return side * side * scale\n",
+    )
+    _write(
+        os.path.join(directory, "unimportable", "shapes.py"),
+        '"""Shapes."""\n\n'
+        "import heavy_dependency\n\n"
+        "SIDES = 4\n"
+        '"""The number of sides."""\n\n\n'
+        "class Shape(Exception):\n"
+        '    """A shape."""\n\n\n'
+        "class Square(Shape):\n"
+        '    """A square."""\n\n'
+        "    def __init__(self, side: int = 1):\n"
+        "        self.side = side\n\n"
+        "    @property\n"
+        "    def area(self) -> int:\n"
+        '        """The area."""\n'
+        "        return self.side**2\n\n"
+        "    @classmethod\n"
+        "    def unit(cls) -> 'Square':\n"
+        "        return cls()\n\n"
+        "    def scaled(self, factor, /, *others, **options):\n"
+        "        pass\n\n"
+        "    def _private(self):\n"
+        "        pass\n",
+    )
+    _write(os.path.join(directory, "unimportable", "_private.py"), "raise RuntimeError('imported')\n")
+
+
+def test_extract_module(temporary_dir, monkeypatch):
+    _package(temporary_dir)
+    monkeypatch.syspath_prepend(temporary_dir)
+
+    package = ast_reference.extract_module("unimportable")
+    assert "unimportable" not in sys.modules
+    assert package.docstring == "A package that must never be imported."
+    assert [module.name for module in package.submodules] == ["unimportable.shapes"]
+    area = package.functions()[0]
+    assert (area.name, area.params(), area.return_annotation()) == (
+        "area",
+        ["side: int", "*", "scale: float = 1.0"],
+        "float",
+    )
+
+    square = package.classes()[0]
+    assert square.refname == "unimportable.shapes.Square"
+    assert square.params() == ["side: int = 1"]
+    assert [ancestor.refname for ancestor in square.mro()] == [
+        "unimportable.shapes.Shape",
+        "builtins.Exception",
+        "builtins.BaseException",
+    ]
+    assert [method.params() for method in square.methods()] == [["self", "factor", "/", "*others", "**options"]]
+    assert [(function.name, function.params()) for function in square.functions()] == [("unit", [])]
+    assert [variable.docstring for variable in square.instance_variables()] == ["The area."]
+
+    shapes = package.submodules[0]
+    assert [(variable.name, variable.docstring) for variable in shapes.variables()] == [
+        ("SIDES", "The number of sides.")
+    ]
+    assert [subclass.refname for subclass in shapes.classes()[0].subclasses()] == ["unimportable.shapes.Square"]
+    assert ast_reference.extract_module(os.path.join(temporary_dir, "unimportable"), jobs=2).name == "unimportable"
+
+
+def test_pdocs_ast_mode(temporary_dir, monkeypatch):
+    _package(temporary_dir)
+    monkeypatch.syspath_prepend(temporary_dir)
+    output_dir = os.path.join(temporary_dir, "reference")
+    config = {"modules": ["unimportable"], "output_dir": output_dir, "overwrite": True, "mode": "ast"}
+
+    render.pdocs(config, cache_dir=os.path.join(temporary_dir, "cache"))
+    assert sorted(os.listdir(os.path.join(output_dir, "unimportable"))) == ["index.md", "shapes.md"]
+    with open(os.path.join(output_dir, "unimportable", "shapes.md")) as shapes:
+        assert "class Square(\n    side: int = 1\n)" in shapes.read()
+    assert "unimportable" not in sys.modules
+
+    with pytest.raises(ValueError):
+        render.pdocs({**config, "mode": "guess"})
+
+
+def test_as_markdown_template_dir(temporary_dir, monkeypatch):
+    _package(temporary_dir)
+    monkeypatch.syspath_prepend(temporary_dir)
+    template_dir = os.path.join(temporary_dir, "templates")
+    os.mkdir(template_dir)
+    with open(os.path.join(template_dir, "text.mako"), "w") as template:
+        template.write("Custom ${module.name}\n")
+    directories = list(pdocs.render.tpl_lookup.directories)
+
+    output_dir = os.path.join(temporary_dir, "custom")
+    ast_reference.as_markdown(["unimportable"], output_dir, template_dir=template_dir)
+    with open(os.path.join(output_dir, "unimportable", "index.md")) as page:
+        assert page.read().startswith("Custom unimportable")
+    assert pdocs.render.tpl_lookup.directories == directories
+
+    output_dir = os.path.join(temporary_dir, "default")
+    ast_reference.as_markdown(["unimportable"], output_dir)
+    with open(os.path.join(output_dir, "unimportable", "index.md")) as page:
+        assert not page.read().startswith("Custom")
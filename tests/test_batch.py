@@ -0,0 +1,41 @@
+import os
+
+from portray import batch
+
+
+def _project(directory, module):
+    os.makedirs(directory)
+    with open(os.path.join(directory, "pyproject.toml"), "w") as pyproject:
+        pyproject.write(f'[tool.portray]\nmodules = ["{module}"]\n')
+    with open(os.path.join(directory, f"{module}.py"), "w") as module_file:
+        module_file.write(f'"""The {module} module"""\n')
+
+
+def test_projects(temporary_dir):
+    _project(os.path.join(temporary_dir, "packages", "first"), "first_batch_module")
+    _project(os.path.join(temporary_dir, "packages", "second"), "second_batch_module")
+    first = os.path.join(temporary_dir, "packages", "first")
+    second = os.path.join(temporary_dir, "packages", "second")
+
+    assert batch.projects([first, os.path.join(temporary_dir, "packages", "*")]) == [first, second]
+    assert batch.projects([os.path.join(temporary_dir, "missing")]) == []
+
+
+def test_build(temporary_dir):
+    good = os.path.join(temporary_dir, "good")
+    broken = os.path.join(temporary_dir, "broken")
+    _project(good, "good_batch_module")
+    _project(broken, "broken_batch_module")
+    with open(os.path.join(broken, "broken_batch_module.py"), "a") as module_file:
+        module_file.write("raise ImportError('broken on purpose')\n")
+
+    results = batch.build([good, broken], workers=2)
+    assert [result["directory"] for result in results] == [good, broken]
+    assert results[0]["ok"]
+    assert "mkdocs" in results[0]["phases"]
+    assert os.path.isfile(os.path.join(good, "site", "index.html"))
+    assert not results[1]["ok"]
+    assert "broken on purpose" in results[1]["error"]
+
+    table = batch.table(results)
+    assert "1 ok, 1 failed" in table
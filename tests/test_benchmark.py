@@ -0,0 +1,21 @@
+import os
+
+from portray import benchmark
+
+
+def test_synthetic_project(temporary_dir):
+    project_dir = benchmark.synthetic_project(
+        temporary_dir, modules=2, functions=3, pages=4, media_files=1, media_size=10
+    )
+    package_dir = os.path.join(project_dir, benchmark.PACKAGE_NAME)
+    assert sorted(os.listdir(package_dir)) == ["__init__.py", "module_0.py", "module_1.py"]
+    assert len(os.listdir(os.path.join(project_dir, "docs"))) == 4
+    assert os.path.getsize(os.path.join(project_dir, "images", "media_0.bin")) == 10
+
+
+def test_run():
+    results = benchmark.run(modules=1, functions=1, pages=1, repeat=1)
+    assert len(results["runs"]) == 1
+    assert {"staging", "nav", "pdocs", "mkdocs", "publish"}.issubset(results["median"]["phases"])
+    assert f"pdocs/{benchmark.PACKAGE_NAME}" in results["median"]["phases"]
+    assert results["runs"][0]["phases"]["mkdocs"]["files"] > 0
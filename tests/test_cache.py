@@ -0,0 +1,43 @@
+import os
+
+from portray import cache
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+        output_file.write(content)
+
+
+def test_digest_is_stable():
+    assert cache.digest({"b": 1, "a": 2}) == cache.digest({"a": 2, "b": 1})
+    assert cache.digest({"a": 1}) != cache.digest({"a": 2})
+
+
+def test_manifest_round_trip(temporary_dir):
+    assert cache.load_manifest(temporary_dir) == {}
+    cache.save_manifest(temporary_dir, {"site": "fingerprint"})
+    assert cache.load_manifest(temporary_dir) == {"site": "fingerprint"}
+
+
+def test_sync_tree(temporary_dir):
+    source = os.path.join(temporary_dir, "source")
+    destination = os.path.join(temporary_dir, "destination")
+    _write(os.path.join(source, "same.md"), "same")
+    _write(os.path.join(source, "nested", "changed.md"), "new")
+    _write(os.path.join(destination, "same.md"), "same")
+    _write(os.path.join(destination, "nested", "changed.md"), "old")
+    _write(os.path.join(destination, "stale", "stale.md"), "stale")
+    unchanged_mtime = os.path.getmtime(os.path.join(destination, "same.md"))
+
+    changed = cache.sync_tree(source, destination)
+    assert changed == {os.path.join("nested", "changed.md"), os.path.join("stale", "stale.md")}
+    assert os.path.getmtime(os.path.join(destination, "same.md")) == unchanged_mtime
+    assert not os.path.exists(os.path.join(destination, "stale"))
+    assert cache.sync_tree(source, destination) == set()
+
+
+def test_module_sources(project_dir):
+    sources = cache.module_sources(os.path.join(project_dir, "portray"))
+    assert os.path.join(project_dir, "portray", "cache.py") in sources
+    assert cache.module_sources("portray_module_that_does_not_exist") == []
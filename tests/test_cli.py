@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+HEAVY_DEPENDENCIES = {"git", "livereload", "mkdocs", "pdocs", "tornado", "yaspin"}
+
+
+def test_cli_import_is_lazy():
+    """The CLI must start quickly, only importing the build pipeline when a command needs it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import portray.cli"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {
+        line.rsplit("|", 1)[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert "portray" in imported
+    assert not imported.intersection(HEAVY_DEPENDENCIES)
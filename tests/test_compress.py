@@ -0,0 +1,48 @@
+import gzip
+import os
+
+from portray import compress
+
+
+def test_sidecars(temporary_dir):
+    site_dir = os.path.join(temporary_dir, "site")
+    store_dir = os.path.join(temporary_dir, "store")
+    os.makedirs(os.path.join(site_dir, "search"))
+    page = os.path.join(site_dir, "index.html")
+    index = os.path.join(site_dir, "search", "search_index.json")
+    with open(page, "w") as page_file:
+        page_file.write("<html>" + "documentation " * 200 + "</html>")
+    with open(index, "w") as index_file:
+        index_file.write('{"docs": []}' * 200)
+    with open(os.path.join(site_dir, "small.css"), "w") as small_file:
+        small_file.write("body {}")
+    with open(os.path.join(site_dir, "image.png"), "wb") as image_file:
+        image_file.write(os.urandom(4096))
+
+    stats = compress.sidecars(site_dir, store_dir, jobs=1)
+    assert (stats["compressed"], stats["reused"]) == (2 * len(compress.encodings()), 0)
+    assert 0 < stats["size"] < os.path.getsize(page) + os.path.getsize(index)
+    with gzip.open(page + ".gz", "rt") as compressed_page:
+        assert compressed_page.read().startswith("<html>documentation")
+    assert os.path.isfile(index + ".gz")
+    assert not os.path.exists(os.path.join(site_dir, "small.css.gz"))
+    assert not os.path.exists(os.path.join(site_dir, "image.png.gz"))
+
+    with open(page, "a") as page_file:
+        page_file.write("changed")
+    stats = compress.sidecars(site_dir, store_dir, jobs=1)
+    assert (stats["compressed"], stats["reused"]) == (len(compress.encodings()), len(compress.encodings()))
+    assert stats["size"] == sum(os.path.getsize(page + extension) for _, extension in compress.encodings())
+    with gzip.open(page + ".gz", "rt") as compressed_page:
+        assert compressed_page.read().endswith("changed")
+
+
+def test_sidecar(temporary_dir):
+    page = os.path.join(temporary_dir, "index.html")
+    with open(page + ".gz", "wb") as sidecar_file:
+        sidecar_file.write(gzip.compress(b"<html></html>"))
+
+    assert compress.sidecar(page, "gzip, deflate") == (page + ".gz", "gzip")
+    assert compress.sidecar(page, "br;q=1.0, gzip;q=0") is None
+    assert compress.sidecar(page, "") is None
+    assert compress.sidecar(page, "gzip", compressed_html=False) is None
@@ -64,6 +64,53 @@ def test_project_flit_setup(temporary_dir):
     assert project_config["modules"] == ["preconvert"]
 
 
+def test_project_cache(temporary_dir, mocker):
+    config_file = os.path.join(temporary_dir, "pyproject.toml")
+    with open(config_file, "w") as pyproject:
+        pyproject.write('[tool.portray]\nmodules = ["first"]\n')
+
+    resolve = mocker.spy(config, "_project")
+    project_config = config.project(directory=temporary_dir, config_file="pyproject.toml")
+    project_config["mkdocs"]["nav"] = "modified by the caller"
+    cached_config = config.project(directory=temporary_dir, config_file="pyproject.toml")
+    assert resolve.call_count == 1
+    assert cached_config["modules"] == ["first"]
+    assert "nav" not in cached_config["mkdocs"]
+
+    config.project(directory=temporary_dir, config_file="pyproject.toml", output_dir="other")
+    assert resolve.call_count == 2
+
+    with open(config_file, "w") as pyproject:
+        pyproject.write('[tool.portray]\nmodules = ["first", "second"]\n')
+    assert config.project(directory=temporary_dir, config_file="pyproject.toml")["modules"] == ["first", "second"]
+    assert resolve.call_count == 3
+
+
+def test_project_cache_git_includes(temporary_dir, mocker):
+    with open(os.path.join(temporary_dir, "pyproject.toml"), "w") as pyproject:
+        pyproject.write('[tool.portray]\nmodules = ["first"]\n')
+    os.mkdir(os.path.join(temporary_dir, ".git"))
+    with open(os.path.join(temporary_dir, ".git", "HEAD"), "w") as head:
+        head.write("ref: refs/heads/main\n")
+    with open(os.path.join(temporary_dir, ".git", "config"), "w") as git_config:
+        git_config.write("[include]\n\tpath = remotes.config\n")
+    remotes = os.path.join(temporary_dir, ".git", "remotes.config")
+    with open(remotes, "w") as remotes_config:
+        remotes_config.write('[remote "origin"]\n\turl = https://github.com/timothycrosley/first.git\n')
+
+    resolve = mocker.spy(config, "_project")
+    project_config = config.project(directory=temporary_dir, config_file="pyproject.toml")
+    assert project_config["mkdocs"]["repo_name"] == "first"
+    config.project(directory=temporary_dir, config_file="pyproject.toml")
+    assert resolve.call_count == 1
+
+    with open(remotes, "w") as remotes_config:
+        remotes_config.write('[remote "origin"]\n\turl = https://github.com/timothycrosley/second-repo.git\n')
+    project_config = config.project(directory=temporary_dir, config_file="pyproject.toml")
+    assert project_config["mkdocs"]["repo_name"] == "second-repo"
+    assert resolve.call_count == 2
+
+
 def test_setup_py_properties():
     auto_test(config.setup_py)
 
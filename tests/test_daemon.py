@@ -0,0 +1,78 @@
+import os
+import threading
+
+import pytest
+
+from portray import daemon, exceptions, render
+
+
+@pytest.fixture()
+def running_daemon(temporary_dir, monkeypatch):
+    # keep the warm caches from outliving the test
+    monkeypatch.setattr(render, "_warm_configs", None)
+    monkeypatch.setattr(render, "_warm_environments", None)
+
+    socket_path = os.path.join(temporary_dir, "portray.sock")
+    server = daemon.DaemonServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_request_without_daemon(temporary_dir):
+    with pytest.raises(exceptions.DaemonUnavailable):
+        daemon.request("as_html", {}, os.path.join(temporary_dir, "missing.sock"))
+
+
+def test_request_to_socket_of_other_user(running_daemon, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(running_daemon).st_uid + 1)
+    with pytest.raises(exceptions.DaemonUnavailable):
+        daemon.request("as_html", {}, running_daemon)
+
+
+def test_request_without_permission(running_daemon, monkeypatch):
+    def connect(*args):
+        raise PermissionError("Permission denied")
+
+    monkeypatch.setattr(daemon.socket.socket, "connect", connect)
+    with pytest.raises(exceptions.DaemonUnavailable):
+        daemon.request("as_html", {}, running_daemon)
+
+
+def test_daemon_builds(running_daemon, temporary_dir, chdir):
+    project_dir = os.path.join(temporary_dir, "project")
+    os.mkdir(project_dir)
+    with open(os.path.join(project_dir, "daemon_module.py"), "w") as module:
+        module.write('"""Daemon module"""\n\ndef first():\n    pass\n')
+
+    with chdir(project_dir):
+        arguments = {"modules": ["daemon_module"], "overwrite": True}
+        measured = daemon.request("as_html", arguments, running_daemon)
+        assert "mkdocs" in measured["phases"]
+
+        with open(os.path.join(project_dir, "daemon_module.py"), "a") as module:
+            module.write("\ndef second():\n    pass\n")
+        daemon.request("as_html", arguments, running_daemon)
+        with open(os.path.join(project_dir, "site", "reference", "daemon_module", "index.html")) as page:
+            assert "second" in page.read()
+
+        with pytest.raises(exceptions.DocumentationAlreadyExists):
+            daemon.request("as_html", {"modules": ["daemon_module"]}, running_daemon)
+        with pytest.raises(exceptions.DaemonBuildFailed):
+            daemon.request("unknown", {}, running_daemon)
+
+
+def test_daemon_site_name(running_daemon, temporary_dir, chdir):
+    # the daemon was started from elsewhere, within the directory the tests are ran from
+    project_dir = os.path.join(temporary_dir, "named_project")
+    os.mkdir(project_dir)
+    with open(os.path.join(project_dir, "named_module.py"), "w") as module:
+        module.write('"""Named module"""\n')
+
+    with chdir(project_dir):
+        daemon.request("as_html", {"modules": ["named_module"], "overwrite": True}, running_daemon)
+    with open(os.path.join(project_dir, "site", "index.html")) as page:
+        assert "<title>named_project</title>" in page.read()
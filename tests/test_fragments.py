@@ -0,0 +1,60 @@
+import os
+
+import markdown
+
+from portray import api
+
+
+def test_markdown_cache(temporary_dir, chdir, mocker):
+    with chdir(temporary_dir):
+        os.mkdir("docs")
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write("[tool.portray]\nmarkdown_cache = true\ninclude_reference_documentation = false\n")
+        with open("README.md", "w") as readme:
+            readme.write("# Cached\n\nHome page\n")
+        with open(os.path.join("docs", "guide.md"), "w") as guide:
+            guide.write("# Guide\n\n## Usage\n\nGuide page linking [home](../README.md)\n")
+
+        convert = mocker.spy(markdown.Markdown, "convert")
+        api.as_html()
+        assert convert.call_count == 2
+        markdown_cache = os.path.join(temporary_dir, ".portray_cache", "markdown")
+        assert sum(len(files) for _, _, files in os.walk(markdown_cache)) == 2
+        with open(os.path.join("site", "docs", "guide", "index.html")) as guide_page:
+            uncached_guide_page = guide_page.read()
+
+        convert.reset_mock()
+        api.as_html(overwrite=True)
+        assert convert.call_count == 0
+        with open(os.path.join("site", "docs", "guide", "index.html")) as guide_page:
+            assert guide_page.read() == uncached_guide_page
+
+        with open("README.md", "w") as readme:
+            readme.write("# Cached\n\nUpdated home page\n")
+        api.as_html(overwrite=True)
+        assert convert.call_count == 1
+        with open(os.path.join("site", "index.html")) as home_page:
+            assert "Updated home page" in home_page.read()
+        assert sum(len(files) for _, _, files in os.walk(markdown_cache)) == 2
+
+
+def test_markdown_cache_includes(temporary_dir, chdir, mocker):
+    with chdir(temporary_dir):
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write(
+                "[tool.portray]\nmarkdown_cache = true\ninclude_reference_documentation = false\n"
+                'extra_markdown_extensions = ["pymdownx.snippets"]\n'
+            )
+        with open("README.md", "w") as readme:
+            readme.write('# Included\n\n--8<-- "snippet.txt"\n')
+        with open("snippet.txt", "w") as snippet:
+            snippet.write("Original snippet\n")
+        api.as_html()
+
+        with open("snippet.txt", "w") as snippet:
+            snippet.write("Updated snippet\n")
+        convert = mocker.spy(markdown.Markdown, "convert")
+        api.as_html(overwrite=True)
+        assert convert.call_count == 1
+        with open(os.path.join("site", "index.html")) as home_page:
+            assert "Updated snippet" in home_page.read()
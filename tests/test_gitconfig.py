@@ -0,0 +1,77 @@
+import os
+
+from portray import config, gitconfig
+
+REPOSITORY_CONFIG = """
+[core]
+\tbare = false
+[remote "upstream"]
+\turl = https://github.com/upstream/project.git
+[remote "origin"]
+\turl = "git@github.com:owner/project.git" ; the fork
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+[include]
+\tpath = included.config
+[includeIf "gitdir:elsewhere/"]
+\tpath = never.config
+[includeIf "onbranch:release/"]
+\tpath = release.config
+"""
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+
+
+def test_remote_url(temporary_dir):
+    repository = os.path.join(temporary_dir, "repository")
+    _write(os.path.join(repository, ".git", "config"), REPOSITORY_CONFIG)
+    _write(os.path.join(repository, ".git", "HEAD"), "ref: refs/heads/main\n")
+    _write(os.path.join(repository, ".git", "included.config"), "[user]\n\tname = Someone\n")
+    _write(os.path.join(repository, ".git", "never.config"), '[remote "origin"]\n\turl = wrong\n')
+    _write(os.path.join(repository, ".git", "release.config"), '[remote "origin"]\n\turl = https://release\n')
+
+    read_files = []
+    assert gitconfig.remote_url(repository, "origin", read_files) == "git@github.com:owner/project.git"
+    assert gitconfig.remote_url(repository, "upstream") == "https://github.com/upstream/project.git"
+    assert gitconfig.remote_url(repository, "missing") is None
+    assert os.path.join(repository, ".git", "included.config") in read_files
+    assert os.path.join(repository, ".git", "never.config") not in read_files
+
+    _write(os.path.join(repository, ".git", "HEAD"), "ref: refs/heads/release/1.0\n")
+    assert gitconfig.remote_url(repository) == "https://release"
+
+    assert gitconfig.remote_url(os.path.join(temporary_dir, "missing")) is None
+
+
+def test_remote_url_worktree(temporary_dir):
+    main = os.path.join(temporary_dir, "main")
+    worktree = os.path.join(temporary_dir, "worktree")
+    _write(os.path.join(main, ".git", "config"), '[remote "origin"]\n\turl = https://gitlab.com/group/app.git\n')
+    _write(os.path.join(main, ".git", "worktrees", "worktree", "commondir"), "../..\n")
+    _write(os.path.join(worktree, ".git"), f"gitdir: {os.path.join(main, '.git', 'worktrees', 'worktree')}\n")
+
+    assert gitconfig.git_dir(worktree) == os.path.join(main, ".git", "worktrees", "worktree")
+    assert gitconfig.remote_url(worktree) == "https://gitlab.com/group/app.git"
+
+
+def test_repository_without_git(temporary_dir, mocker):
+    _write(os.path.join(temporary_dir, ".git", "config"), '[remote "origin"]\n\turl = https://github.com/o/fast.git\n')
+    repo = mocker.patch("git.Repo")
+
+    assert config.repository(temporary_dir) == {
+        "edit_uri": "edit/main/",
+        "repo_name": "fast",
+        "repo_url": "https://github.com/o/fast",
+    }
+    repo.assert_not_called()
+
+    # cached until the git config changes
+    parse = mocker.spy(gitconfig, "remote_url")
+    config.repository(temporary_dir)
+    assert parse.call_count == 0
+    _write(os.path.join(temporary_dir, ".git", "config"), '[remote "origin"]\n\turl = https://github.com/o/renamed\n')
+    assert config.repository(temporary_dir)["repo_name"] == "renamed"
+    assert parse.call_count == 1
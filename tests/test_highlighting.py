@@ -0,0 +1,40 @@
+import os
+
+import pygments
+
+from portray import api, highlighting
+
+
+def test_highlight_cache(temporary_dir, chdir, mocker):
+    with chdir(temporary_dir):
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write("[tool.portray]\nhighlight_cache = true\ninclude_reference_documentation = false\n")
+        code_block = "```python\ndef highlighted():\n    return True\n```\n"
+        with open("README.md", "w") as readme:
+            readme.write(f"# Highlighted\n\n{code_block}\nAgain:\n\n{code_block}")
+
+        highlight = mocker.spy(pygments, "highlight")
+        api.as_html()
+        assert highlight.call_count == 1
+        with open(os.path.join("site", "index.html")) as home_page:
+            uncached_home_page = home_page.read()
+        assert uncached_home_page.count('<span class="k">def</span>') == 2
+
+        highlight.reset_mock()
+        api.as_html(overwrite=True)
+        assert highlight.call_count == 0
+        with open(os.path.join("site", "index.html")) as home_page:
+            assert home_page.read() == uncached_home_page
+
+
+def test_evict_entries(temporary_dir):
+    for age, name in enumerate(("oldest", "older", "newest")):
+        path = os.path.join(temporary_dir, name[:2], f"{name}.html")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as entry:
+            entry.write("x" * 100)
+        os.utime(path, (age, age))
+
+    removed = highlighting.evict_entries(temporary_dir, 200)
+    assert [os.path.basename(path) for path in removed] == ["oldest.html"]
+    assert highlighting.evict_entries(temporary_dir, 200) == []
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import threading
+
+from mkdocs.commands import build as mkdocs_build
+from tornado import httpclient, httpserver, netutil, web
+
+from portray import api, lazy, serving
+
+
+def test_site(temporary_dir, chdir, mocker):
+    with chdir(temporary_dir):
+        os.makedirs(os.path.join("lazy_package", "nested"))
+        os.mkdir("docs")
+        with open("README.md", "w") as readme:
+            readme.write("# Lazy\n\nHome page\n")
+        with open(os.path.join("docs", "guide.md"), "w") as guide:
+            guide.write("# Guide\n\nGuide page\n")
+        with open(os.path.join("lazy_package", "__init__.py"), "w") as module:
+            module.write('"""Lazy package"""\n')
+        with open(os.path.join("lazy_package", "nested", "__init__.py"), "w") as module:
+            module.write('"""Nested package"""\n')
+        with open(os.path.join("lazy_package", "nested", "leaf.py"), "w") as module:
+            module.write('"""Leaf module"""\n\ndef leaf():\n    """Leaf function"""\n')
+        config = api.project_configuration(temporary_dir, modules=["lazy_package"])
+
+        build_page = mocker.spy(mkdocs_build, "_build_page")
+        with lazy.site(config, background=False) as site:
+            assert not os.path.exists(os.path.join(site.site_dir, "reference"))
+            assert site.location("docs/guide/") == "docs/guide/index.html"
+            assert site.page("missing/") is None
+
+            assert b"Leaf function" in site.page("reference/lazy_package/nested/leaf/")  # type: ignore
+            assert b"Guide page" in site.page("docs/guide/")  # type: ignore
+            assert b"Guide page" in site.page("docs/guide/index.html")  # type: ignore
+            assert build_page.call_count == 2
+
+            site.start()
+            assert site.complete.wait(timeout=60)
+            assert build_page.call_count == 5
+            with open(os.path.join(site.site_dir, "search", "search_index.json")) as search_index:
+                locations = {document["location"] for document in json.load(search_index)["docs"]}
+            assert "reference/lazy_package/" in locations
+
+        build_page.reset_mock()
+        with lazy.site(config, background=False) as site:
+            assert b"Home page" in site.page("")  # type: ignore
+            assert b"Leaf function" in site.page("reference/lazy_package/nested/leaf/")  # type: ignore
+            assert build_page.call_count == 0
+
+            site.start()
+            assert site.complete.wait(timeout=60)
+            assert build_page.call_count == 0
+            with open(os.path.join(site.site_dir, "search", "search_index.json")) as search_index:
+                restored_locations = [document["location"] for document in json.load(search_index)["docs"]]
+            assert set(restored_locations) == locations
+            assert len(restored_locations) == len(set(restored_locations))
+
+            with open(os.path.join("docs", "guide.md"), "w") as guide:
+                guide.write("# Guide\n\nUpdated guide page\n")
+            site.prepare()
+            assert b"Updated guide page" in site.page("docs/guide/")  # type: ignore
+            assert build_page.call_count == 1
+
+            site.start()
+            assert site.complete.wait(timeout=60)
+            assert build_page.call_count == 1
+            assert len(os.listdir(site.cache_dir)) == 10  # the html and search entries of each page
+
+
+def test_lazy_handler_renders_concurrently(temporary_dir):
+    rendering = threading.Event()
+    rendered = threading.Event()
+
+    class SlowSite:
+        def location(self, path):
+            return "slow/index.html" if path.startswith("slow") else None
+
+        def page(self, path):
+            rendering.set()
+            rendered.wait(timeout=10)
+            return b"<p>Slow page</p>"
+
+    with open(os.path.join(temporary_dir, "style.css"), "w") as style:
+        style.write("body {}")
+
+    async def fetch_while_rendering():
+        application = web.Application([(r"/(.*)", serving.lazy_handler(SlowSite()), {"path": temporary_dir})])
+        sockets = netutil.bind_sockets(0, "127.0.0.1")
+        server = httpserver.HTTPServer(application)
+        server.add_sockets(sockets)
+        url = f"http://127.0.0.1:{sockets[0].getsockname()[1]}"
+        client = httpclient.AsyncHTTPClient()
+        try:
+            slow_page = client.fetch(f"{url}/slow/")
+            while not rendering.is_set():
+                await asyncio.sleep(0.01)
+            # served while the slow page is still being rendered
+            assert (await client.fetch(f"{url}/style.css")).body == b"body {}"
+            rendered.set()
+            assert (await slow_page).body == b"<p>Slow page</p>"
+        finally:
+            server.stop()
+
+    asyncio.run(fetch_while_rendering())
@@ -0,0 +1,80 @@
+import os
+
+from portray import api, listings
+
+PAGE = '''# Module listed
+
+Listed module
+
+??? example "View Source"
+        """Listed module"""
+
+        def listed():
+
+            """Listed function"""
+
+            return True
+
+## Functions
+
+### listed
+
+??? example "View Source"
+        def listed():
+
+            """Listed function"""
+
+            return True
+
+'''
+
+
+def test_split_page(temporary_dir):
+    page = os.path.join(temporary_dir, "listed.md")
+    split = listings.split_page(PAGE, page)
+    lines = split.splitlines()
+    links = [line for line in lines if line.startswith("    [View the source](listed.source/")]
+    assert len(links) == 2
+    assert all(link.endswith(".html){: .portray-source }") for link in links)
+    assert lines == [
+        "# Module listed",
+        "",
+        "Listed module",
+        "",
+        '??? example "View Source"',
+        links[0],
+        "",
+        "## Functions",
+        "",
+        "### listed",
+        "",
+        '??? example "View Source"',
+        links[1],
+        "",
+    ]
+
+    listing_files = sorted(os.listdir(os.path.join(temporary_dir, "listed.source")))
+    assert len(listing_files) == 2
+    with open(os.path.join(temporary_dir, "listed.source", listing_files[0])) as listing:
+        assert listing.read().startswith('<div class="codehilite"><pre><span></span><code>')
+    assert listings.split_page(split, page) == split
+
+
+def test_split_source(temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write('[tool.portray]\nmodules = ["listed_module"]\n')
+            config_file.write("\n[tool.portray.pdocs]\nsplit_source = true\n")
+        with open("listed_module.py", "w") as module:
+            module.write('"""Listed module"""\n\n\ndef listed():\n    """Listed function"""\n    return True\n')
+
+        api.as_html()
+        with open(os.path.join("site", "reference", "listed_module", "index.html")) as reference_page:
+            reference_html = reference_page.read()
+        assert "return True" not in reference_html
+        assert 'class="portray-source" href="../listed_module.source/' in reference_html
+        assert "assets/portray/source.js" in reference_html
+        listing_files = os.listdir(os.path.join("site", "reference", "listed_module.source"))
+        assert len(listing_files) == 2
+        with open(os.path.join("site", "search", "search_index.json")) as search_index:
+            assert "return True" not in search_index.read()
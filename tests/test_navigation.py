@@ -0,0 +1,65 @@
+import json
+import os
+
+from portray import navigation
+
+
+def test_tree():
+    nav = [
+        {"Home": "README.md"},
+        "CHANGELOG.md",
+        {"Guide": [{"Index": "docs/guide/index.md"}, {"Usage": "docs/guide/usage.md"}]},
+        {"Elsewhere": "https://example.com/"},
+    ]
+    assert navigation.tree(nav) == [
+        {"title": "Home", "url": "", "index": True},
+        {"title": "Changelog", "url": "CHANGELOG/", "index": False},
+        {
+            "title": "Guide",
+            "children": [
+                {"title": "Index", "url": "docs/guide/", "index": True},
+                {"title": "Usage", "url": "docs/guide/usage/", "index": False},
+            ],
+        },
+        {"title": "Elsewhere", "url": "https://example.com/", "index": False},
+    ]
+    assert navigation.tree(nav, use_directory_urls=False)[1]["url"] == "CHANGELOG.html"
+
+
+def test_write_tree(temporary_dir):
+    path = navigation.write_tree(temporary_dir, [{"Home": "README.md"}])
+    assert path == os.path.join(temporary_dir, "assets", "portray", "nav.json")
+    with open(path) as tree_file:
+        assert json.load(tree_file) == [{"title": "Home", "url": "", "index": True}]
+
+    modified = os.path.getmtime(path) - 10
+    os.utime(path, (modified, modified))
+    navigation.write_tree(temporary_dir, [{"Home": "README.md"}])
+    assert os.path.getmtime(path) == modified
+
+
+def test_write_tree_without_directory_urls(temporary_dir):
+    nav = [{"Home": "README.md"}, {"Guide": [{"Index": "docs/guide/index.md"}, {"Usage": "docs/guide/usage.md"}]}]
+    path = navigation.write_tree(temporary_dir, nav, use_directory_urls=False)
+    with open(path) as tree_file:
+        assert json.load(tree_file) == [
+            {"title": "Home", "url": "index.html", "index": True},
+            {
+                "title": "Guide",
+                "children": [
+                    {"title": "Index", "url": "docs/guide/index.html", "index": True},
+                    {"title": "Usage", "url": "docs/guide/usage.html", "index": False},
+                ],
+            },
+        ]
+
+
+def test_page_url():
+    assert navigation.page_url("README.md") == ""
+    assert navigation.page_url("docs/index.md") == "docs/"
+    assert navigation.page_url("docs/usage.md") == "docs/usage/"
+    assert navigation.page_url("docs/usage.md", use_directory_urls=False) == "docs/usage.html"
+    assert navigation.page_url("README.md", use_directory_urls=False) == "index.html"
+    assert navigation.page_url("docs/index.md", use_directory_urls=False) == "docs/index.html"
+    assert navigation.page_url("mailto:portray@example.com") == "mailto:portray@example.com"
+    assert navigation.page_url("/elsewhere/") == "/elsewhere/"
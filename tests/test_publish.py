@@ -0,0 +1,33 @@
+import os
+
+from portray import publish
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+        output_file.write(content)
+
+
+def _read(path):
+    with open(path) as input_file:
+        return input_file.read()
+
+
+def test_sync(temporary_dir):
+    site_dir = os.path.join(temporary_dir, "built")
+    output_dir = os.path.join(temporary_dir, "site")
+    _write(os.path.join(site_dir, "index.html"), "home")
+    _write(os.path.join(site_dir, "docs", "page.html"), "page")
+
+    assert publish.sync(site_dir, output_dir) == {"written": 2, "size": 8, "unchanged": 0, "removed": 0}
+    unchanged_inode = os.stat(os.path.join(output_dir, "index.html")).st_ino
+
+    _write(os.path.join(site_dir, "docs", "page.html"), "updated page")
+    _write(os.path.join(output_dir, "stale.html"), "stale")
+    assert publish.sync(site_dir, output_dir) == {"written": 1, "size": 12, "unchanged": 1, "removed": 1}
+
+    assert os.stat(os.path.join(output_dir, "index.html")).st_ino == unchanged_inode
+    assert _read(os.path.join(output_dir, "docs", "page.html")) == "updated page"
+    assert not os.path.exists(os.path.join(output_dir, "stale.html"))
+    assert sorted(os.listdir(temporary_dir)) == ["built", "site"]
@@ -1,3 +1,6 @@
+import os
+import shutil
+
 from hypothesis_auto import auto_test
 from portray import render
 
@@ -7,3 +10,74 @@ def test_mkdocs_config():
         render._mkdocs_config,
         auto_allow_exceptions_=(render._mkdocs_exceptions.ConfigurationError,),
     )
+
+
+def test_pdocs_module_cache(temporary_dir, mocker, monkeypatch):
+    monkeypatch.syspath_prepend(temporary_dir)
+    module_dir = os.path.join(temporary_dir, "cached_module")
+    os.mkdir(module_dir)
+    with open(os.path.join(module_dir, "__init__.py"), "w") as module:
+        module.write('"""Cached module"""\n')
+    cache_dir = os.path.join(temporary_dir, "cache")
+    output_dir = os.path.join(temporary_dir, "reference")
+    config = {"modules": ["cached_module"], "output_dir": output_dir, "overwrite": True, "exclude_source": False}
+
+    pdocs_as_markdown = mocker.spy(render, "pdocs_as_markdown")
+    render.pdocs(config, cache_dir)
+    assert pdocs_as_markdown.call_count == 1
+    assert os.listdir(output_dir)
+
+    shutil.rmtree(output_dir)
+    render.pdocs(config, cache_dir)
+    assert pdocs_as_markdown.call_count == 1
+    assert os.listdir(output_dir)
+
+    render.pdocs({**config, "exclude_source": True}, cache_dir)
+    assert pdocs_as_markdown.call_count == 2
+
+    monkeypatch.setattr(render, "__version__", "0.0.0-upgraded")
+    render.pdocs({**config, "exclude_source": True}, cache_dir)
+    assert pdocs_as_markdown.call_count == 3
+
+
+def test_pdocs_parallel(temporary_dir, monkeypatch):
+    monkeypatch.syspath_prepend(temporary_dir)
+    for module_name in ("first_parallel_module", "second_parallel_module"):
+        with open(os.path.join(temporary_dir, f"{module_name}.py"), "w") as module:
+            module.write(f'"""{module_name}"""\n\ndef method():\n    pass\n')
+    output_dir = os.path.join(temporary_dir, "reference")
+    config = {
+        "modules": ["first_parallel_module", "second_parallel_module"],
+        "output_dir": output_dir,
+        "overwrite": True,
+        "exclude_source": False,
+    }
+
+    render.pdocs(config, jobs=2)
+    assert sorted(os.listdir(output_dir)) == ["first_parallel_module.md", "second_parallel_module.md"]
+
+
+def test_nested_docs(temporary_dir):
+    docs_dir = os.path.join(temporary_dir, "docs")
+    for path in (
+        "docs/b-page.md",
+        "docs/a_page.md",
+        "docs/.hidden.md",
+        "docs/api/index.md",
+        "docs/api-guide/cli.md",
+        "docs/empty/image.png",
+        "docs/deep/er/est/page.md",
+    ):
+        os.makedirs(os.path.dirname(os.path.join(temporary_dir, path)), exist_ok=True)
+        with open(os.path.join(temporary_dir, path), "w") as doc:
+            doc.write("# Doc\n")
+
+    config = {"labels": {"Api": "API", "Cli": "CLI"}}
+    assert render._nested_docs(docs_dir, temporary_dir, config) == [
+        {"A Page": "docs/a_page.md"},
+        {"B Page": "docs/b-page.md"},
+        {"Api Guide": [{"CLI": "docs/api-guide/cli.md"}]},
+        {"API": [{"Index": "docs/api/index.md"}]},
+        {"Deep": [{"Er": [{"Est": [{"Page": "docs/deep/er/est/page.md"}]}]}]},
+    ]
+    assert render._nested_docs(os.path.join(temporary_dir, "missing"), temporary_dir, config) == []
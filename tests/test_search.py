@@ -0,0 +1,109 @@
+import json
+import os
+
+from portray import api, search
+
+
+def test_shard(temporary_dir):
+    os.makedirs(os.path.join(temporary_dir, "search"))
+    index_file = os.path.join(temporary_dir, "search", "search_index.json")
+    with open(index_file, "w") as index:
+        json.dump(
+            {
+                "config": {"lang": ["en"]},
+                "docs": [
+                    {"location": "", "title": "Home", "text": "<p>Welcome</p>"},
+                    {"location": "guide/usage/", "title": "Usage", "text": "<pre><code>kept</code></pre>"},
+                    {"location": "reference/portray/api/#api", "title": "api", "text": "API"},
+                    {"location": "unlisted/", "title": "Unlisted", "text": ""},
+                ],
+            },
+            index,
+        )
+    nav = [
+        {"Home": "README.md"},
+        {"Guide": [{"Usage": "guide/usage.md"}]},
+        {"Reference": [{"Portray": [{"Api": "reference/portray/api.md"}]}]},
+    ]
+
+    manifest = search.shard(temporary_dir, nav)
+    assert manifest["config"] == {"lang": ["en"]}
+    assert [(shard["section"], shard["path"], shard["documents"]) for shard in manifest["shards"]] == [
+        ("Home", "shards/home.json", 2),
+        ("Guide", "shards/guide.json", 1),
+        ("Reference/Portray", "shards/reference-portray.json", 1),
+    ]
+    with open(os.path.join(temporary_dir, "search", "shards", "guide.json")) as shard_file:
+        assert json.load(shard_file)["docs"][0]["text"] == "<pre><code>kept</code></pre>"
+    with open(index_file) as index:
+        assert len(json.load(index)["docs"]) == 4
+    with open(os.path.join(temporary_dir, "search", "manifest.json")) as manifest_file:
+        assert json.load(manifest_file) == manifest
+
+    assert search.shard(os.path.join(temporary_dir, "missing"), nav) == {}
+
+
+def test_shards_of_built_site(temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write('[tool.portray]\nmodules = ["sharded"]\nsearch_shards = true\n')
+        with open("README.md", "w") as readme:
+            readme.write("# Sharded\n\nHome page\n\n```python\nexample_code = 1\n```\n")
+        with open("sharded.py", "w") as module:
+            module.write('"""Sharded module"""\n\n\ndef documented():\n    """Documented function"""\n    return 42\n')
+        api.as_html()
+
+        with open(os.path.join("site", "search", "manifest.json")) as manifest_file:
+            manifest = json.load(manifest_file)
+        docs = []
+        for shard in manifest["shards"]:
+            with open(os.path.join("site", "search", shard["path"])) as shard_file:
+                docs.extend(json.load(shard_file)["docs"])
+        with open(os.path.join("site", "search", "search_index.json")) as index:
+            assert json.load(index)["docs"] == docs
+
+        text = " ".join(doc["text"] for doc in docs)
+        assert "Documented function" in text
+        assert "example_code" in text
+        assert "View Source" not in text
+        assert "return 42" not in text
+        with open(os.path.join("site", "reference", "sharded", "index.html")) as page:
+            assert "return" in page.read()  # the page itself still embeds the source
+        with open(os.path.join("site", "index.html")) as page:
+            assert "assets/portray/search.js" in page.read()
+
+
+def test_shards_without_directory_urls(temporary_dir, chdir):
+    with chdir(temporary_dir):
+        with open("pyproject.toml", "w") as config_file:
+            config_file.write(
+                '[tool.portray]\nmodules = ["nested"]\nsearch_shards = true\n\n'
+                "[tool.portray.mkdocs]\nuse_directory_urls = false\n"
+            )
+        with open("README.md", "w") as readme:
+            readme.write("# Nested\n")
+        os.makedirs(os.path.join("nested", "inner"))
+        with open(os.path.join("nested", "__init__.py"), "w") as package:
+            package.write('"""Nested package"""\n')
+        with open(os.path.join("nested", "inner", "__init__.py"), "w") as package:
+            package.write('"""Inner package"""\n')
+        with open(os.path.join("nested", "inner", "module.py"), "w") as module:
+            module.write('"""Inner module"""\n')
+        api.as_html()
+
+        with open(os.path.join("site", "search", "manifest.json")) as manifest_file:
+            manifest = json.load(manifest_file)
+        shards = {}
+        for shard in manifest["shards"]:
+            with open(os.path.join("site", "search", shard["path"])) as shard_file:
+                shards[shard["section"]] = {doc["location"].split("#")[0] for doc in json.load(shard_file)["docs"]}
+
+        assert shards["Home"] == {"index.html"}
+        assert shards["Reference/Nested"] == {
+            "reference/nested/index.html",
+            "reference/nested/inner/index.html",
+            "reference/nested/inner/module.html",
+        }
+        for locations in shards.values():
+            for location in locations:
+                assert os.path.isfile(os.path.join("site", location))
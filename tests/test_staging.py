@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from portray import staging
+
+
+@pytest.mark.parametrize("strategy", staging.STRATEGIES)
+def test_stage_file(temporary_dir, strategy):
+    source = os.path.join(temporary_dir, "source.md")
+    destination = os.path.join(temporary_dir, "staged", "source.md")
+    with open(source, "w") as source_file:
+        source_file.write("content")
+
+    used = staging.stage_file(source, destination, strategy)
+    assert used in (strategy, staging.COPY)
+    assert staging.is_current(source, destination)
+    with open(destination) as destination_file:
+        assert destination_file.read() == "content"
+
+    # restaging replaces, rather than writes through, the staged file
+    assert staging.stage_file(source, destination, staging.COPY) == staging.COPY
+    with open(source) as source_file:
+        assert source_file.read() == "content"
+
+
+def test_stage_file_changes(temporary_dir):
+    source = os.path.join(temporary_dir, "source.md")
+    destination = os.path.join(temporary_dir, "staged", "source.md")
+    with open(source, "w") as source_file:
+        source_file.write("content")
+    staging.stage_file(source, destination)
+
+    with open(source, "w") as source_file:
+        source_file.write("changed content")
+    assert not staging.is_current(source, destination)
+
+
+def test_stage_file_unknown_strategy(temporary_dir):
+    with pytest.raises(ValueError):
+        staging.stage_file(os.path.join(temporary_dir, "a"), os.path.join(temporary_dir, "b"), "teleport")
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import http.client
+import os
+import socket
+import threading
+
+import pytest
+
+from portray import static_server
+
+
+@pytest.fixture()
+def site(temporary_dir):
+    os.makedirs(os.path.join(temporary_dir, "guide"))
+    with open(os.path.join(temporary_dir, "index.html"), "w") as index:
+        index.write("<html>home</html>")
+    with open(os.path.join(temporary_dir, "404.html"), "w") as not_found:
+        not_found.write("<html>missing</html>")
+    with open(os.path.join(temporary_dir, "guide", "index.html"), "w") as guide:
+        guide.write("<html>guide</html>")
+    with open(os.path.join(temporary_dir, "search_index.json"), "w") as search_index:
+        search_index.write('{"docs": []}')
+    with open(os.path.join(temporary_dir, "search_index.json.gz"), "wb") as sidecar:
+        sidecar.write(gzip.compress(b'{"docs": []}'))
+    with open(os.path.join(temporary_dir, "large.bin"), "wb") as large:
+        large.write(os.urandom(static_server.SENDFILE_THRESHOLD * 3))
+    return temporary_dir
+
+
+@pytest.fixture()
+def connection(site):
+    listening_socket = socket.create_server(("127.0.0.1", 0))
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(static_server.start(site, listening_socket))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection("127.0.0.1", listening_socket.getsockname()[1], timeout=10)
+    yield connection
+    connection.close()
+    server.close()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def _get(connection, path, **headers):
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_serving(connection):
+    response, body = _get(connection, "/")
+    assert response.status == 200
+    assert body == b"<html>home</html>"
+    assert response.getheader("Content-Type") == "text/html; charset=utf-8"
+    etag = response.getheader("ETag")
+
+    response, body = _get(connection, "/", **{"If-None-Match": etag})
+    assert response.status == 304
+    assert body == b""
+
+    response, _ = _get(connection, "/guide")
+    assert response.status == 301
+    assert response.getheader("Location") == "/guide/"
+
+    response, body = _get(connection, "/missing.html")
+    assert response.status == 404
+    assert body == b"<html>missing</html>"
+    response, body = _get(connection, "/..%2f..%2f..%2fetc/passwd")
+    assert response.status == 404
+
+    connection.request("POST", "/", body=b"")
+    assert connection.getresponse().status == 405
+
+
+def test_ranges_and_sidecars(connection, site):
+    with open(os.path.join(site, "large.bin"), "rb") as large:
+        content = large.read()
+
+    response, body = _get(connection, "/large.bin")
+    assert response.status == 200
+    assert body == content
+
+    response, body = _get(connection, "/large.bin", Range="bytes=10-19")
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 10-19/{len(content)}"
+    assert body == content[10:20]
+
+    response, body = _get(connection, "/large.bin", Range="bytes=-5")
+    assert body == content[-5:]
+
+    response, _ = _get(connection, "/large.bin", Range=f"bytes={len(content)}-")
+    assert response.status == 416
+
+    response, body = _get(connection, "/search_index.json", **{"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Content-Type") == "application/json; charset=utf-8"
+    assert gzip.decompress(body) == b'{"docs": []}'
+
+    response, body = _get(connection, "/search_index.json")
+    assert response.getheader("Content-Encoding") is None
+    assert body == b'{"docs": []}'
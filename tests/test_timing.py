@@ -0,0 +1,50 @@
+from portray import timing
+
+
+def test_phase_only_records_within_recording(tmpdir):
+    with timing.phase("ignored"):
+        pass
+
+    tmpdir.join("unchanged.txt").write("unchanged")
+    with timing.record() as timings:
+        with timing.phase("first"):
+            pass
+        with timing.phase("first"):
+            pass
+        with timing.phase("second", str(tmpdir)):
+            with timing.phase("second/detail"):
+                tmpdir.join("output.txt").write("output")
+
+    assert set(timings.phases) == {"first", "second", "second/detail"}
+    assert timings.total == timings.phases["first"].wall + timings.phases["second"].wall
+    assert timings.phases["second"].files == 1
+    assert timings.phases["second"].size == len("output")
+
+
+def test_phase_reports_written_files():
+    with timing.phase("ignored") as ignored:
+        ignored.files = 1
+
+    with timing.record() as timings:
+        with timing.phase("publish") as published:
+            published.files = 2
+            published.size = 10
+
+    assert timings.phases["publish"].files == 2
+    assert timings.phases["publish"].size == 10
+    assert timings.phases["publish"].wall > 0
+
+
+def test_merge_and_table():
+    worker = timing.Timings()
+    worker.add("pdocs/my_module", timing.Phase(wall=1.0, cpu=0.5, files=2, size=10))
+
+    timing.merge(worker.phases)  # no active recording, ignored
+    with timing.record() as timings:
+        timing.merge(worker.phases)
+        timing.merge(worker.phases)
+
+    assert timings.phases["pdocs/my_module"].as_dict() == {"wall": 2.0, "cpu": 1.0, "files": 4, "size": 20}
+    table = timings.table()
+    assert "  my_module" in table
+    assert table == timing.table(timings.as_dict())
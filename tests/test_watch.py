@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+
+from portray import config, watch
+
+
+def _touch(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as touched_file:
+        touched_file.write(content)
+
+
+def test_classify(temporary_dir, monkeypatch):
+    monkeypatch.syspath_prepend(temporary_dir)
+    _touch(os.path.join(temporary_dir, "README.md"), "# Project")
+    _touch(os.path.join(temporary_dir, "docs", "guide.md"), "# Guide")
+    _touch(os.path.join(temporary_dir, "watched_module", "__init__.py"), '"""Watched"""')
+    _touch(os.path.join(temporary_dir, "tests", "test_watched.py"))
+    _touch(os.path.join(temporary_dir, "setup.py"))
+    project_config = config.project(temporary_dir, "pyproject.toml", modules=["watched_module"])
+
+    def classify(*paths):
+        return watch.classify(project_config, [os.path.join(temporary_dir, path) for path in paths])
+
+    assert not classify(os.path.join("tests", "test_watched.py"))
+    assert classify("README.md", os.path.join("docs", "guide.md")) == watch.Changes(
+        pages=frozenset({"README.md", os.path.join("docs", "guide.md")})
+    )
+    assert classify(os.path.join("watched_module", "__init__.py")) == watch.Changes(
+        modules=frozenset({"watched_module"})
+    )
+    assert classify("setup.py").full
+    assert classify(os.path.join("docs", "removed.md")).full
+
+    # a nav generated by a previous build doesn't include pages created since
+    project_config["mkdocs"]["nav"] = [{"Home": "README.md"}, {"Docs": [{"Guide": "docs/guide.md"}]}]
+    _touch(os.path.join(temporary_dir, "docs", "created.md"), "# Created")
+    _touch(os.path.join(temporary_dir, "docs", "example.py"), "print('example')")
+    assert classify(os.path.join("docs", "guide.md"), os.path.join("docs", "example.py")) == watch.Changes(
+        pages=frozenset({os.path.join("docs", "guide.md"), os.path.join("docs", "example.py")})
+    )
+    assert classify(os.path.join("docs", "created.md")) == watch.Changes(
+        pages=frozenset({os.path.join("docs", "created.md")}), nav=True
+    )
+
+
+def test_classify_without_importing(temporary_dir, monkeypatch):
+    monkeypatch.syspath_prepend(temporary_dir)
+    _touch(os.path.join(temporary_dir, "unimportable", "__init__.py"), 'raise ImportError("imported")')
+    _touch(os.path.join(temporary_dir, "unimportable", "_private.py"))
+    _touch(os.path.join(temporary_dir, "setup.py"))
+    project_config = config.project(temporary_dir, "pyproject.toml", modules=["unimportable"])
+
+    changed = os.path.join(temporary_dir, "unimportable", "_private.py")
+    assert watch.classify(project_config, [changed]) == watch.Changes(modules=frozenset({"unimportable"}))
+    assert "unimportable" not in sys.modules
+
+
+def test_change_batcher_coalesces():
+    rebuilds = []
+    completed = threading.Event()
+    batcher = watch.ChangeBatcher(rebuilds.append, quiet_period=0.05, on_complete=completed.set)
+    batcher.add(["b.md"])
+    batcher.add(["a.md", "b.md"])
+    assert batcher.wait(timeout=10)
+    assert rebuilds == [["a.md", "b.md"]]
+    assert completed.wait(timeout=10)
+
+    batcher.add(["a.md"])
+    batcher.add()
+    assert batcher.wait(timeout=10)
+    assert rebuilds[-1] is None
+
+
+def test_change_batcher_supersedes_queued_changes():
+    rebuilds = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def rebuild(paths):
+        rebuilds.append(paths)
+        started.set()
+        release.wait(timeout=10)
+
+    batcher = watch.ChangeBatcher(rebuild, quiet_period=0.01)
+    batcher.add(["first.md"])
+    assert started.wait(timeout=10)
+    batcher.add(["second.md"])
+    batcher.add(["third.md"])
+    time.sleep(0.1)
+    release.set()
+    assert batcher.wait(timeout=10)
+    assert rebuilds == [["first.md"], ["second.md", "third.md"]]
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from portray import workers
+
+MODULES = {
+    "working_module": '"""Working module"""\n\ndef method():\n    pass\n',
+    "raising_module": 'raise RuntimeError("broken on import")\n',
+    "hanging_module": "import time\n\ntime.sleep(60)\n",
+    "growing_module": 'import time\n\nallocated = b"x" * (512 * 1024 * 1024)\ntime.sleep(60)\n',
+}
+
+
+@pytest.fixture()
+def reference_config(temporary_dir, monkeypatch):
+    monkeypatch.syspath_prepend(temporary_dir)
+    for module_name, source in MODULES.items():
+        with open(os.path.join(temporary_dir, f"{module_name}.py"), "w") as module:
+            module.write(source)
+    return {"output_dir": os.path.join(temporary_dir, "reference"), "overwrite": True, "exclude_source": False}
+
+
+def test_limits_from_config():
+    config = {
+        "reference_isolation": False,
+        "reference_timeout": 5,
+        "reference_memory_limit": 256,
+        "reference_worker_modules": 2,
+    }
+    assert workers.Limits.from_config(config) is None
+    assert workers.Limits.from_config({**config, "reference_isolation": True}) == workers.Limits(5, 256, 2)
+
+
+def test_reference(reference_config):
+    with pytest.warns(UserWarning, match="raising_module"):
+        failures = workers.reference(
+            ["working_module", "raising_module"], reference_config, "", 2, workers.Limits(timeout=30)
+        )
+    assert list(failures) == ["raising_module"]
+    assert "broken on import" in failures["raising_module"]
+
+    output_dir = reference_config["output_dir"]
+    with open(os.path.join(output_dir, "working_module.md")) as page:
+        assert "Working module" in page.read()
+    with open(os.path.join(output_dir, "raising_module.md")) as page:
+        placeholder = page.read()
+    assert placeholder.startswith("# Module raising_module")
+    assert "Traceback (most recent call last)" in placeholder
+
+
+def test_reference_package_placeholder(reference_config, temporary_dir):
+    os.mkdir(os.path.join(temporary_dir, "raising_package"))
+    with open(os.path.join(temporary_dir, "raising_package", "__init__.py"), "w") as package:
+        package.write('raise RuntimeError("broken on import")\n')
+
+    with pytest.warns(UserWarning, match="raising_package"):
+        workers.reference(["raising_package"], reference_config, "", 1, workers.Limits(timeout=30))
+    with open(os.path.join(reference_config["output_dir"], "raising_package", "index.md")) as page:
+        assert page.read().startswith("# Module raising_package")
+
+
+def test_reference_timeout(reference_config):
+    with pytest.warns(UserWarning, match="Timed out"):
+        failures = workers.reference(["hanging_module"], reference_config, "", 1, workers.Limits(timeout=1))
+    assert failures == {"hanging_module": "Timed out after 1 seconds"}
+    assert os.path.isfile(os.path.join(reference_config["output_dir"], "hanging_module.md"))
+
+
+@pytest.mark.skipif(workers._rss(os.getpid()) is None, reason="resident memory can't be determined")
+def test_reference_memory_limit(reference_config):
+    memory_limit = workers._rss(os.getpid()) // (1024 * 1024) + 128  # type: ignore
+    with pytest.warns(UserWarning, match="memory limit"):
+        failures = workers.reference(
+            ["growing_module"], reference_config, "", 1, workers.Limits(timeout=30, memory_limit=memory_limit)
+        )
+    assert failures == {"growing_module": f"Exceeded the memory limit of {memory_limit} MiB"}
+
+
+def test_reference_recycles_workers(reference_config, mocker):
+    started = mocker.spy(workers._Worker, "__init__")
+    workers.reference(["working_module"] * 3, reference_config, "", 1, workers.Limits(timeout=30, modules_per_worker=2))
+    assert started.call_count == 2
+
+    started.reset_mock()
+    workers.reference(["working_module"] * 3, reference_config, "", 1, workers.Limits(timeout=30))
+    assert started.call_count == 1